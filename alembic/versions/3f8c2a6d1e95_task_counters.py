@@ -0,0 +1,54 @@
+"""task counters
+
+Revision ID: 3f8c2a6d1e95
+Revises: 7b3e91c2f4a8
+Create Date: 2026-10-18 13:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8c2a6d1e95'
+down_revision: Union[str, Sequence[str], None] = '7b3e91c2f4a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Priority levels: 1 = low, 2 = medium, 3 = high
+COUNT_COLUMNS = (
+    "COUNT(*), "
+    "COALESCE(SUM(CASE WHEN is_completed THEN 1 ELSE 0 END), 0), "
+    "COALESCE(SUM(CASE WHEN priority = 1 THEN 1 ELSE 0 END), 0), "
+    "COALESCE(SUM(CASE WHEN priority = 2 THEN 1 ELSE 0 END), 0), "
+    "COALESCE(SUM(CASE WHEN priority = 3 THEN 1 ELSE 0 END), 0)"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_counters',
+        sa.Column('scope', sa.String(), nullable=False),
+        sa.Column('total', sa.BigInteger(), nullable=False),
+        sa.Column('completed', sa.BigInteger(), nullable=False),
+        sa.Column('priority_low', sa.BigInteger(), nullable=False),
+        sa.Column('priority_medium', sa.BigInteger(), nullable=False),
+        sa.Column('priority_high', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('scope')
+    )
+    
+    # Backfill from the existing tasks
+    columns = "scope, total, completed, priority_low, priority_medium, priority_high"
+    op.execute(f"INSERT INTO task_counters ({columns}) SELECT 'tasks', {COUNT_COLUMNS} FROM tasks")
+    op.execute(
+        f"INSERT INTO task_counters ({columns}) "
+        f"SELECT 'tasks:owner:' || owner_id, {COUNT_COLUMNS} FROM tasks GROUP BY owner_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('task_counters')
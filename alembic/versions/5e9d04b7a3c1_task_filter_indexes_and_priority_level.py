@@ -0,0 +1,57 @@
+"""task filter indexes and priority level
+
+Revision ID: 5e9d04b7a3c1
+Revises: c47e2b815a6d
+Create Date: 2026-10-18 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9d04b7a3c1'
+down_revision: Union[str, Sequence[str], None] = 'c47e2b815a6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # priority: free-form string -> SMALLINT level (1 = low, 2 = medium, 3 = high)
+    op.add_column('tasks', sa.Column('priority_level', sa.SmallInteger(), nullable=True))
+    op.execute(
+        "UPDATE tasks SET priority_level = CASE priority "
+        "WHEN 'low' THEN 1 WHEN 'high' THEN 3 ELSE 2 END"
+    )
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('priority')
+        batch_op.alter_column(
+            'priority_level',
+            new_column_name='priority',
+            existing_type=sa.SmallInteger(),
+            nullable=False,
+            server_default='2'
+        )
+    
+    op.create_index('ix_tasks_owner_completed_due', 'tasks', ['owner_id', 'is_completed', 'due_date'], unique=False)
+    op.create_index('ix_tasks_owner_priority', 'tasks', ['owner_id', 'priority'], unique=False)
+    op.create_index(op.f('ix_tasks_due_date'), 'tasks', ['due_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tasks_due_date'), table_name='tasks')
+    op.drop_index('ix_tasks_owner_priority', table_name='tasks')
+    op.drop_index('ix_tasks_owner_completed_due', table_name='tasks')
+    
+    op.add_column('tasks', sa.Column('priority_name', sa.String(), nullable=True))
+    op.execute(
+        "UPDATE tasks SET priority_name = CASE priority "
+        "WHEN 1 THEN 'low' WHEN 3 THEN 'high' ELSE 'medium' END"
+    )
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('priority')
+        batch_op.alter_column('priority_name', new_column_name='priority', existing_type=sa.String())
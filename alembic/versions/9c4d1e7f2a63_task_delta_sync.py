@@ -0,0 +1,51 @@
+"""task delta sync
+
+Revision ID: 9c4d1e7f2a63
+Revises: 3f8c2a6d1e95
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d1e7f2a63'
+down_revision: Union[str, Sequence[str], None] = '3f8c2a6d1e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing tasks get version 0: no sync token issued so far can predate them
+    op.add_column('tasks', sa.Column('change_version', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_index('ix_tasks_change_version', 'tasks', ['change_version'], unique=False)
+    op.create_index('ix_tasks_owner_change_version', 'tasks', ['owner_id', 'change_version'], unique=False)
+    op.create_table(
+        'task_tombstones',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('change_version', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_tombstones_change_version', 'task_tombstones', ['change_version'], unique=False)
+    op.create_index('ix_task_tombstones_deleted_at', 'task_tombstones', ['deleted_at'], unique=False)
+    op.create_index(
+        'ix_task_tombstones_owner_change_version', 'task_tombstones', ['owner_id', 'change_version'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_tombstones_owner_change_version', table_name='task_tombstones')
+    op.drop_index('ix_task_tombstones_deleted_at', table_name='task_tombstones')
+    op.drop_index('ix_task_tombstones_change_version', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_index('ix_tasks_owner_change_version', table_name='tasks')
+    op.drop_index('ix_tasks_change_version', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('change_version')
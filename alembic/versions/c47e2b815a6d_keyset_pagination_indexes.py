@@ -0,0 +1,28 @@
+"""keyset pagination indexes
+
+Revision ID: c47e2b815a6d
+Revises: 8a1f3c2d9b40
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47e2b815a6d'
+down_revision: Union[str, Sequence[str], None] = '8a1f3c2d9b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_owner_id_id', 'tasks', ['owner_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_owner_id_id', table_name='tasks')
@@ -0,0 +1,33 @@
+"""owner only task versions
+
+Revision ID: e6a2c9d4b813
+Revises: 9c4d1e7f2a63
+Create Date: 2026-10-18 18:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a2c9d4b813'
+down_revision: Union[str, Sequence[str], None] = '9c4d1e7f2a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The version of all tasks is now the sum of the owner versions - the global row is no longer bumped
+    op.execute("DELETE FROM collection_versions WHERE scope = 'tasks'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Seed the global row from the owner versions it used to move with
+    op.execute(
+        "INSERT INTO collection_versions (scope, version, updated_at) "
+        "SELECT 'tasks', SUM(version), MAX(updated_at) FROM collection_versions "
+        "WHERE scope >= 'tasks:owner:' AND scope < 'tasks:owner;' HAVING COUNT(*) > 0"
+    )
@@ -0,0 +1,32 @@
+"""owner only task counters
+
+Revision ID: f1b7d3a9c254
+Revises: e6a2c9d4b813
+Create Date: 2026-10-18 19:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7d3a9c254'
+down_revision: Union[str, Sequence[str], None] = 'e6a2c9d4b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Counts of all tasks are now summed over the owner rows - the global row is no longer updated
+    op.execute("DELETE FROM task_counters WHERE scope = 'tasks'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Seed the global row from the owner rows it used to move with
+    op.execute(
+        "INSERT INTO task_counters (scope, total, completed, priority_low, priority_medium, priority_high) "
+        "SELECT 'tasks', SUM(total), SUM(completed), SUM(priority_low), SUM(priority_medium), SUM(priority_high) "
+        "FROM task_counters WHERE scope >= 'tasks:owner:' AND scope < 'tasks:owner;' HAVING COUNT(*) > 0"
+    )
@@ -0,0 +1,121 @@
+"""
+Shared API dependencies
+"""
+
+import inspect
+import time
+from typing import Any, Callable, List, Optional, Union
+
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
+from app.core.pagination import decode_cursor
+from app.core.serialization import parse_fields
+from app.core.security import decode_access_token
+from app.core.sync import SyncToken, decode_sync_token
+from app.schemas.task import Task
+from app.schemas.user import User
+from app.services.task_service import AsyncTaskService, TaskService
+from app.services.user_service import AsyncUserService, UserService
+
+# Session dependency for the configured database mode
+get_session = get_async_db if settings.DATABASE_ASYNC else get_db
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
+
+
+def get_task_service(db=Depends(get_session)) -> Union[TaskService, AsyncTaskService]:
+    """Dependency to get the task service for the configured database mode"""
+    if settings.DATABASE_ASYNC:
+        return AsyncTaskService(db)
+    return TaskService(db)
+
+
+def get_user_service(db=Depends(get_session)) -> Union[UserService, AsyncUserService]:
+    """Dependency to get the user service for the configured database mode"""
+    if settings.DATABASE_ASYNC:
+        return AsyncUserService(db)
+    return UserService(db)
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    user_service=Depends(get_user_service)
+) -> User:
+    """Dependency to resolve the active user behind a bearer token"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = decode_access_token(token)
+    if payload is None:
+        raise credentials_exception
+    try:
+        user_id = int(payload["sub"])
+    except (TypeError, ValueError):
+        raise credentials_exception
+    user = await run_service(user_service.get_active_user, user_id)
+    if user is None:
+        raise credentials_exception
+    return user
+
+
+def get_cursor(
+    after: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header")
+) -> Optional[int]:
+    """Dependency to decode the keyset pagination cursor"""
+    if after is None:
+        return None
+    try:
+        return decode_cursor(after)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def get_sync_token(
+    since: Optional[str] = Query(None, description="Token from the previous sync - omit for a full sync")
+) -> Optional[SyncToken]:
+    """Dependency to decode a delta sync token, rejecting tokens older than the tombstone retention"""
+    if since is None:
+        return None
+    try:
+        token = decode_sync_token(since)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+    if token.issued_at < time.time() - settings.TASK_TOMBSTONE_RETENTION_DAYS * 86400:
+        # Deletions since then may have been purged - only a full sync is correct
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired, sync again without since"
+        )
+    return token
+
+
+def get_task_fields(
+    fields: Optional[str] = Query(None, description="Comma-separated task fields to return - id is always included")
+) -> Optional[List[str]]:
+    """Dependency to parse a sparse task fieldset"""
+    try:
+        return parse_fields(fields, Task)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+
+async def run_service(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await an async service method, or run a sync one on the thread pool"""
+    if inspect.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    return await run_in_threadpool(func, *args, **kwargs)
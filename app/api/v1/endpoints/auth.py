@@ -0,0 +1,33 @@
+"""
+Authentication endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app.api.deps import get_user_service, run_service
+from app.core.security import create_access_token
+from app.schemas.token import Token
+
+router = APIRouter()
+
+
+@router.post("/token", response_model=Token)
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    user_service=Depends(get_user_service)
+):
+    """Exchange email and password for an access token"""
+    user = await run_service(user_service.authenticate, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return Token(access_token=create_access_token({"sub": str(user.id)}))
@@ -2,63 +2,240 @@
 Task management endpoints
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.core.database import get_db
-from app.schemas.task import Task, TaskCreate, TaskUpdate
-from app.services.task_service import TaskService
+from app.api.deps import (
+    get_cursor,
+    get_sync_token,
+    get_task_fields,
+    get_task_service,
+    get_user_service,
+    run_service,
+)
+from app.core.conditional import (
+    collection_validators,
+    entity_validators,
+    is_not_modified,
+    not_modified,
+    set_validators,
+)
+from app.core.config import settings
+from app.core.events import event_stream, task_events
+from app.core.export import ExportFormat
+from app.core.pagination import set_next_cursor
+from app.core.serialization import rows_response
+from app.core.sync import SyncToken
+from app.schemas.task import (
+    Task,
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkDeleteResult,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskExpand,
+    TaskFilter,
+    TaskSort,
+    TaskStats,
+    TaskSyncResult,
+    TaskUpdate,
+    TaskWithOwner,
+)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Task])
-def get_tasks(
+@router.get("/", response_model=List[TaskWithOwner])
+async def get_tasks(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    after: Optional[int] = Depends(get_cursor),
+    filters: TaskFilter = Depends(),
+    sort: TaskSort = TaskSort.ID,
+    fields: Optional[List[str]] = Depends(get_task_fields),
+    expand: List[TaskExpand] = Query([]),
+    task_service=Depends(get_task_service),
+    user_service=Depends(get_user_service)
 ):
-    """Get all tasks with pagination"""
-    task_service = TaskService(db)
-    return task_service.get_tasks(skip=skip, limit=limit)
+    """Get tasks with filtering, sorting, sparse fields, expansions and offset or cursor pagination"""
+    if after is not None and not sort.is_keyset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is only supported when sorting by id"
+        )
+    # The version is read before the rows, so a concurrent write can only make the ETag stale, never wrong
+    version = await run_service(task_service.get_collection_version, filters.owner_id)
+    related = [await run_service(user_service.get_collection_version)] if TaskExpand.OWNER in expand else []
+    etag, last_modified = collection_validators(version, request, *related)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    
+    tasks = await run_service(
+        task_service.get_tasks,
+        skip=skip, limit=limit, after=after, filters=filters, sort=sort, fields=fields, expand=expand
+    )
+    if sort.is_keyset:
+        set_next_cursor(response, tasks, limit)
+    set_validators(response, etag, last_modified)
+    return rows_response(tasks, response)
+
+
+@router.get("/stats", response_model=TaskStats)
+async def get_task_stats(task_service=Depends(get_task_service)):
+    """Get task counts: total, completed, open, overdue and per priority"""
+    return await run_service(task_service.get_stats)
+
+
+@router.get("/search", response_model=List[Task])
+async def search_tasks(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=256, description="Words to find in task titles and descriptions"),
+    skip: int = 0,
+    limit: int = 100,
+    filters: TaskFilter = Depends(),
+    fields: Optional[List[str]] = Depends(get_task_fields),
+    task_service=Depends(get_task_service)
+):
+    """Full-text search tasks, best matches first, with offset pagination"""
+    version = await run_service(task_service.get_collection_version, filters.owner_id)
+    etag, last_modified = collection_validators(version, request)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    
+    tasks = await run_service(
+        task_service.search_tasks, q, skip=skip, limit=limit, filters=filters, fields=fields
+    )
+    set_validators(response, etag, last_modified)
+    return rows_response(tasks, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    filters: TaskFilter = Depends(),
+    format: ExportFormat = ExportFormat.NDJSON,
+    task_service=Depends(get_task_service)
+):
+    """Stream all matching tasks as NDJSON or CSV"""
+    return StreamingResponse(
+        task_service.export_tasks(filters, format),
+        media_type=format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format.value}"'}
+    )
+
+
+@router.get("/sync", response_model=TaskSyncResult)
+async def sync_tasks(
+    owner_id: Optional[int] = None,
+    since: Optional[SyncToken] = Depends(get_sync_token),
+    task_service=Depends(get_task_service)
+):
+    """Get the tasks created or updated since a sync token, the IDs deleted since, and the next token"""
+    return await run_service(task_service.sync_tasks, since, owner_id=owner_id)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_tasks(
+    owner_id: Optional[int] = None,
+    last_event_id: Optional[str] = Query(None, description="Resume point for clients that cannot set the header"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """Stream task create/update/delete events as Server-Sent Events"""
+    return StreamingResponse(
+        event_stream(
+            task_events, owner_id, last_event_id_header or last_event_id, settings.EVENTS_HEARTBEAT_SECONDS
+        ),
+        media_type="text/event-stream",
+        # X-Accel-Buffering stops nginx from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/{task_id}", response_model=Task)
-def get_task(
+async def get_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    task_service=Depends(get_task_service)
 ):
     """Get a specific task by ID"""
-    task_service = TaskService(db)
-    task = task_service.get_task(task_id)
+    task = await run_service(task_service.get_task, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
+    etag, last_modified = entity_validators(task)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    set_validators(response, etag, last_modified)
     return task
 
 
 @router.post("/", response_model=Task, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     task: TaskCreate,
-    db: Session = Depends(get_db)
+    task_service=Depends(get_task_service)
 ):
     """Create a new task"""
-    task_service = TaskService(db)
-    return task_service.create_task(task)
+    return await run_service(task_service.create_task, task)
+
+
+@router.post("/bulk", response_model=TaskBulkResult)
+async def bulk_create_tasks(
+    bulk: TaskBulkCreate,
+    task_service=Depends(get_task_service)
+):
+    """Create many tasks in one transaction, reporting per-item errors"""
+    return await run_service(task_service.bulk_create_tasks, bulk)
+
+
+@router.patch("/bulk", response_model=TaskBulkResult)
+async def bulk_update_tasks(
+    bulk: TaskBulkUpdate,
+    task_service=Depends(get_task_service)
+):
+    """Update many tasks in one transaction, reporting per-item errors"""
+    return await run_service(task_service.bulk_update_tasks, bulk)
+
+
+@router.delete("/bulk", response_model=TaskBulkDeleteResult)
+async def bulk_delete_tasks(
+    bulk: TaskBulkDelete,
+    task_service=Depends(get_task_service)
+):
+    """Delete many tasks in one transaction, reporting per-item errors"""
+    return await run_service(task_service.bulk_delete_tasks, bulk)
 
 
 @router.put("/{task_id}", response_model=Task)
-def update_task(
+async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    db: Session = Depends(get_db)
+    task_service=Depends(get_task_service)
 ):
     """Update an existing task"""
-    task_service = TaskService(db)
-    task = task_service.update_task(task_id, task_update)
+    task = await run_service(task_service.update_task, task_id, task_update)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    return task
+
+
+@router.patch("/{task_id}", response_model=Task)
+async def patch_task(
+    task_id: int,
+    task_update: TaskUpdate,
+    task_service=Depends(get_task_service)
+):
+    """Partially update a task with a single UPDATE ... RETURNING"""
+    task = await run_service(task_service.update_task, task_id, task_update)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,13 +245,12 @@ def update_task(
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    task_service=Depends(get_task_service)
 ):
     """Delete a task"""
-    task_service = TaskService(db)
-    success = task_service.delete_task(task_id)
+    success = await run_service(task_service.delete_task, task_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
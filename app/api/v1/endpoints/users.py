@@ -2,63 +2,154 @@
 User management endpoints
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
-from app.core.database import get_db
+from app.api.deps import (
+    get_current_user,
+    get_cursor,
+    get_task_fields,
+    get_task_service,
+    get_user_service,
+    run_service,
+)
+from app.core.conditional import (
+    collection_validators,
+    entity_validators,
+    is_not_modified,
+    not_modified,
+    set_validators,
+)
+from app.core.pagination import set_next_cursor
+from app.core.serialization import rows_response
+from app.schemas.task import Task, TaskStats
 from app.schemas.user import User, UserCreate, UserUpdate
-from app.services.user_service import UserService
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[User])
-def get_users(
+async def get_users(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    after: Optional[int] = Depends(get_cursor),
+    user_service=Depends(get_user_service)
 ):
-    """Get all users with pagination"""
-    user_service = UserService(db)
-    return user_service.get_users(skip=skip, limit=limit)
+    """Get all users with offset or cursor pagination"""
+    version = await run_service(user_service.get_collection_version)
+    etag, last_modified = collection_validators(version, request)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    
+    users = await run_service(user_service.get_users, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, users, limit)
+    set_validators(response, etag, last_modified)
+    return rows_response(users, response)
+
+
+@router.get("/me", response_model=User)
+async def get_me(current_user: User = Depends(get_current_user)):
+    """Get the authenticated user"""
+    return current_user
 
 
 @router.get("/{user_id}", response_model=User)
-def get_user(
+async def get_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    user_service=Depends(get_user_service)
 ):
     """Get a specific user by ID"""
-    user_service = UserService(db)
-    user = user_service.get_user(user_id)
+    user = await run_service(user_service.get_user, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    etag, last_modified = entity_validators(user)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    set_validators(response, etag, last_modified)
     return user
 
 
+@router.get("/{user_id}/stats", response_model=TaskStats)
+async def get_user_stats(
+    user_id: int,
+    user_service=Depends(get_user_service),
+    task_service=Depends(get_task_service)
+):
+    """Get a user's task counts: total, completed, open, overdue and per priority"""
+    user = await run_service(user_service.get_user, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return await run_service(task_service.get_stats, user_id)
+
+
+@router.get("/{user_id}/tasks", response_model=List[Task])
+async def get_user_tasks(
+    user_id: int,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = Depends(get_cursor),
+    fields: Optional[List[str]] = Depends(get_task_fields),
+    task_service=Depends(get_task_service)
+):
+    """Get the tasks of a user with sparse fields and offset or cursor pagination"""
+    version = await run_service(task_service.get_collection_version, user_id)
+    etag, last_modified = collection_validators(version, request)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    
+    tasks = await run_service(
+        task_service.get_tasks_by_user, user_id, skip=skip, limit=limit, after=after, fields=fields
+    )
+    set_next_cursor(response, tasks, limit)
+    set_validators(response, etag, last_modified)
+    return rows_response(tasks, response)
+
+
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
     user: UserCreate,
-    db: Session = Depends(get_db)
+    user_service=Depends(get_user_service)
 ):
     """Create a new user"""
-    user_service = UserService(db)
-    return user_service.create_user(user)
+    return await run_service(user_service.create_user, user)
 
 
 @router.put("/{user_id}", response_model=User)
-def update_user(
+async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    db: Session = Depends(get_db)
+    user_service=Depends(get_user_service)
 ):
     """Update an existing user"""
-    user_service = UserService(db)
-    user = user_service.update_user(user_id, user_update)
+    user = await run_service(user_service.update_user, user_id, user_update)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+
+@router.patch("/{user_id}", response_model=User)
+async def patch_user(
+    user_id: int,
+    user_update: UserUpdate,
+    user_service=Depends(get_user_service)
+):
+    """Partially update a user with a single UPDATE ... RETURNING"""
+    user = await run_service(user_service.update_user, user_id, user_update)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -67,15 +158,23 @@ def update_user(
     return user
 
 
-@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+@router.delete(
+    "/{user_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_409_CONFLICT: {"description": "The user still owns tasks"}}
+)
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    user_service=Depends(get_user_service)
 ):
-    """Delete a user"""
-    user_service = UserService(db)
-    success = user_service.delete_user(user_id)
+    """Delete a user - 409 while the user still owns tasks, which must be deleted first"""
+    success = await run_service(user_service.delete_user, user_id)
     if not success:
+        if await run_service(user_service.owns_tasks, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="User still owns tasks"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
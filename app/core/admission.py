@@ -0,0 +1,188 @@
+"""
+Admission control - per-client rate limiting and a priority-aware concurrency limit
+
+The concurrency limit matches the connections the database pool can hand out, so excess
+requests wait here, in priority order, instead of in the pool's checkout queue where every
+request waits alike. A request that would wait longer than the latency budget is rejected at
+once with a Retry-After estimate. Writes may only use part of the limit and bulk writes and
+exports a smaller part, so reads keep running while heavy writes are shed. All state is per
+worker process.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from enum import IntEnum
+from typing import Deque, Dict, Optional, Tuple
+
+from app.core.config import pool_limits, settings
+
+
+class Lane(IntEnum):
+    """Request priority - lower values are admitted first"""
+    READ = 0
+    WRITE = 1
+    HEAVY = 2
+
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Never limited: probes and scrapes must keep working under load
+EXEMPT_PATHS = frozenset({"/health", "/metrics", "/admission/stats"})
+
+# Long-lived streams hold no database connection, so only the rate limit applies to them
+STREAM_PATHS = frozenset({f"{settings.API_V1_STR}/tasks/stream"})
+
+
+def request_lane(method: str, path: str) -> Optional[Lane]:
+    """Priority lane of a request, or None when it does not count against the concurrency limit"""
+    if path in STREAM_PATHS:
+        return None
+    if path.endswith("/export") or path.endswith("/bulk"):
+        return Lane.HEAVY
+    return Lane.READ if method in SAFE_METHODS else Lane.WRITE
+
+
+class RateLimiter:
+    """Token bucket per client, the least recently seen clients evicted beyond max_clients"""
+    
+    def __init__(self, rate: float, burst: int, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # Only touched from the event loop, so no lock is needed
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+    
+    def acquire(self, client: str) -> float:
+        """Take a token - returns 0 when allowed, else the seconds until a token is available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1.0 - tokens) / self.rate
+
+
+class AdmissionController:
+    """Concurrency limit with nested lane shares and a priority queue bounded by a latency budget"""
+    
+    def __init__(self, limit: int, write_share: float, heavy_share: float, max_queue_seconds: float):
+        self.limit = limit
+        # Each cap counts its lane and the lower priority lanes, so the slots above a cap are kept for
+        # higher priority requests
+        self.caps = {
+            Lane.READ: limit,
+            Lane.WRITE: max(1, int(limit * write_share)),
+            Lane.HEAVY: max(1, int(limit * heavy_share)),
+        }
+        self.max_queue_seconds = max_queue_seconds
+        self.active: Dict[Lane, int] = dict.fromkeys(Lane, 0)
+        self.rejected: Dict[Lane, int] = dict.fromkeys(Lane, 0)
+        self._waiters: Dict[Lane, Deque[asyncio.Future]] = {lane: deque() for lane in Lane}
+        # Moving average per lane of the time a request holds its slot, for queue wait estimates -
+        # an export holds its slot far longer than a lookup
+        self._service_seconds: Dict[Lane, float] = dict.fromkeys(Lane, 0.0)
+    
+    def _can_run(self, lane: Lane) -> bool:
+        # Within the cap of its own lane and of every higher priority lane, the READ cap being the limit
+        return all(
+            sum(self.active[other] for other in Lane if other >= capped) < self.caps[capped]
+            for capped in Lane if capped <= lane
+        )
+    
+    def _queued_ahead(self, lane: Lane) -> int:
+        return sum(len(self._waiters[other]) for other in Lane if other <= lane)
+    
+    def _estimated_wait(self, lane: Lane) -> float:
+        queued = sum(len(self._waiters[other]) * self._service_seconds[other] for other in Lane if other <= lane)
+        return (queued + self._service_seconds[lane]) / self.caps[lane]
+    
+    def _admit(self, lane: Lane) -> None:
+        self.active[lane] += 1
+    
+    def _reject(self, lane: Lane, estimate: float) -> float:
+        self.rejected[lane] += 1
+        return max(estimate, self.max_queue_seconds)
+    
+    async def acquire(self, lane: Lane) -> Optional[float]:
+        """Wait for a slot - returns None once admitted, else the suggested retry delay in seconds"""
+        if self._queued_ahead(lane) == 0 and self._can_run(lane):
+            self._admit(lane)
+            return None
+        estimate = self._estimated_wait(lane)
+        if estimate > self.max_queue_seconds:
+            return self._reject(lane, estimate)
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        try:
+            await asyncio.wait((waiter,), timeout=self.max_queue_seconds)
+        except asyncio.CancelledError:
+            # The client went away - give back a slot granted in the meantime
+            if waiter.done():
+                self.release(lane, 0.0)
+            else:
+                waiter.cancel()
+                self._waiters[lane].remove(waiter)
+            raise
+        if waiter.done():
+            return None
+        waiter.cancel()
+        self._waiters[lane].remove(waiter)
+        return self._reject(lane, self._estimated_wait(lane))
+    
+    def release(self, lane: Lane, elapsed: float) -> None:
+        """Free a slot and hand it to the highest priority waiter that may run"""
+        self.active[lane] -= 1
+        self._service_seconds[lane] += (elapsed - self._service_seconds[lane]) * 0.1
+        for waiting_lane in Lane:
+            waiters = self._waiters[waiting_lane]
+            while waiters and self._can_run(waiting_lane):
+                waiter = waiters.popleft()
+                self._admit(waiting_lane)
+                waiter.set_result(None)
+    
+    def get_stats(self) -> dict:
+        """Slots in use, queued and rejected requests per lane"""
+        return {
+            "limit": self.limit,
+            "lanes": {
+                lane.name.lower(): {
+                    "cap": self.caps[lane],
+                    "service_ms": round(self._service_seconds[lane] * 1000, 1),
+                    "active": self.active[lane],
+                    "queued": len(self._waiters[lane]),
+                    "rejected": self.rejected[lane],
+                }
+                for lane in Lane
+            },
+        }
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After value - whole seconds, at least 1"""
+    return str(max(1, math.ceil(seconds)))
+
+
+def build_admission_controller() -> AdmissionController:
+    """Admission controller sized to this worker's database pool, unless ADMISSION_MAX_CONCURRENCY is set"""
+    limit = settings.ADMISSION_MAX_CONCURRENCY or sum(pool_limits())
+    return AdmissionController(
+        limit, settings.ADMISSION_WRITE_SHARE, settings.ADMISSION_HEAVY_SHARE, settings.ADMISSION_MAX_QUEUE_SECONDS
+    )
+
+
+def build_rate_limiter() -> Optional[RateLimiter]:
+    """Per-client rate limiter, or None when RATE_LIMIT_PER_SECOND is not set"""
+    if not settings.RATE_LIMIT_PER_SECOND:
+        return None
+    return RateLimiter(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST, settings.RATE_LIMIT_MAX_CLIENTS)
+
+
+admission_controller = build_admission_controller()
+rate_limiter = build_rate_limiter()
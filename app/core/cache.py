@@ -0,0 +1,329 @@
+"""
+Read-through entity cache with pluggable backends
+"""
+
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Generic, Hashable, Optional, Type, TypeVar
+
+from pydantic import BaseModel, PrivateAttr
+
+from app.core.config import settings, single_worker
+
+
+
+class CachedSchema(BaseModel):
+    """Response schema that keeps the serialized form it was cached as"""
+    _cached_json: Optional[bytes] = PrivateAttr(default=None)
+    
+    def cached_json(self) -> bytes:
+        """JSON of the entity - the cached bytes when it was read through an EntityCache"""
+        if self._cached_json is None:
+            self._cached_json = self.model_dump_json().encode()
+        return self._cached_json
+
+
+SchemaT = TypeVar("SchemaT", bound=CachedSchema)
+
+
+@dataclass
+class CacheStats:
+    """Cache counters"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class CacheBackend(ABC):
+    """Key/value store for serialized entities"""
+    
+    def __init__(self):
+        self.stats = CacheStats()
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a value, or None on a miss"""
+    
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        """Store a value"""
+    
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a value"""
+    
+    # Used on the async path - in-process backends never block, network backends override these
+    async def aget(self, key: str) -> Optional[bytes]:
+        """Get a value without blocking the event loop"""
+        return self.get(key)
+    
+    async def aset(self, key: str, value: bytes) -> None:
+        """Store a value without blocking the event loop"""
+        self.set(key, value)
+    
+    async def adelete(self, key: str) -> None:
+        """Remove a value without blocking the event loop"""
+        self.delete(key)
+    
+    def get_stats(self) -> dict:
+        """Counters plus backend-specific gauges"""
+        return asdict(self.stats)
+
+
+class NullCacheBackend(CacheBackend):
+    """Backend that stores nothing - caching disabled"""
+    
+    def get(self, key: str) -> Optional[bytes]:
+        self.stats.misses += 1
+        return None
+    
+    def set(self, key: str, value: bytes) -> None:
+        pass
+    
+    def delete(self, key: str) -> None:
+        pass
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with per-entry expiry and a maximum size"""
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a value, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries beyond max_entries (0 stores nothing)"""
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+    
+    def delete(self, key: Hashable) -> None:
+        """Remove a value"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> dict:
+        """Counters plus size gauges"""
+        return {**asdict(self.stats), "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with a TTL and a maximum number of entries"""
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        super().__init__()
+        self._cache = TTLCache(max_entries, ttl_seconds)
+        self.stats = self._cache.stats
+    
+    def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+    
+    def set(self, key: str, value: bytes) -> None:
+        self._cache.set(key, value)
+    
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+    
+    def get_stats(self) -> dict:
+        return self._cache.get_stats()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-compatible backend - any client with get/set(ex=)/delete works
+    
+    The async methods use async_client (e.g. redis.asyncio) when given, and otherwise run the
+    blocking client in the default executor, so a round trip never stalls the event loop.
+    """
+    
+    def __init__(self, client: Any, ttl_seconds: float, prefix: str = "taskmanager:", async_client: Any = None):
+        super().__init__()
+        self.client = client
+        self.async_client = async_client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+    
+    def _count(self, value: Optional[bytes]) -> Optional[bytes]:
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+    
+    def get(self, key: str) -> Optional[bytes]:
+        return self._count(self.client.get(self.prefix + key))
+    
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl_seconds)))
+    
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+    
+    async def aget(self, key: str) -> Optional[bytes]:
+        if self.async_client is None:
+            return await asyncio.get_running_loop().run_in_executor(None, self.get, key)
+        return self._count(await self.async_client.get(self.prefix + key))
+    
+    async def aset(self, key: str, value: bytes) -> None:
+        if self.async_client is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.set, key, value)
+            return
+        await self.async_client.set(self.prefix + key, value, ex=max(1, int(self.ttl_seconds)))
+    
+    async def adelete(self, key: str) -> None:
+        if self.async_client is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.delete, key)
+            return
+        await self.async_client.delete(self.prefix + key)
+
+
+class EntityCache(Generic[SchemaT]):
+    """Caches entities by ID as their response schema"""
+    
+    def __init__(self, backend: CacheBackend, namespace: str, schema: Type[SchemaT], fill_delay: float = 0.0):
+        self.backend = backend
+        self.namespace = namespace
+        self.schema = schema
+        # Entities invalidated within fill_delay seconds are not cached again, since the read
+        # may have come from a replica that has not caught up with the write yet
+        self._recent_writes = TTLCache(settings.CACHE_MAX_ENTRIES, fill_delay) if fill_delay > 0 else None
+        # Write generation: bumped by every invalidation. An entity read before its last write
+        # is never cached, so a read racing a write cannot put the old value back after the
+        # write's invalidation. Generations of entities evicted from the bounded map live on
+        # in the floor, which only makes fills more conservative.
+        self._generation = 0
+        self._written: "OrderedDict[int, int]" = OrderedDict()
+        self._written_floor = 0
+        self._lock = threading.Lock()
+    
+    def _key(self, entity_id: int) -> str:
+        return f"{self.namespace}:{entity_id}"
+    
+    def _load(self, data: bytes) -> SchemaT:
+        value = self.schema.model_validate_json(data)
+        value._cached_json = data
+        return value
+    
+    def get(self, entity_id: int) -> Optional[SchemaT]:
+        """Get a cached entity, or None on a miss"""
+        data = self.backend.get(self._key(entity_id))
+        if data is None:
+            return None
+        return self._load(data)
+    
+    async def aget(self, entity_id: int) -> Optional[SchemaT]:
+        """Get a cached entity without blocking the event loop"""
+        data = await self.backend.aget(self._key(entity_id))
+        if data is None:
+            return None
+        return self._load(data)
+    
+    def set(self, entity_id: int, entity: Any, generation: int) -> SchemaT:
+        """Cache an entity (ORM object, row or schema) read at a write generation and return it as its schema"""
+        value = self.schema.model_validate(entity)
+        if self.can_fill(entity_id, generation):
+            self.backend.set(self._key(entity_id), value.cached_json())
+        return value
+    
+    async def aset(self, entity_id: int, entity: Any, generation: int) -> SchemaT:
+        """Cache an entity read at a write generation without blocking the event loop"""
+        value = self.schema.model_validate(entity)
+        if self.can_fill(entity_id, generation):
+            await self.backend.aset(self._key(entity_id), value.cached_json())
+        return value
+    
+    def generation(self) -> int:
+        """Current write generation - take it before reading an entity to cache"""
+        return self._generation
+    
+    def can_fill(self, entity_id: int, generation: int) -> bool:
+        """Whether an entity read at a write generation may be cached"""
+        with self._lock:
+            if self._written.get(entity_id, self._written_floor) > generation:
+                return False
+        return self._recent_writes is None or self._recent_writes.get(entity_id) is None
+    
+    def _mark_written(self, entity_ids: "tuple[int, ...]") -> None:
+        with self._lock:
+            for entity_id in entity_ids:
+                self._generation += 1
+                self._written[entity_id] = self._generation
+                self._written.move_to_end(entity_id)
+            while len(self._written) > settings.CACHE_MAX_ENTRIES:
+                self._written_floor = self._written.popitem(last=False)[1]
+        if self._recent_writes is not None:
+            for entity_id in entity_ids:
+                self._recent_writes.set(entity_id, True)
+    
+    def invalidate(self, *entity_ids: int) -> None:
+        """Drop cached entities"""
+        self._mark_written(entity_ids)
+        for entity_id in entity_ids:
+            self.backend.delete(self._key(entity_id))
+    
+    async def ainvalidate(self, *entity_ids: int) -> None:
+        """Drop cached entities without blocking the event loop"""
+        self._mark_written(entity_ids)
+        for entity_id in entity_ids:
+            await self.backend.adelete(self._key(entity_id))
+
+
+def replica_fill_delay() -> float:
+    """How long written entities stay out of the cache when reads may come from a replica"""
+    return settings.DATABASE_REPLICA_STICKY_SECONDS if settings.DATABASE_REPLICA_URLS else 0.0
+
+
+def build_cache_backend() -> CacheBackend:
+    """Create the cache backend configured in settings"""
+    if settings.CACHE_BACKEND == "memory":
+        if not single_worker():
+            # Another worker's writes would never invalidate this worker's entries
+            return NullCacheBackend()
+        return MemoryCacheBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+    if settings.CACHE_BACKEND == "redis":
+        import redis  # optional dependency, only needed for the redis backend
+        import redis.asyncio
+        return RedisCacheBackend(
+            redis.Redis.from_url(settings.CACHE_REDIS_URL),
+            settings.CACHE_TTL_SECONDS,
+            async_client=redis.asyncio.Redis.from_url(settings.CACHE_REDIS_URL)
+        )
+    return NullCacheBackend()
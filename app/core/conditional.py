@@ -0,0 +1,79 @@
+"""
+Conditional GET helpers - ETag / Last-Modified validators and 304 responses
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.cache import CachedSchema
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive datetimes (SQLite) as UTC"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def _etag(*parts: Any) -> str:
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:27]}"'
+
+
+def entity_validators(entity: CachedSchema) -> Tuple[str, Optional[datetime]]:
+    """Strong ETag of an entity from its cached JSON, and Last-Modified from updated_at"""
+    # Timestamps may have a resolution of a second (SQLite) - writes within it still change the ETag.
+    # Cached entities hash the bytes already held, so a 304 serializes nothing.
+    modified = _utc(entity.updated_at or entity.created_at)
+    return f'"{hashlib.sha1(entity.cached_json()).hexdigest()[:27]}"', modified
+
+
+def collection_validators(version: Any, request: Request, *related: Any) -> Tuple[str, Optional[datetime]]:
+    """ETag and Last-Modified of a listing from its collection versions and query string"""
+    versions = (version, *related)
+    numbers = [version.version if version is not None else 0 for version in versions]
+    modified = [_utc(version.updated_at) for version in versions if version is not None]
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    return _etag(*numbers, query), max(modified, default=None)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, as required for If-None-Match
+        return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = _utc(parsedate_to_datetime(if_modified_since))
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    """ETag and Last-Modified response headers"""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Response:
+    """Empty 304 response carrying the validators"""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> None:
+    """Attach the validators to a 200 response"""
+    response.headers.update(validator_headers(etag, last_modified))
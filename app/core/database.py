@@ -2,28 +2,129 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine
+import os
+from typing import Optional
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-from app.core.config import settings
+from app.core.config import pool_limits, settings
+from app.core.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
+from app.core.query_stats import instrument_queries
+from app.core.replicas import ReplicaSet, RoutingSession
+
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Derive an async driver URL from a sync database URL"""
+    scheme, _, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database dialect '{dialect}'")
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+
+def build_engine(url: str, label: str) -> Engine:
+    """Create an instrumented sync engine"""
+    pool_size, max_overflow = pool_limits()
+    # For PostgreSQL, use connection pooling and proper settings
+    connect_args = {}
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+    
+    engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        echo=settings.DB_ECHO,
+        connect_args=connect_args,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        poolclass=TimedQueuePool,
+        pool_logging_name=label
+    )
+    instrument_engine(engine, label)
+    instrument_queries(engine)
+    return engine
+
+
+def build_async_engine(url: str, label: str) -> AsyncEngine:
+    """Create an instrumented async engine"""
+    pool_size, max_overflow = pool_limits()
+    async_engine = create_async_engine(
+        url,
+        pool_pre_ping=True,
+        echo=settings.DB_ECHO,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_logging_name=label
+    )
+    instrument_engine(async_engine.sync_engine, label)
+    instrument_queries(async_engine.sync_engine)
+    return async_engine
+
+
+def build_replica_set(engines: list) -> Optional[ReplicaSet]:
+    """Replica set for the configured replicas, or None without replicas"""
+    if not engines:
+        return None
+    return ReplicaSet(engines, settings.DATABASE_REPLICA_RETRY_SECONDS)
+
 
 # Create database engine
-# For PostgreSQL, use connection pooling and proper settings
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=True,  # Set to False in production
-    connect_args=connect_args,
-    pool_size=5,  # PostgreSQL connection pool
-    max_overflow=10
-)
-
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = build_engine(settings.DATABASE_URL, "sync")
+replica_engines = [
+    build_engine(url, f"replica{index}") for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+replicas = build_replica_set(replica_engines)
+
+# Create session factory - replica reads are routed by RoutingSession
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replicas=replicas)
+
+# Async engine and session factory - only created when async mode is enabled
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_engine = build_async_engine(
+        settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL), "async"
+    )
+    async_replica_engines = [
+        build_async_engine(get_async_database_url(url), f"async_replica{index}")
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ]
+    # expire_on_commit=False: attributes must stay loaded after commit, lazy loads are not allowed
+    # The sync session does the routing, so it gets the replicas' sync engines
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        replicas=build_replica_set([replica.sync_engine for replica in async_replica_engines]),
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+def reset_pools_after_fork() -> None:
+    """Give a forked worker fresh pools - connections must never be shared across processes"""
+    for pooled_engine in (engine, *replica_engines):
+        pooled_engine.dispose(close=False)
+    for pooled_engine in (async_engine, *async_replica_engines):
+        if pooled_engine is not None:
+            pooled_engine.sync_engine.dispose(close=False)
+
+
+# Workers started by run.py are spawned and create their own engines; this covers servers that
+# fork after importing the app (e.g. gunicorn --preload)
+os.register_at_fork(after_in_child=reset_pools_after_fork)
 
 # Create base class for models
 Base = declarative_base()
@@ -36,3 +137,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,266 @@
+"""
+Task change feed - fan-out of write events to stream subscribers
+
+Services publish events after their writes commit. The broker delivers them on the event loop
+to subscribers, each with a bounded queue: a subscriber that falls behind is disconnected and
+resumes from the recent-event history with Last-Event-ID when it reconnects.
+
+The memory backend only reaches subscribers of the same process. The postgres backend sends
+every event through NOTIFY and delivers what it receives with LISTEN, so all workers see all
+events in the same order.
+"""
+
+import asyncio
+import itertools
+import logging
+import queue
+import select
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, List, Optional, Set, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.core.serialization import ORJSON_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+
+# Sent when the requested Last-Event-ID is no longer in the history - the client must refetch
+RESET_EVENT = "reset"
+
+NOTIFY_CHANNEL = "task_events"
+# NOTIFY payloads are limited to 8000 bytes - larger events only carry the task's identity
+MAX_NOTIFY_PAYLOAD = 7900
+
+
+@dataclass
+class Event:
+    """A task change"""
+    id: str
+    type: str
+    owner_id: int
+    data: dict
+    
+    def encode(self) -> bytes:
+        """Server-Sent Events wire format"""
+        return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+            self.id.encode(), self.type.encode(), orjson.dumps(self.data, option=ORJSON_OPTIONS)
+        )
+
+
+class Subscription:
+    """One stream's bounded queue of events, optionally limited to one owner's tasks"""
+    
+    def __init__(self, owner_id: Optional[int], max_queue: int):
+        self.owner_id = owner_id
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(max_queue + 1)
+        self.max_queue = max_queue
+        self.overflowed = False
+    
+    def matches(self, event: Event) -> bool:
+        return self.owner_id is None or event.owner_id == self.owner_id
+    
+    def put(self, event: Event) -> None:
+        if self.overflowed:
+            return
+        if self.queue.qsize() >= self.max_queue:
+            self.close()
+            return
+        self.queue.put_nowait(event)
+    
+    def close(self) -> None:
+        """End the stream after the events already queued"""
+        if not self.overflowed:
+            # The spare slot holds the end-of-stream marker
+            self.overflowed = True
+            self.queue.put_nowait(None)
+    
+    async def get(self) -> Optional[Event]:
+        """Next event, or None once the stream is closed"""
+        return await self.queue.get()
+
+
+class EventBroker:
+    """In-process fan-out with a bounded history for Last-Event-ID resume"""
+    
+    def __init__(self, history_size: int, max_queue: int):
+        self.max_queue = max_queue
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._subscriptions: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Unique per process, so event IDs never collide between workers
+        self._instance = uuid.uuid4().hex[:8]
+        self._counter = itertools.count(1)
+    
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Deliver events on this loop - events published before start are dropped"""
+        self._loop = loop
+    
+    def stop(self) -> None:
+        """End all streams and stop delivering events"""
+        self.close_streams()
+        self._loop = None
+    
+    def close_streams(self) -> None:
+        """End all streams - their clients reconnect, with Last-Event-ID, possibly to another worker"""
+        for subscription in list(self._subscriptions):
+            subscription.close()
+    
+    def publish(self, event_type: str, owner_id: int, data: dict) -> None:
+        """Publish an event from any thread"""
+        if self._loop is None:
+            return
+        event = Event(f"{self._instance}-{next(self._counter)}", event_type, owner_id, data)
+        self._send(event)
+    
+    def _send(self, event: Event) -> None:
+        self._loop.call_soon_threadsafe(self._dispatch, event)
+    
+    def _dispatch(self, event: Event) -> None:
+        """Record and fan out an event - runs on the event loop"""
+        self._history.append(event)
+        for subscription in self._subscriptions:
+            if subscription.matches(event):
+                subscription.put(event)
+    
+    def subscribe(self, owner_id: Optional[int], last_event_id: Optional[str]) -> Tuple[Subscription, Optional[List[Event]]]:
+        """Subscribe, returning the events missed since last_event_id - None when they are no longer known"""
+        subscription = Subscription(owner_id, self.max_queue)
+        missed: Optional[List[Event]] = []
+        if last_event_id:
+            # History order is delivery order, so resume right after the last event seen
+            ids = [event.id for event in self._history]
+            if last_event_id in ids:
+                start = ids.index(last_event_id) + 1
+                missed = [event for event in list(self._history)[start:] if subscription.matches(event)]
+            else:
+                missed = None
+        self._subscriptions.add(subscription)
+        return subscription, missed
+    
+    def last_event_id(self) -> Optional[str]:
+        """ID of the most recent event, if any is still in the history"""
+        return self._history[-1].id if self._history else None
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+    
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+    
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+
+class PostgresEventBroker(EventBroker):
+    """Broker relaying events through PostgreSQL NOTIFY/LISTEN, so every worker receives all of them"""
+    
+    def __init__(self, history_size: int, max_queue: int, database_url: str):
+        super().__init__(history_size, max_queue)
+        self.database_url = database_url
+        self._outgoing: "queue.Queue[str]" = queue.Queue()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        super().start(loop)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="task-events-listener", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        super().stop()
+    
+    def _send(self, event: Event) -> None:
+        payload = orjson.dumps(
+            {"id": event.id, "type": event.type, "owner_id": event.owner_id, "data": event.data},
+            option=ORJSON_OPTIONS
+        )
+        if len(payload) > MAX_NOTIFY_PAYLOAD:
+            data = {"id": event.data["id"], "owner_id": event.owner_id}
+            payload = orjson.dumps({"id": event.id, "type": event.type, "owner_id": event.owner_id, "data": data})
+        self._outgoing.put(payload.decode())
+    
+    def _run(self) -> None:
+        """Own one connection: LISTEN for events and NOTIFY the ones published here"""
+        import psycopg2  # only needed for the postgres backend
+        
+        while not self._stopping.is_set():
+            try:
+                connection = psycopg2.connect(self.database_url)
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    while not self._stopping.is_set():
+                        while not self._outgoing.empty():
+                            cursor.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, self._outgoing.get()))
+                        if select.select([connection], [], [], 0.05)[0]:
+                            connection.poll()
+                            while connection.notifies:
+                                self._receive(connection.notifies.pop(0).payload)
+                connection.close()
+            except Exception:
+                # Events published while disconnected are lost - subscribers recover with a reset
+                logger.exception("Task event listener failed, reconnecting")
+                self._stopping.wait(1.0)
+    
+    def _receive(self, payload: str) -> None:
+        message = orjson.loads(payload)
+        event = Event(message["id"], message["type"], message["owner_id"], message["data"])
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._dispatch, event)
+
+
+async def event_stream(
+    broker: EventBroker,
+    owner_id: Optional[int],
+    last_event_id: Optional[str],
+    heartbeat_seconds: float
+) -> AsyncIterator[bytes]:
+    """Server-Sent Events for a subscriber, starting with the events missed since last_event_id"""
+    subscription, missed = broker.subscribe(owner_id, last_event_id)
+    try:
+        if missed is None:
+            # Carries the newest ID, so the next reconnect resumes from here
+            reset_id = broker.last_event_id()
+            event_id = b"id: %s\n" % reset_id.encode() if reset_id else b""
+            yield event_id + b"event: %s\ndata: {}\n\n" % RESET_EVENT.encode()
+        else:
+            for event in missed:
+                yield event.encode()
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat_seconds)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield b": keep-alive\n\n"
+                continue
+            if event is None:
+                return
+            yield event.encode()
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def build_event_broker() -> EventBroker:
+    """Create the event broker configured in settings"""
+    if settings.EVENTS_BACKEND == "postgres":
+        return PostgresEventBroker(settings.EVENTS_HISTORY_SIZE, settings.EVENTS_QUEUE_SIZE, settings.DATABASE_URL)
+    return EventBroker(settings.EVENTS_HISTORY_SIZE, settings.EVENTS_QUEUE_SIZE)
+
+
+task_events = build_event_broker()
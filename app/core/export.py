@@ -0,0 +1,64 @@
+"""
+Streaming export encoders for NDJSON and CSV
+"""
+
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, List, Sequence
+
+from sqlalchemy import Row
+
+
+class ExportFormat(str, enum.Enum):
+    """Export file format"""
+    NDJSON = "ndjson"
+    CSV = "csv"
+    
+    @property
+    def media_type(self) -> str:
+        return EXPORT_MEDIA_TYPES[self]
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(rows: Iterable[Row]) -> bytes:
+    """Encode rows as one JSON object per line"""
+    return "".join(
+        json.dumps(row._asdict(), default=_export_value, separators=(",", ":")) + "\n"
+        for row in rows
+    ).encode()
+
+
+def encode_csv_header(columns: Sequence[str]) -> bytes:
+    """Encode the CSV header line"""
+    return encode_csv([columns])
+
+
+def encode_csv(rows: Iterable[Sequence[Any]]) -> bytes:
+    """Encode rows as CSV lines"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def encode_rows(export_format: ExportFormat, rows: List[Row]) -> bytes:
+    """Encode a batch of rows in the given format"""
+    if export_format is ExportFormat.CSV:
+        return encode_csv(rows)
+    return encode_ndjson(rows)
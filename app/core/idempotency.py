@@ -0,0 +1,203 @@
+"""
+Idempotency-Key support for retried writes
+
+Completed responses are stored with a TTL, keyed by the client's key and credentials. A retry
+with the same key replays the stored status, headers and body without running the endpoint
+again; a duplicate arriving while the first request is still running waits for it.
+
+- memory: an in-process LRU - keys are per worker process, so it only serves a single worker
+- redis: shared by every worker - a key is claimed with SET NX, duplicates poll for the response
+"""
+
+import asyncio
+import base64
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.core.cache import CacheStats, TTLCache
+from app.core.config import settings
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENT_METHODS = frozenset({"POST", "PUT", "PATCH"})
+MAX_KEY_LENGTH = 255
+
+# Store key: (hash of the credentials, Idempotency-Key)
+StoreKey = Tuple[str, str]
+
+
+@dataclass
+class StoredResponse:
+    """A completed response and the fingerprint of the request that produced it"""
+    fingerprint: str
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+def request_fingerprint(method: str, path: str, query_string: bytes, body: bytes) -> str:
+    """Hash identifying the request a key was first used with"""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query_string, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IdempotencyStore(ABC):
+    """Stored responses by key, plus the requests still in flight"""
+    
+    @abstractmethod
+    async def get(self, key: StoreKey) -> Optional[StoredResponse]:
+        """The stored response for a key, if any"""
+    
+    @abstractmethod
+    async def begin(self, key: StoreKey, fingerprint: str) -> Optional[str]:
+        """Claim a key - returns the in-flight request's fingerprint when already claimed"""
+    
+    @abstractmethod
+    async def wait(self, key: StoreKey, timeout: float) -> bool:
+        """Wait for the in-flight request of a key to finish - False on timeout"""
+    
+    @abstractmethod
+    async def finish(self, key: StoreKey, response: Optional[StoredResponse]) -> None:
+        """Release a claimed key, storing its response unless it should not be replayed"""
+    
+    @abstractmethod
+    def get_stats(self) -> dict:
+        """Stored response counters plus requests in flight"""
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """In-process store - only correct with a single worker"""
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.responses = TTLCache(max_entries, ttl_seconds)
+        # Only touched from the event loop, so no lock is needed
+        self._in_flight: Dict[StoreKey, Tuple[str, asyncio.Event]] = {}
+    
+    async def get(self, key: StoreKey) -> Optional[StoredResponse]:
+        return self.responses.get(key)
+    
+    async def begin(self, key: StoreKey, fingerprint: str) -> Optional[str]:
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            return in_flight[0]
+        self._in_flight[key] = (fingerprint, asyncio.Event())
+        return None
+    
+    async def wait(self, key: StoreKey, timeout: float) -> bool:
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            return True
+        try:
+            await asyncio.wait_for(in_flight[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+    
+    async def finish(self, key: StoreKey, response: Optional[StoredResponse]) -> None:
+        if response is not None:
+            self.responses.set(key, response)
+        _, done = self._in_flight.pop(key)
+        done.set()
+    
+    def get_stats(self) -> dict:
+        return {**self.responses.get_stats(), "in_flight": len(self._in_flight)}
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """Store shared by every worker - any asyncio Redis client with get/set(nx=, ex=)/delete works"""
+    
+    def __init__(self, client: Any, ttl_seconds: float, lock_seconds: float, poll_seconds: float = 0.05,
+                 prefix: str = "taskmanager:idempotency:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        # A claim outlives a worker that died mid-request by at most this long
+        self.lock_seconds = lock_seconds
+        self.poll_seconds = poll_seconds
+        self.prefix = prefix
+        self.stats = CacheStats()
+        self._in_flight = 0
+    
+    def _key(self, kind: str, key: StoreKey) -> str:
+        credentials, idempotency_key = key
+        return f"{self.prefix}{kind}:{credentials}:{idempotency_key}"
+    
+    async def get(self, key: StoreKey) -> Optional[StoredResponse]:
+        data = await self.client.get(self._key("response", key))
+        if data is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        stored = orjson.loads(data)
+        return StoredResponse(
+            stored["fingerprint"],
+            stored["status"],
+            [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored["headers"]],
+            base64.b64decode(stored["body"])
+        )
+    
+    async def begin(self, key: StoreKey, fingerprint: str) -> Optional[str]:
+        lock = self._key("lock", key)
+        while True:
+            if await self.client.set(lock, fingerprint, nx=True, ex=max(1, int(self.lock_seconds))):
+                self._in_flight += 1
+                return None
+            in_flight = await self.client.get(lock)
+            # Released between the two calls - try to claim it again
+            if in_flight is not None:
+                return in_flight.decode() if isinstance(in_flight, bytes) else in_flight
+    
+    async def wait(self, key: StoreKey, timeout: float) -> bool:
+        lock = self._key("lock", key)
+        deadline = asyncio.get_running_loop().time() + timeout
+        while await self.client.get(lock) is not None:
+            if asyncio.get_running_loop().time() >= deadline:
+                return False
+            await asyncio.sleep(self.poll_seconds)
+        return True
+    
+    async def finish(self, key: StoreKey, response: Optional[StoredResponse]) -> None:
+        try:
+            if response is not None:
+                data = orjson.dumps({
+                    "fingerprint": response.fingerprint,
+                    "status": response.status,
+                    "headers": [(name.decode("latin-1"), value.decode("latin-1")) for name, value in response.headers],
+                    "body": base64.b64encode(response.body).decode(),
+                })
+                await self.client.set(self._key("response", key), data, ex=max(1, int(self.ttl_seconds)))
+            await self.client.delete(self._key("lock", key))
+        finally:
+            self._in_flight -= 1
+    
+    def get_stats(self) -> dict:
+        return {**asdict(self.stats), "in_flight": self._in_flight}
+
+
+def check_idempotency_backend(workers: Optional[int]) -> None:
+    """Refuse the in-process store when several workers, or an unknown number of them, serve the app"""
+    if workers == 1 or settings.IDEMPOTENCY_BACKEND != "memory":
+        return
+    serving = f"the {workers} workers" if workers else "the workers of a process manager"
+    raise ValueError(
+        f"IDEMPOTENCY_BACKEND=memory keeps Idempotency-Keys per process, so a retry served by another of "
+        f"{serving} would run again - use IDEMPOTENCY_BACKEND=redis or SERVER_WORKERS=1"
+    )
+
+
+def build_idempotency_store() -> IdempotencyStore:
+    """Create the idempotency store configured in settings"""
+    if settings.IDEMPOTENCY_BACKEND == "redis":
+        import redis.asyncio  # optional dependency, only needed for the redis backend
+        client = redis.asyncio.Redis.from_url(settings.IDEMPOTENCY_REDIS_URL)
+        return RedisIdempotencyStore(client, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_SECONDS)
+    return MemoryIdempotencyStore(settings.IDEMPOTENCY_MAX_ENTRIES, settings.IDEMPOTENCY_TTL_SECONDS)
+
+
+idempotency_store = build_idempotency_store()
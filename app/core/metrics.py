@@ -0,0 +1,268 @@
+"""
+In-process metrics with Prometheus text exposition
+
+Writers update per-thread shards without locks; a scrape sums the shards. Values read
+during a scrape may be a few increments behind, which is fine for monitoring.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds - covers fast cached reads up to slow bcrypt and bulk requests
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+class _Shards:
+    """One value container per thread - writers never share state, readers sum all shards"""
+    
+    def __init__(self, factory: Callable[[], dict]):
+        self._factory = factory
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+    
+    def local(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._factory()
+            # Taken once per thread, never on the hot path
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+    
+    def all(self) -> List[dict]:
+        with self._lock:
+            return list(self._shards)
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(value)
+
+
+class Metric(ABC):
+    """Base class for registered metrics"""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+    
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines of every labelled series"""
+    
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonic counter"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _Shards(dict)
+    
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shards.local()
+        shard[labels] = shard.get(labels, 0) + amount
+    
+    def values(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for shard in self._shards.all():
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+    
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values().items())
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down - increments and decrements may come from different threads"""
+    
+    kind = "gauge"
+    
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class CallbackGauge(Metric):
+    """Gauge read from a callback at scrape time"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: Dict[Labels, Callable[[], float]] = {}
+    
+    def set_function(self, labels: Labels, callback: Callable[[], float]) -> None:
+        self._callbacks[labels] = callback
+    
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(callback())}"
+            for labels, callback in sorted(self._callbacks.items())
+        ]
+
+
+class Histogram(Metric):
+    """Cumulative histogram with fixed buckets"""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._shards = _Shards(dict)
+    
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shards.local()
+        state = shard.get(labels)
+        if state is None:
+            # [per-bucket counts..., +Inf count, sum]
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+    
+    def samples(self) -> List[str]:
+        merged: Dict[Labels, List[float]] = {}
+        for shard in self._shards.all():
+            for labels, state in list(shard.items()):
+                target = merged.setdefault(labels, [0] * len(state))
+                for index, value in enumerate(state):
+                    target[index] += value
+        lines = []
+        for labels, state in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), state):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics exposed together"""
+    
+    def __init__(self):
+        self._metrics: List[Metric] = []
+    
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def expose(self) -> str:
+        return "\n".join(metric.expose() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+))
+http_requests_shed_total = registry.register(Counter(
+    "http_requests_shed_total", "HTTP requests rejected by admission control", ("reason", "lane")
+))
+db_pool_size = registry.register(CallbackGauge(
+    "db_pool_size", "Configured connection pool size", ("engine",)
+))
+db_pool_checked_out = registry.register(CallbackGauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", ("engine",)
+))
+db_pool_overflow = registry.register(CallbackGauge(
+    "db_pool_overflow", "Connections open beyond pool_size (negative while the pool is not full)", ("engine",)
+))
+db_pool_checkouts_total = registry.register(Counter(
+    "db_pool_checkouts_total", "Connection checkouts from the pool", ("engine",)
+))
+db_pool_connections_created_total = registry.register(Counter(
+    "db_pool_connections_created_total", "New database connections opened by the pool", ("engine",)
+))
+db_pool_wait_seconds = registry.register(Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection", ("engine",)
+))
+password_hash_duration_seconds = registry.register(Histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time including executor queueing", ("operation",)
+))
+password_hash_pending = registry.register(CallbackGauge(
+    "password_hash_pending", "bcrypt operations queued or running"
+))
+
+
+class _TimedPoolMixin:
+    """Times waits for a pooled connection, labelled with the pool's logging name"""
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait_seconds.observe(time.perf_counter() - started, (self.logging_name or "default",))
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool reporting checkout wait time"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool reporting checkout wait time"""
+
+
+def _pool_stat(engine: Engine, name: str) -> Callable[[], float]:
+    # Looked up on every scrape, as dispose() replaces engine.pool
+    return lambda: getattr(engine.pool, name, lambda: 0)()
+
+
+def instrument_engine(engine: Engine, label: str) -> None:
+    """Export pool gauges and count checkouts and new connections with pool events"""
+    labels = (label,)
+    db_pool_size.set_function(labels, _pool_stat(engine, "size"))
+    db_pool_checked_out.set_function(labels, _pool_stat(engine, "checkedout"))
+    db_pool_overflow.set_function(labels, _pool_stat(engine, "overflow"))
+    event.listen(engine, "checkout", lambda *args: db_pool_checkouts_total.inc(labels))
+    event.listen(engine, "connect", lambda *args: db_pool_connections_created_total.inc(labels))
@@ -0,0 +1,323 @@
+"""
+ASGI middleware
+"""
+
+import hashlib
+import logging
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admission import (
+    EXEMPT_PATHS,
+    SAFE_METHODS,
+    AdmissionController,
+    RateLimiter,
+    request_lane,
+    retry_after_header,
+)
+from app.core.config import settings
+from app.core.idempotency import (
+    IDEMPOTENCY_HEADER,
+    IDEMPOTENT_METHODS,
+    MAX_KEY_LENGTH,
+    REPLAYED_HEADER,
+    IdempotencyStore,
+    StoredResponse,
+    request_fingerprint,
+)
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_shed_total,
+    http_requests_total,
+)
+from app.core.query_stats import QueryStats, current_query_stats
+from app.core.replicas import primary_reads
+from app.core.security import decode_access_token
+from app.core.serialization import ORJSONResponse
+
+logger = logging.getLogger("app.db")
+
+# Route label for requests that matched no route, so raw paths never become labels
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Cookie holding the Unix time until which the client reads from the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+class MetricsMiddleware:
+    """Records request latency and status codes per route template, and in-flight requests"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            http_requests_total.inc((scope["method"], route, str(status_code)))
+            http_request_duration_seconds.observe(elapsed, (scope["method"], route))
+
+
+class QueryStatsMiddleware:
+    """Reports per-request query count and DB time in a Server-Timing header, and flags N+1 patterns"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = QueryStats()
+        
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Covers queries up to the response headers - streamed bodies query after this
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"')
+            await send(message)
+        
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            if settings.DB_N_PLUS_ONE_DETECTION:
+                self._report_repeated(scope, stats)
+    
+    @staticmethod
+    def _report_repeated(scope: Scope, stats: QueryStats) -> None:
+        route = getattr(scope.get("route"), "path", scope["path"])
+        for statement, count in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                "n_plus_one method=%s route=%s count=%d statement=%r",
+                scope["method"], route, count, " ".join(statement.split())
+            )
+
+
+class ReadYourWritesMiddleware:
+    """Routes a client's reads to the primary while its recent writes may not have replicated yet"""
+    
+    def __init__(self, app: ASGIApp, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        writes = scope["method"] not in SAFE_METHODS
+        
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = int(time.time() + self.sticky_seconds) + 1
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={until}; Max-Age={int(self.sticky_seconds) + 1}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                MutableHeaders(scope=message).append("Set-Cookie", cookie)
+            await send(message)
+        
+        # Write requests read from the primary too, so they never act on replica data
+        token = primary_reads.set(writes or self._recently_wrote(scope))
+        try:
+            await self.app(scope, receive, send_with_cookie if writes else send)
+        finally:
+            primary_reads.reset(token)
+    
+    @staticmethod
+    def _recently_wrote(scope: Scope) -> bool:
+        cookie_header = Headers(scope=scope).get("cookie")
+        if not cookie_header:
+            return False
+        try:
+            return int(cookie_parser(cookie_header).get(READ_PRIMARY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response of a write retried with the same Idempotency-Key"""
+    
+    def __init__(self, app: ASGIApp, store: IdempotencyStore, wait_seconds: float, max_body_bytes: int):
+        self.app = app
+        self.store = store
+        self.wait_seconds = wait_seconds
+        self.max_body_bytes = max_body_bytes
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await self._error(scope, receive, send, 400, f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters")
+            return
+        
+        body = await self._read_body(receive)
+        fingerprint = request_fingerprint(scope["method"], scope["path"], scope["query_string"], body)
+        # Scoped to the credentials, so clients cannot replay each other's responses
+        credentials = hashlib.sha256(headers.get("authorization", "").encode()).hexdigest()
+        store_key = (credentials, key)
+        
+        while True:
+            stored = await self.store.get(store_key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    await self._key_reused(scope, receive, send)
+                    return
+                await self._replay(stored, send)
+                return
+            in_flight_fingerprint = await self.store.begin(store_key, fingerprint)
+            if in_flight_fingerprint is None:
+                break
+            if in_flight_fingerprint != fingerprint:
+                await self._key_reused(scope, receive, send)
+                return
+            if not await self.store.wait(store_key, self.wait_seconds):
+                await self._error(scope, receive, send, 409, "A request with this Idempotency-Key is still in progress")
+                return
+            # The first request finished: replay its response, or run again if it was not stored
+        
+        response: Optional[StoredResponse] = None
+        chunks = []
+        size = 0
+        body_replayed = False
+        
+        async def replay_receive() -> Message:
+            # The buffered body once, then the client's own messages (e.g. http.disconnect)
+            nonlocal body_replayed
+            if body_replayed:
+                return await receive()
+            body_replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        
+        async def send_and_capture(message: Message) -> None:
+            nonlocal response, size
+            if message["type"] == "http.response.start":
+                response = StoredResponse(fingerprint, message["status"], list(message.get("headers", [])), b"")
+            elif message["type"] == "http.response.body" and response is not None:
+                chunks.append(message.get("body", b""))
+                size += len(chunks[-1])
+            await send(message)
+        
+        try:
+            await self.app(scope, replay_receive, send_and_capture)
+        finally:
+            # Server errors and rate limiting are not stored, so a retry gets another chance
+            replayable = response is not None and response.status < 500 and response.status != 429
+            if replayable and size <= self.max_body_bytes:
+                response.body = b"".join(chunks)
+            else:
+                response = None
+            await self.store.finish(store_key, response)
+    
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+    
+    @staticmethod
+    async def _replay(stored: StoredResponse, send: Send) -> None:
+        headers = [*stored.headers, (REPLAYED_HEADER.lower().encode(), b"true")]
+        await send({"type": "http.response.start", "status": stored.status, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
+    
+    async def _key_reused(self, scope: Scope, receive: Receive, send: Send) -> None:
+        detail = f"{IDEMPOTENCY_HEADER} was already used with a different request"
+        await self._error(scope, receive, send, 422, detail)
+    
+    @staticmethod
+    async def _error(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str) -> None:
+        await ORJSONResponse({"detail": detail}, status_code=status_code)(scope, receive, send)
+
+
+class AdmissionControlMiddleware:
+    """Rejects requests over the client's rate limit (429) or that would queue too long for a slot (503)"""
+    
+    def __init__(self, app: ASGIApp, controller: AdmissionController, rate_limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.controller = controller
+        self.rate_limiter = rate_limiter
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        lane = request_lane(scope["method"], scope["path"])
+        lane_label = lane.name.lower() if lane is not None else "stream"
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.acquire(self._client(scope))
+            if wait:
+                http_requests_shed_total.inc(("rate_limited", lane_label))
+                await self._reject(scope, receive, send, 429, "Rate limit exceeded", wait)
+                return
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+        
+        retry_after = await self.controller.acquire(lane)
+        if retry_after is not None:
+            http_requests_shed_total.inc(("overloaded", lane_label))
+            await self._reject(scope, receive, send, 503, "Server is busy, please retry", retry_after)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(lane, time.perf_counter() - started)
+    
+    @staticmethod
+    def _client(scope: Scope) -> str:
+        # Per user when the bearer token verifies, per address otherwise - an arbitrary
+        # Authorization header must not buy a fresh bucket
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            payload = decode_access_token(token)
+            if payload is not None:
+                return f"user:{payload['sub']}"
+        client = scope.get("client")
+        return client[0] if client else ""
+    
+    @staticmethod
+    async def _reject(
+        scope: Scope, receive: Receive, send: Send, status_code: int, detail: str, retry_after: float
+    ) -> None:
+        response = ORJSONResponse(
+            {"detail": detail}, status_code=status_code, headers={"Retry-After": retry_after_header(retry_after)}
+        )
+        await response(scope, receive, send)
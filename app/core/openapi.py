@@ -0,0 +1,130 @@
+"""
+Cached OpenAPI schema
+
+FastAPI generates the schema on the first request for it, walking every route and model. With
+OPENAPI_CACHE_PATH set the schema is read from that file instead, and written to it whenever it
+has to be generated. The file is keyed by a fingerprint of the application source, the library
+versions and the signatures of the routes - paths, parameters and model fields with their
+constraints, which pick up the settings that shape the schema (e.g. BULK_MAX_ITEMS) - so a
+changed deployment regenerates it rather than serving a stale one.
+"""
+
+import enum
+import hashlib
+import logging
+import os
+import typing
+from pathlib import Path
+from typing import Any, Iterator, Optional, Set
+
+import fastapi
+import orjson
+import pydantic
+from fastapi import FastAPI
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _field_signature(name: str, field: FieldInfo) -> str:
+    # No default_factory: its repr may hold a memory address that differs between processes
+    default = None if field.default_factory is not None else field.default
+    return repr((name, field.annotation, field.alias, default, field.metadata, field.description))
+
+
+def _type_signatures(annotation: Any, seen: Set[Any]) -> Iterator[str]:
+    """Fields of the models and members of the enums an annotation refers to, nested ones included"""
+    if annotation in seen:
+        return
+    seen.add(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        yield annotation.__qualname__
+        for name, field in annotation.model_fields.items():
+            yield _field_signature(name, field)
+            yield from _type_signatures(field.annotation, seen)
+    elif isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        yield repr([member.value for member in annotation])
+    for argument in typing.get_args(annotation):
+        yield from _type_signatures(argument, seen)
+
+
+def _dependant_fields(dependant: Dependant) -> Iterator[Any]:
+    for fields in (dependant.path_params, dependant.query_params, dependant.header_params, dependant.cookie_params):
+        yield from fields
+    yield from dependant.body_params
+    for dependency in dependant.dependencies:
+        yield from _dependant_fields(dependency)
+
+
+def route_signatures(app: FastAPI) -> Iterator[str]:
+    """Path, methods, parameters and models of every route in the schema"""
+    seen: Set[Any] = set()
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or not route.include_in_schema:
+            continue
+        yield repr((route.path, sorted(route.methods), route.status_code))
+        fields = [*_dependant_fields(route.dependant), route.body_field, route.response_field]
+        for field in filter(None, fields):
+            yield _field_signature(field.name, field.field_info)
+            yield from _type_signatures(field.field_info.annotation, seen)
+
+
+def schema_fingerprint(app: FastAPI) -> str:
+    """Hash of everything the generated schema depends on"""
+    digest = hashlib.sha256()
+    parts = (fastapi.__version__, pydantic.VERSION, app.title, app.version, app.openapi_url or "")
+    for part in (*parts, *route_signatures(app)):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    for path in sorted(APP_ROOT.rglob("*.py")):
+        digest.update(path.relative_to(APP_ROOT).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_schema(path: str, fingerprint: str) -> Optional[dict]:
+    """The cached schema, or None when the file is missing, unreadable or stale"""
+    try:
+        cached = orjson.loads(Path(path).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if not isinstance(cached, dict) or cached.get("fingerprint") != fingerprint:
+        return None
+    return cached.get("schema")
+
+
+def save_schema(path: str, fingerprint: str, schema: dict) -> bool:
+    """Write the schema cache - returns False when the file cannot be written"""
+    # Written aside and renamed, so a worker starting meanwhile never reads a partial file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        Path(temporary).write_bytes(orjson.dumps({"fingerprint": fingerprint, "schema": schema}))
+        os.replace(temporary, path)
+    except OSError:
+        logger.warning("Could not write the OpenAPI schema cache to %s", path, exc_info=True)
+        Path(temporary).unlink(missing_ok=True)
+        return False
+    logger.info("Saved the OpenAPI schema cache to %s", path)
+    return True
+
+
+def install_schema_cache(app: FastAPI, path: str) -> None:
+    """Serve the app's OpenAPI schema from a cache file, generating and saving it on a miss"""
+    generate = app.openapi
+    
+    def openapi() -> dict:
+        if not app.openapi_schema:
+            fingerprint = schema_fingerprint(app)
+            schema = load_schema(path, fingerprint)
+            if schema is None:
+                schema = generate()
+                save_schema(path, fingerprint, schema)
+            app.openapi_schema = schema
+        return app.openapi_schema
+    
+    app.openapi = openapi
@@ -0,0 +1,61 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+
+import base64
+import binascii
+from typing import Optional
+
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute
+from starlette.responses import Response
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen row ID as an opaque cursor"""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode an opaque cursor back to the last seen row ID"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded).decode().partition(":")
+        if prefix != "id":
+            raise ValueError
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+
+
+def paginate(
+    stmt: Select,
+    id_column: InstrumentedAttribute,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = None,
+    descending: bool = False
+) -> Select:
+    """Apply keyset pagination when a cursor is given, offset pagination otherwise"""
+    stmt = stmt.order_by(id_column.desc() if descending else id_column).limit(limit)
+    if after is not None:
+        return stmt.where(id_column < after if descending else id_column > after)
+    return stmt.offset(skip)
+
+
+def next_cursor(items: list, limit: int) -> Optional[str]:
+    """Cursor for the page after `items`, or None when this is the last page"""
+    if limit <= 0 or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last["id"] if isinstance(last, dict) else last.id)
+
+
+def set_next_cursor(response: Response, items: list, limit: int) -> None:
+    """Expose the next page cursor on the response when there may be more rows"""
+    cursor = next_cursor(items, limit)
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
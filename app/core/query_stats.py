@@ -0,0 +1,75 @@
+"""
+Per-request database query instrumentation
+
+Cursor events time every statement. Statements executed while a request is being served
+are added to that request's QueryStats (count, DB time, repeated statements), which the
+query stats middleware reports. Slow statements are logged whether or not a request is active.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Engine, event
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db")
+
+# Key in Connection.info holding the start times of the statements in progress
+_STARTED_KEY = "query_started_at"
+
+
+@dataclass
+class QueryStats:
+    """Queries executed while serving one request"""
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least threshold times, most frequent first"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+# Set by the middleware for the duration of a request; propagates into the thread pool
+# and into async engine cursor events
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info[_STARTED_KEY].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+        if settings.DB_N_PLUS_ONE_DETECTION:
+            stats.statements[statement] += 1
+    slow_ms = settings.DB_SLOW_QUERY_MS
+    if slow_ms is not None and elapsed * 1000 >= slow_ms:
+        # Parameters are left out, they may hold personal data
+        logger.warning(
+            "slow_query duration_ms=%.1f executemany=%s statement=%r",
+            elapsed * 1000, executemany, " ".join(statement.split())
+        )
+
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_STARTED_KEY):
+        conn.info[_STARTED_KEY].pop()
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Time every statement executed on an engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
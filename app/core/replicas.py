@@ -0,0 +1,160 @@
+"""
+Read replica routing
+
+Repository read methods decorated with replica_read send their SELECTs to a replica, picked
+round-robin among the healthy ones. Everything else stays on the primary: writes, flushes,
+SELECT ... FOR UPDATE, any read after the session has written, and every read of a request
+that is pinned to the primary for read-your-writes (see ReadYourWritesMiddleware).
+"""
+
+import functools
+import inspect
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import Engine, Select, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger("app.db")
+
+# Session.info keys
+REPLICA_READ_KEY = "replica_read"
+REPLICA_KEY = "replica"
+WROTE_KEY = "wrote"
+
+# Set per request when the client wrote recently and must read from the primary
+primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping replicas ejected after connection failures"""
+    
+    def __init__(self, engines: List[Engine], retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._ejected_until: Dict[Engine, float] = {}
+        self._lock = threading.Lock()
+        for engine in engines:
+            event.listen(engine, "handle_error", self._on_error)
+    
+    def choose(self) -> Optional[Engine]:
+        """Next healthy replica, or None when all are ejected"""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._counter) % len(self.engines)]
+            # An ejected replica gets traffic again once its retry period is over
+            if self._ejected_until.get(engine, 0.0) <= now:
+                return engine
+        return None
+    
+    def eject(self, engine: Engine) -> None:
+        """Take a replica out of rotation for retry_seconds"""
+        with self._lock:
+            self._ejected_until[engine] = time.monotonic() + self.retry_seconds
+        logger.warning("replica_ejected url=%s retry_seconds=%.0f", engine.url.render_as_string(), self.retry_seconds)
+    
+    def is_ejected(self, engine: Engine) -> bool:
+        """Whether a replica is currently out of rotation"""
+        return self._ejected_until.get(engine, 0.0) > time.monotonic()
+    
+    def healthy(self) -> int:
+        """Number of replicas currently in rotation"""
+        now = time.monotonic()
+        return sum(1 for engine in self.engines if self._ejected_until.get(engine, 0.0) <= now)
+    
+    def _on_error(self, context) -> None:
+        # Failed connects and dropped connections, not SQL errors. A stale pooled connection
+        # caught by pre-ping is simply replaced, only a failed reconnect ejects the replica.
+        if context.is_pre_ping:
+            return
+        if context.connection is None or context.is_disconnect:
+            self.eject(context.engine)
+
+
+class RoutingSession(Session):
+    """Session sending replica reads to a ReplicaSet and everything else to its bind"""
+    
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replicas is not None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info[WROTE_KEY] = True
+            elif (
+                self.info.get(REPLICA_READ_KEY)
+                and isinstance(clause, Select)
+                and clause._for_update_arg is None
+                and not self.info.get(WROTE_KEY)
+                and not primary_reads.get()
+            ):
+                # One replica per session, so all reads of a request see the same point in time
+                replica = self.info.get(REPLICA_KEY)
+                if replica is None:
+                    replica = self.info[REPLICA_KEY] = self.replicas.choose()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+    
+    def drop_failed_replica(self) -> bool:
+        """Forget the session's replica if it was ejected - True when the read can be retried"""
+        replica = self.info.get(REPLICA_KEY)
+        if replica is None or not self.replicas.is_ejected(replica):
+            return False
+        del self.info[REPLICA_KEY]
+        return True
+
+
+def _can_retry(db) -> bool:
+    # AsyncSession routes through its sync session
+    session = getattr(db, "sync_session", db)
+    return isinstance(session, RoutingSession) and session.drop_failed_replica()
+
+
+def replica_read(method: Callable) -> Callable:
+    """Let a repository read method run its SELECTs on a replica
+    
+    A read failing because its replica was just ejected is retried once on another replica,
+    or on the primary when none is left.
+    """
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            # AsyncSession.info is the info of its sync session
+            info = self.db.info
+            previous = info.get(REPLICA_READ_KEY, False)
+            info[REPLICA_READ_KEY] = True
+            try:
+                try:
+                    return await method(self, *args, **kwargs)
+                except DBAPIError:
+                    if not _can_retry(self.db):
+                        raise
+                    return await method(self, *args, **kwargs)
+            finally:
+                info[REPLICA_READ_KEY] = previous
+        return async_wrapper
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        info = self.db.info
+        previous = info.get(REPLICA_READ_KEY, False)
+        info[REPLICA_READ_KEY] = True
+        try:
+            try:
+                return method(self, *args, **kwargs)
+            except DBAPIError:
+                if not _can_retry(self.db):
+                    raise
+                return method(self, *args, **kwargs)
+        finally:
+            info[REPLICA_READ_KEY] = previous
+    return wrapper
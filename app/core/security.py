@@ -2,33 +2,205 @@
 Security utilities for password hashing and JWT tokens
 """
 
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import password_hash_duration_seconds, password_hash_pending
 
-# Password hashing context
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=12
+logger = logging.getLogger(__name__)
+
+
+# passlib and jose make up most of this module's import time, so they are imported on first use
+@lru_cache(maxsize=None)
+def password_context():
+    """Password hashing context"""
+    from passlib.context import CryptContext
+    
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=12
+    )
+
+
+@lru_cache(maxsize=None)
+def _bcrypt_handler():
+    from passlib.hash import bcrypt
+    
+    return bcrypt
+
+
+class PasswordHashingBusyError(Exception):
+    """Raised when too many password hashes are already queued"""
+
+
+@lru_cache(maxsize=None)
+def _bcrypt_with_rounds(rounds: int):
+    return _bcrypt_handler().using(rounds=rounds)
+
+
+def _hash_password(password: str, rounds: int) -> str:
+    """Hash a password - module level so it can run in a process pool"""
+    return _bcrypt_with_rounds(rounds).hash(password)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password - module level so it can run in a process pool"""
+    return password_context().verify(plain_password, hashed_password)
+
+
+# Metric labels of the executor functions
+HASH_OPERATIONS = {_hash_password: "hash", _verify_password: "verify"}
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated bounded executor, off the request threads"""
+    
+    def __init__(self, rounds: int, executor: str = "thread", workers: Optional[int] = None, max_pending: int = 64):
+        self.rounds = rounds
+        self.executor_kind = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def pending(self) -> int:
+        """Hashes queued or running"""
+        return self._pending
+    
+    def _get_executor(self) -> Executor:
+        # Created lazily, so worker processes are never forked before the app server forks
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_kind == "process":
+                        from concurrent.futures import ProcessPoolExecutor
+                        
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+    
+    def _release(self, _future: Optional[Future]) -> None:
+        with self._lock:
+            self._pending -= 1
+    
+    def _submit(self, func: Callable, *args) -> Future:
+        """Queue work, or fail fast when the queue is full"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHashingBusyError("Password hashing queue is full")
+            self._pending += 1
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        labels = (HASH_OPERATIONS[func],)
+        future.add_done_callback(
+            lambda done: password_hash_duration_seconds.observe(time.perf_counter() - started, labels)
+        )
+        future.add_done_callback(self._release)
+        return future
+    
+    def hash(self, password: str) -> str:
+        """Hash a password, blocking the calling thread until done"""
+        return self._submit(_hash_password, password, self.rounds).result()
+    
+    async def hash_async(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await asyncio.wrap_future(self._submit(_hash_password, password, self.rounds))
+    
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password, blocking the calling thread until done"""
+        return self._submit(_verify_password, plain_password, hashed_password).result()
+    
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        return await asyncio.wrap_future(self._submit(_verify_password, plain_password, hashed_password))
+    
+    def needs_update(self, hashed_password: str) -> bool:
+        """Whether a hash uses a lower cost than the current one"""
+        return _bcrypt_handler().from_string(hashed_password).rounds < self.rounds
+    
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password and return a new hash when the stored cost is outdated"""
+        if not self.verify(plain_password, hashed_password):
+            return False, None
+        if self.needs_update(hashed_password):
+            return True, self.hash(plain_password)
+        return True, None
+    
+    async def verify_and_update_async(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify a password and return a new hash when the stored cost is outdated"""
+        if not await self.verify_async(plain_password, hashed_password):
+            return False, None
+        if self.needs_update(hashed_password):
+            return True, await self.hash_async(plain_password)
+        return True, None
+    
+    def calibrate(self, target_ms: float, min_rounds: int, max_rounds: int) -> int:
+        """Pick the highest cost whose hash time stays within target_ms"""
+        # Each extra round doubles the cost, so measuring at min_rounds is enough.
+        # The first hash also loads the bcrypt backend, so take the best of a few runs.
+        elapsed_ms = math.inf
+        for _ in range(3):
+            started = time.perf_counter()
+            _hash_password("calibration-password", min_rounds)
+            elapsed_ms = min(elapsed_ms, (time.perf_counter() - started) * 1000)
+        extra_rounds = math.floor(math.log2(target_ms / elapsed_ms)) if elapsed_ms < target_ms else 0
+        self.rounds = max(min_rounds, min(max_rounds, min_rounds + extra_rounds))
+        logger.info(
+            "Calibrated bcrypt cost to %d rounds (%.1f ms at %d rounds, target %.0f ms)",
+            self.rounds, elapsed_ms, min_rounds, target_ms
+        )
+        return self.rounds
+    
+    def shutdown(self) -> None:
+        """Stop the executor"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.PASSWORD_HASH_ROUNDS,
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
 )
+password_hash_pending.set_function((), lambda: password_hasher.pending)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
+    from jose import jwt
+    
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -42,8 +214,27 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def verify_token(token: str) -> Optional[dict]:
     """Verify and decode a JWT token"""
+    from jose import JWTError, jwt
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError:
         return None
+
+
+# Decoded token payloads keyed by the raw token - never kept past the token's expiry
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Verify and decode a JWT token, caching the result until it expires"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = verify_token(token)
+    if payload is None or "sub" not in payload:
+        return None
+    expires_in = payload["exp"] - time.time() if "exp" in payload else None
+    token_cache.set(token, payload, ttl_seconds=expires_in)
+    return payload
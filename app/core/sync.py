@@ -0,0 +1,46 @@
+"""
+Delta sync tokens
+
+Tokens are signed with an HMAC of SECRET_KEY, so clients cannot forge the version or the issue
+time that decides whether the deletions since then are still known.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class SyncToken:
+    """Position in the task change sequence and when it was issued (epoch seconds)"""
+    version: int
+    issued_at: int
+
+
+def _signature(payload: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def encode_sync_token(token: SyncToken) -> str:
+    """Encode a sync position as an opaque, signed token"""
+    payload = f"v:{token.version}:{token.issued_at}"
+    return base64.urlsafe_b64encode(f"{payload}:{_signature(payload)}".encode()).decode().rstrip("=")
+
+
+def decode_sync_token(value: str) -> SyncToken:
+    """Decode an opaque token back to a sync position, rejecting tokens this server did not sign"""
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        payload, _, signature = base64.urlsafe_b64decode(padded).decode().rpartition(":")
+        if not hmac.compare_digest(signature.encode(), _signature(payload).encode()):
+            raise ValueError
+        prefix, version, issued_at = payload.split(":")
+        if prefix != "v":
+            raise ValueError
+        return SyncToken(int(version), int(issued_at))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid sync token: {value!r}") from None
@@ -3,28 +3,109 @@ FastAPI Task Manager Application
 Main application entry point
 """
 
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.v1.api import api_router
-from app.core.config import settings
+from app.core.admission import admission_controller, rate_limiter
+from app.core.config import settings, worker_processes
+from app.core.events import task_events
+from app.core.metrics import CONTENT_TYPE, registry
+from app.core.idempotency import REPLAYED_HEADER, check_idempotency_backend, idempotency_store
+from app.core.middleware import (
+    AdmissionControlMiddleware,
+    IdempotencyMiddleware,
+    MetricsMiddleware,
+    QueryStatsMiddleware,
+    ReadYourWritesMiddleware,
+)
+from app.core.openapi import install_schema_cache
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import PasswordHashingBusyError, password_hasher, token_cache
+from app.core.serialization import ORJSONResponse
+from app.services.task_service import task_cache
+from app.services.user_service import principal_cache, user_cache
+
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    # Every worker checks for itself, however it was started - not only under app.server
+    check_idempotency_backend(worker_processes())
+    if settings.PASSWORD_HASH_TARGET_MS:
+        password_hasher.calibrate(
+            settings.PASSWORD_HASH_TARGET_MS,
+            settings.PASSWORD_HASH_MIN_ROUNDS,
+            settings.PASSWORD_HASH_MAX_ROUNDS
+        )
+    task_events.start(asyncio.get_running_loop())
+    yield
+    task_events.stop()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description="A modern task management API built with FastAPI",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+if settings.OPENAPI_CACHE_PATH:
+    install_schema_cache(app, settings.OPENAPI_CACHE_PATH)
+
+app.add_middleware(QueryStatsMiddleware)
+
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller, rate_limiter=rate_limiter)
+
+# Outside admission control, so a duplicate waiting on its in-flight twin holds no admission slot
+# and a replay never takes one
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    max_body_bytes=settings.IDEMPOTENCY_MAX_BODY_BYTES
+)
+
+# Outside the rest, so latency covers the whole middleware stack
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # CORS middleware - allows frontend to communicate with backend
+# Outermost, so 429/503 rejections carry CORS headers and preflights are answered before any limit
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.BACKEND_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing", REPLAYED_HEADER, "Retry-After"],
 )
 
+
+@app.exception_handler(PasswordHashingBusyError)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusyError):
+    """Shed password hashing load instead of queueing without bound"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -39,3 +120,27 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/admission/stats")
+async def admission_stats():
+    """Admission control slots, queues and rejections per priority lane"""
+    return admission_controller.get_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return Response(registry.expose(), media_type=CONTENT_TYPE)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Entity, auth and idempotency cache hit/miss/eviction counters"""
+    return {
+        "tasks": task_cache.backend.get_stats(),
+        "users": user_cache.backend.get_stats(),
+        "tokens": token_cache.get_stats(),
+        "principals": principal_cache.get_stats(),
+        "idempotency": idempotency_store.get_stats(),
+    }
@@ -1,5 +1,9 @@
 # Database models package
 from app.models.user import User
 from app.models.task import Task
+from app.models.collection_version import CollectionVersion
+from app.models.task_counter import TaskCounter
+from app.models.task_tombstone import TaskTombstone
+from app.models import task_search  # registers the dialect-specific search DDL
 
-__all__ = ["User", "Task"]
+__all__ = ["User", "Task", "CollectionVersion", "TaskCounter", "TaskTombstone"]
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""
+Collection version database model
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, String
+
+from app.core.database import Base
+
+# Version scopes - all tasks have no scope of their own, they sum the owner scopes
+USERS_SCOPE = "users"
+OWNER_TASKS_SCOPE_PREFIX = "tasks:owner:"
+
+
+def owner_tasks_scope(owner_id: int) -> str:
+    """Version scope of a single user's tasks"""
+    return f"{OWNER_TASKS_SCOPE_PREFIX}{owner_id}"
+
+
+class CollectionVersion(Base):
+    """Change counter per collection, bumped in the same transaction as every write"""
+    
+    __tablename__ = "collection_versions"
+    
+    scope = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
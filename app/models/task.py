@@ -2,29 +2,76 @@
 Task database model
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+import enum
+
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 
 from app.core.database import Base
 
 
+class TaskPriority(str, enum.Enum):
+    """Task priority"""
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+
+# Stored priority levels - ordered so that sorting by priority sorts by urgency
+PRIORITY_LEVELS = {
+    TaskPriority.LOW: 1,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.HIGH: 3,
+}
+PRIORITY_BY_LEVEL = {level: priority for priority, level in PRIORITY_LEVELS.items()}
+
+
+class PriorityType(TypeDecorator):
+    """TaskPriority stored as a SMALLINT level"""
+    
+    impl = SmallInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return PRIORITY_LEVELS[TaskPriority(value)]
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return PRIORITY_BY_LEVEL[value]
+
+
 class Task(Base):
     """Task model"""
     
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination of a user's tasks: WHERE owner_id = ? AND id > ? ORDER BY id
+        Index("ix_tasks_owner_id_id", "owner_id", "id"),
+        # Dashboard filters: open/completed tasks of a user by due date, tasks of a user by priority
+        Index("ix_tasks_owner_completed_due", "owner_id", "is_completed", "due_date"),
+        Index("ix_tasks_owner_priority", "owner_id", "priority"),
+        # Delta sync: WHERE owner_id = ? AND change_version >= ?
+        Index("ix_tasks_owner_change_version", "owner_id", "change_version"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
     is_completed = Column(Boolean, default=False)
-    priority = Column(String, default="medium")  # low, medium, high
-    due_date = Column(DateTime(timezone=True), nullable=True)
+    priority = Column(PriorityType, nullable=False, default=TaskPriority.MEDIUM, server_default="2")
+    due_date = Column(DateTime(timezone=True), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # "tasks" collection version of the last write, a commit-ordered change sequence for delta sync
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0", index=True)
     
     # Foreign key
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Relationships
-    owner = relationship("User", back_populates="tasks")
+    owner = relationship("User", back_populates="tasks")
\ No newline at end of file
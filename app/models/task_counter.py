@@ -0,0 +1,20 @@
+"""
+Task counter database model
+"""
+
+from sqlalchemy import BigInteger, Column, String
+
+from app.core.database import Base
+
+
+class TaskCounter(Base):
+    """Task counts of one owner's tasks, kept current by every task write - all tasks sum the owners"""
+    
+    __tablename__ = "task_counters"
+    
+    scope = Column(String, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    completed = Column(BigInteger, nullable=False, default=0)
+    priority_low = Column(BigInteger, nullable=False, default=0)
+    priority_medium = Column(BigInteger, nullable=False, default=0)
+    priority_high = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,61 @@
+"""
+Full-text search structures for tasks
+
+These are dialect-specific and not mapped: a generated tsvector column with a GIN index on
+PostgreSQL, an FTS5 external-content table kept in sync by triggers on SQLite. They are created
+with the tasks table (create_all) and by the matching Alembic migration.
+"""
+
+from typing import List
+
+from sqlalchemy import DDL, event
+
+from app.models.task import Task
+
+# Text search configuration used for stemming and stop words on PostgreSQL
+SEARCH_CONFIG = "english"
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_INDEX = "ix_tasks_search_vector"
+FTS_TABLE = "tasks_fts"
+
+# Matches in the title rank above matches in the description
+POSTGRES_SEARCH_DDL = [
+    f"ALTER TABLE tasks ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+    f") STORED",
+    f"CREATE INDEX {SEARCH_VECTOR_INDEX} ON tasks USING GIN ({SEARCH_VECTOR_COLUMN})",
+]
+
+SQLITE_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"title, description, content='tasks', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    f"END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) "
+    f"VALUES ('delete', old.id, old.title, old.description); "
+    f"END",
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) "
+    f"VALUES ('delete', old.id, old.title, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    f"END",
+]
+
+
+def is_search_object(name: str) -> bool:
+    """Whether a reflected table, column or index belongs to the search structures"""
+    return name in (SEARCH_VECTOR_COLUMN, SEARCH_VECTOR_INDEX) or name.startswith(FTS_TABLE)
+
+
+def _listen(event_name: str, statements: List[str], dialect: str) -> None:
+    for statement in statements:
+        event.listen(Task.__table__, event_name, DDL(statement).execute_if(dialect=dialect))
+
+
+_listen("after_create", POSTGRES_SEARCH_DDL, "postgresql")
+_listen("after_create", SQLITE_SEARCH_DDL, "sqlite")
+# Triggers go with the tasks table, the FTS table does not
+_listen("after_drop", [f"DROP TABLE IF EXISTS {FTS_TABLE}"], "sqlite")
@@ -0,0 +1,22 @@
+"""
+Task tombstone database model
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer
+
+from app.core.database import Base
+
+
+class TaskTombstone(Base):
+    """Deleted task, kept for delta sync until the retention period is over - one row per task ID"""
+    
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        # Delta sync: WHERE owner_id = ? AND change_version >= ?
+        Index("ix_task_tombstones_owner_change_version", "owner_id", "change_version"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    owner_id = Column(Integer, nullable=False)
+    change_version = Column(BigInteger, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,38 @@
+"""
+Change versions of task writes, for delta sync
+
+Every task write stamps its rows (and the tombstones of deleted rows) with a change version
+computed by the database inside the write statement itself, so no shared counter row has to be
+locked. A sync token (app/core/sync.py) holds a watermark: every write stamped below it has
+committed, writes at or above it are read again by the next sync.
+
+- PostgreSQL: the version is the writing transaction's ID and the watermark the oldest
+  transaction still running (txid_snapshot_xmin), so concurrent writers never wait on each other.
+- Other backends: the version is one more than the highest version stamped so far. SQLite runs
+  one writer at a time, so versions follow commit order; the watermark is the next version.
+"""
+
+from sqlalchemy import ColumnElement, Select, func, select
+
+from app.models.task import Task
+from app.models.task_tombstone import TaskTombstone
+
+
+def next_change_version(dialect_name: str, after: int = 0) -> ColumnElement:
+    """Change version of a task write, evaluated inside the write statement - always above `after`"""
+    if dialect_name == "postgresql":
+        return func.txid_current()
+    greatest = func.max if dialect_name == "sqlite" else func.greatest
+    # Tombstones count too: deleting the newest task must not hand its version out again
+    return greatest(
+        func.coalesce(select(func.max(Task.change_version)).scalar_subquery(), 0),
+        func.coalesce(select(func.max(TaskTombstone.change_version)).scalar_subquery(), 0),
+        after
+    ) + 1
+
+
+def build_watermark_query(dialect_name: str) -> Select:
+    """Change version below which every task write has committed"""
+    if dialect_name == "postgresql":
+        return select(func.txid_snapshot_xmin(func.txid_current_snapshot()))
+    return select(next_change_version(dialect_name))
@@ -0,0 +1,120 @@
+"""
+Collection version repository for database operations
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+from sqlalchemy import ColumnElement, Row, Select, Update, and_, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.collection_version import CollectionVersion
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def build_bump_upsert(dialect_name: str, scopes: list, now: datetime):
+    """INSERT ... ON CONFLICT statement incrementing every scope, or None if unsupported"""
+    if dialect_name not in UPSERT_INSERTS:
+        return None
+    table = CollectionVersion.__table__
+    stmt = UPSERT_INSERTS[dialect_name](table).values(
+        [{"scope": scope, "version": 1, "updated_at": now} for scope in scopes]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.scope],
+        set_={"version": table.c.version + 1, "updated_at": now}
+    )
+
+
+def scope_prefix_condition(column: ColumnElement, prefix: str) -> ColumnElement:
+    """Scopes starting with a prefix"""
+    # Range instead of LIKE, so the primary key index is used whatever the collation
+    return and_(column >= prefix, column < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+def build_total_version_query(prefix: str) -> Select:
+    """Sum of the versions of every scope starting with a prefix, and their latest update"""
+    table = CollectionVersion.__table__
+    return select(
+        func.sum(table.c.version).label("version"), func.max(table.c.updated_at).label("updated_at")
+    ).where(scope_prefix_condition(table.c.scope, prefix))
+
+
+def build_bump_update(scopes: list, now: datetime) -> Update:
+    """UPDATE incrementing existing scopes - fallback when upserts are unsupported"""
+    table = CollectionVersion.__table__
+    return (
+        update(table)
+        .where(table.c.scope.in_(scopes))
+        .values(version=table.c.version + 1, updated_at=now)
+    )
+
+
+class CollectionVersionRepository:
+    """Collection version repository for database operations"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_version(self, scope: str) -> Optional[Row]:
+        """Get the (version, updated_at) of a scope"""
+        table = CollectionVersion.__table__
+        return self.db.execute(
+            select(table.c.version, table.c.updated_at).where(table.c.scope == scope)
+        ).first()
+    
+    def get_total_version(self, prefix: str) -> Optional[Row]:
+        """Get the summed (version, updated_at) of every scope starting with a prefix"""
+        row = self.db.execute(build_total_version_query(prefix)).first()
+        return row if row.version is not None else None
+    
+    def bump(self, scopes: Iterable[str]) -> Dict[str, int]:
+        """Increment scope versions inside the caller's transaction and return them - does not commit"""
+        # Sorted so concurrent writers lock the rows in the same order
+        scopes = sorted(set(scopes))
+        if not scopes:
+            return {}
+        now = datetime.now(timezone.utc)
+        table = CollectionVersion.__table__
+        stmt = build_bump_upsert(self.db.get_bind().dialect.name, scopes, now)
+        if stmt is not None:
+            return dict(self.db.execute(stmt.returning(table.c.scope, table.c.version)).all())
+        self.db.execute(build_bump_update(scopes, now))
+        versions = dict(self.db.execute(
+            select(table.c.scope, table.c.version).where(table.c.scope.in_(scopes))
+        ).all())
+        missing = [{"scope": scope, "version": 1, "updated_at": now} for scope in scopes if scope not in versions]
+        if missing:
+            self.db.execute(table.insert(), missing)
+            versions.update((value["scope"], 1) for value in missing)
+        return versions
+
+
+class AsyncCollectionVersionRepository:
+    """Async collection version repository for database operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_version(self, scope: str) -> Optional[Row]:
+        """Get the (version, updated_at) of a scope"""
+        table = CollectionVersion.__table__
+        result = await self.db.execute(
+            select(table.c.version, table.c.updated_at).where(table.c.scope == scope)
+        )
+        return result.first()
+    
+    async def get_total_version(self, prefix: str) -> Optional[Row]:
+        """Get the summed (version, updated_at) of every scope starting with a prefix"""
+        row = (await self.db.execute(build_total_version_query(prefix))).first()
+        return row if row.version is not None else None
+    
+    async def bump(self, scopes: Iterable[str]) -> Dict[str, int]:
+        """Increment scope versions inside the caller's transaction and return them - does not commit"""
+        return await self.db.run_sync(lambda db: CollectionVersionRepository(db).bump(scopes))
@@ -0,0 +1,164 @@
+"""
+Task counter repository for database operations
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import Row, Select, case, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.collection_version import owner_tasks_scope
+from app.models.task import Task, TaskPriority
+from app.models.task_counter import TaskCounter
+from app.repositories.collection_version_repository import UPSERT_INSERTS, scope_prefix_condition
+
+COUNTER_FIELDS = ("total", "completed", "priority_low", "priority_medium", "priority_high")
+
+# Counter changes per scope: {scope: {field: delta}}
+CounterDeltas = Dict[str, Dict[str, int]]
+
+
+def counter_deltas(tasks: Iterable, sign: int = 1) -> CounterDeltas:
+    """Counter changes for adding (sign=1) or removing (sign=-1) tasks with owner_id, is_completed and priority"""
+    deltas: CounterDeltas = {}
+    for task in tasks:
+        fields = ["total", f"priority_{TaskPriority(task.priority).value}"]
+        if task.is_completed:
+            fields.append("completed")
+        # Owner scopes only: a global row updated by every task write would serialize them all
+        scope_deltas = deltas.setdefault(owner_tasks_scope(task.owner_id), dict.fromkeys(COUNTER_FIELDS, 0))
+        for field in fields:
+            scope_deltas[field] += sign
+    return deltas
+
+
+def merge_deltas(*deltas: CounterDeltas) -> CounterDeltas:
+    """Sum counter changes"""
+    merged: CounterDeltas = {}
+    for scope_deltas in deltas:
+        for scope, changes in scope_deltas.items():
+            target = merged.setdefault(scope, dict.fromkeys(COUNTER_FIELDS, 0))
+            for field, delta in changes.items():
+                target[field] += delta
+    return merged
+
+
+def _count_if(condition, label: str):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0).label(label)
+
+
+def _count_columns() -> list:
+    """Aggregates computing every counter field from the tasks table"""
+    return [
+        func.count().label("total"),
+        _count_if(Task.is_completed.is_(True), "completed"),
+        *(_count_if(Task.priority == priority, f"priority_{priority.value}") for priority in TaskPriority),
+    ]
+
+
+def build_total_counters_query(prefix: str) -> Select:
+    """Counters summed over every scope starting with a prefix"""
+    table = TaskCounter.__table__
+    return select(
+        *(func.sum(table.c[field]).label(field) for field in COUNTER_FIELDS)
+    ).where(scope_prefix_condition(table.c.scope, prefix))
+
+
+class TaskCounterRepository:
+    """Task counter repository for database operations"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_counters(self, scope: str) -> Optional[Row]:
+        """Get the counters of a scope"""
+        table = TaskCounter.__table__
+        return self.db.execute(select(*table.c).where(table.c.scope == scope)).first()
+    
+    def get_total_counters(self, prefix: str) -> Optional[Row]:
+        """Get the counters summed over every scope starting with a prefix"""
+        row = self.db.execute(build_total_counters_query(prefix)).first()
+        return row if row.total is not None else None
+    
+    def count_overdue(self, owner_id: Optional[int], now: datetime) -> int:
+        """Count open tasks past their due date - an index range scan, as this changes with time not writes"""
+        stmt = select(func.count()).select_from(Task).where(
+            Task.is_completed.is_(False), Task.due_date < now
+        )
+        if owner_id is not None:
+            stmt = stmt.where(Task.owner_id == owner_id)
+        return self.db.scalar(stmt)
+    
+    def apply(self, deltas: CounterDeltas) -> None:
+        """Add counter changes inside the caller's transaction - does not commit"""
+        # Sorted so concurrent writers lock the rows in the same order
+        changes = {scope: values for scope, values in sorted(deltas.items()) if any(values.values())}
+        if not changes:
+            return
+        table = TaskCounter.__table__
+        dialect_name = self.db.get_bind().dialect.name
+        if dialect_name in UPSERT_INSERTS:
+            stmt = UPSERT_INSERTS[dialect_name](table).values(
+                [{"scope": scope, **values} for scope, values in changes.items()]
+            )
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.scope],
+                set_={field: table.c[field] + stmt.excluded[field] for field in COUNTER_FIELDS}
+            ))
+            return
+        existing = set(self.db.scalars(select(table.c.scope).where(table.c.scope.in_(changes))))
+        for scope, values in changes.items():
+            if scope in existing:
+                self.db.execute(
+                    update(table).where(table.c.scope == scope)
+                    .values({field: table.c[field] + delta for field, delta in values.items()})
+                )
+            else:
+                self.db.execute(insert(table).values(scope=scope, **values))
+    
+    def rebuild(self) -> int:
+        """Recompute every counter from the tasks table and commit - returns the number of scopes"""
+        table = TaskCounter.__table__
+        per_owner = self.db.execute(
+            select(Task.owner_id, *_count_columns()).group_by(Task.owner_id)
+        ).all()
+        rows = [
+            {"scope": owner_tasks_scope(row.owner_id), **{field: getattr(row, field) for field in COUNTER_FIELDS}}
+            for row in per_owner
+        ]
+        self.db.execute(delete(table))
+        if rows:
+            self.db.execute(insert(table), rows)
+        self.db.commit()
+        return len(rows)
+
+
+class AsyncTaskCounterRepository:
+    """Async task counter repository for database operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_counters(self, scope: str) -> Optional[Row]:
+        """Get the counters of a scope"""
+        table = TaskCounter.__table__
+        result = await self.db.execute(select(*table.c).where(table.c.scope == scope))
+        return result.first()
+    
+    async def get_total_counters(self, prefix: str) -> Optional[Row]:
+        """Get the counters summed over every scope starting with a prefix"""
+        row = (await self.db.execute(build_total_counters_query(prefix))).first()
+        return row if row.total is not None else None
+    
+    async def count_overdue(self, owner_id: Optional[int], now: datetime) -> int:
+        """Count open tasks past their due date - an index range scan, as this changes with time not writes"""
+        return await self.db.run_sync(lambda db: TaskCounterRepository(db).count_overdue(owner_id, now))
+    
+    async def apply(self, deltas: CounterDeltas) -> None:
+        """Add counter changes inside the caller's transaction - does not commit"""
+        await self.db.run_sync(lambda db: TaskCounterRepository(db).apply(deltas))
+    
+    async def rebuild(self) -> int:
+        """Recompute every counter from the tasks table and commit - returns the number of scopes"""
+        return await self.db.run_sync(lambda db: TaskCounterRepository(db).rebuild())
@@ -2,11 +2,161 @@
 Task repository for database operations
 """
 
-from typing import List, Optional
+import re
+from datetime import datetime, timezone
+from typing import AsyncIterator, Collection, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import Row, Select, column, delete, func, insert, literal_column, or_, select, table, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.pagination import paginate
+from app.core.replicas import replica_read
+from app.core.serialization import schema_columns, select_fields
+from app.models.collection_version import OWNER_TASKS_SCOPE_PREFIX, owner_tasks_scope
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.models.task_search import FTS_TABLE, SEARCH_CONFIG, SEARCH_VECTOR_COLUMN
+from app.models.user import User
+from app.repositories.change_version import build_watermark_query, next_change_version
+from app.repositories.collection_version_repository import (
+    AsyncCollectionVersionRepository,
+    CollectionVersionRepository,
+)
+from app.repositories.task_counter_repository import (
+    AsyncTaskCounterRepository,
+    TaskCounterRepository,
+    counter_deltas,
+    merge_deltas,
+)
+from app.repositories.task_tombstone_repository import AsyncTaskTombstoneRepository, TaskTombstoneRepository
+from app.schemas.task import Task as TaskSchema
+from app.schemas.task import (
+    BulkItemError,
+    TaskBulkUpdateItem,
+    TaskCreate,
+    TaskFilter,
+    TaskSort,
+    TaskUpdate,
+)
+
+
+# Columns of list queries - exactly the fields of the task response schema
+TASK_LIST_COLUMNS = schema_columns(Task.__table__, TaskSchema)
+
+# Columns of exported tasks - every column except the delta sync bookkeeping
+TASK_EXPORT_COLUMNS = [column for column in Task.__table__.c if column.name != "change_version"]
+
+# Columns the task counters depend on, and the updatable fields among them
+COUNTED_COLUMNS = (Task.__table__.c.owner_id, Task.__table__.c.is_completed, Task.__table__.c.priority)
+COUNTED_FIELDS = {"is_completed", "priority"}
+
+# Columns of deleted tasks, for the tombstones, counters and change feed
+DELETED_COLUMNS = (Task.__table__.c.id, *COUNTED_COLUMNS, Task.__table__.c.change_version)
+
+
+def write_scopes(owner_ids: Iterable[int]) -> List[str]:
+    """Version scopes changed by writing tasks of the given owners"""
+    # Owner scopes only: a global row bumped by every task write would serialize them all.
+    # The version of all tasks is the sum of the owner versions.
+    return [owner_tasks_scope(owner_id) for owner_id in owner_ids]
+
+
+def apply_task_filters(stmt: Select, filters: Optional[TaskFilter]) -> Select:
+    """Add the WHERE clauses of a task filter to a query"""
+    if filters is None:
+        return stmt
+    if filters.owner_id is not None:
+        stmt = stmt.where(Task.owner_id == filters.owner_id)
+    if filters.is_completed is not None:
+        stmt = stmt.where(Task.is_completed == filters.is_completed)
+    if filters.priority is not None:
+        stmt = stmt.where(Task.priority == filters.priority)
+    if filters.due_after is not None:
+        stmt = stmt.where(Task.due_date >= filters.due_after)
+    if filters.due_before is not None:
+        stmt = stmt.where(Task.due_date < filters.due_before)
+    return stmt
+
+
+def build_task_list_query(
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = None,
+    filters: Optional[TaskFilter] = None,
+    sort: TaskSort = TaskSort.ID,
+    fields: Optional[Collection[str]] = None
+) -> Select:
+    """Build the filtered, sorted and paginated task listing query"""
+    stmt = apply_task_filters(select(*select_fields(TASK_LIST_COLUMNS, fields)), filters)
+    
+    if sort.is_keyset:
+        return paginate(stmt, Task.id, skip, limit, after, descending=sort.descending)
+    
+    column = getattr(Task, sort.field)
+    # Task.id breaks ties so offset pages are stable
+    return (
+        stmt.order_by(column.desc() if sort.descending else column, Task.id)
+        .offset(skip)
+        .limit(limit)
+    )
+
+
+def build_task_export_query(filters: Optional[TaskFilter], batch_size: int) -> Select:
+    """Build the column-only task export query, fetched batch_size rows at a time"""
+    stmt = apply_task_filters(select(*TASK_EXPORT_COLUMNS), filters).order_by(Task.id)
+    # yield_per implies stream_results: a server-side cursor where the driver supports one
+    return stmt.execution_options(yield_per=batch_size)
+
+
+def fts5_match_expression(q: str) -> Optional[str]:
+    """Quote each word of a search string for FTS5 MATCH, so that all words must appear"""
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+def build_task_search_query(
+    dialect: str,
+    q: str,
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[TaskFilter] = None,
+    fields: Optional[Collection[str]] = None
+) -> Optional[Select]:
+    """Build the ranked full-text search query for a dialect, or None when nothing can match"""
+    stmt = apply_task_filters(select(*select_fields(TASK_LIST_COLUMNS, fields)), filters)
+    if dialect == "postgresql":
+        # Served by the GIN index on the generated search_vector column
+        vector = literal_column(f"tasks.{SEARCH_VECTOR_COLUMN}")
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        stmt = stmt.where(vector.op("@@")(query)).order_by(func.ts_rank_cd(vector, query).desc(), Task.id)
+    elif dialect == "sqlite":
+        match = fts5_match_expression(q)
+        if match is None:
+            return None
+        fts = table(FTS_TABLE, column("rowid"))
+        # bm25 is lower for better matches; title matches weigh 10x description matches
+        stmt = (
+            stmt.join(fts, fts.c.rowid == Task.id)
+            .where(literal_column(FTS_TABLE).op("MATCH")(match))
+            .order_by(func.bm25(literal_column(FTS_TABLE), 10.0, 1.0), Task.id)
+        )
+    else:
+        # No full-text index on other backends: unranked substring match
+        stmt = stmt.where(
+            or_(Task.title.icontains(q, autoescape=True), Task.description.icontains(q, autoescape=True))
+        ).order_by(Task.id)
+    return stmt.offset(skip).limit(limit)
+
+
+def build_changes_query(since: Optional[int], owner_id: Optional[int] = None) -> Select:
+    """Tasks written at or after a change version in change order, or all tasks by ID when since is None"""
+    stmt = select(*TASK_LIST_COLUMNS)
+    if owner_id is not None:
+        stmt = stmt.where(Task.owner_id == owner_id)
+    if since is None:
+        return stmt.order_by(Task.id)
+    return stmt.where(Task.change_version >= since).order_by(Task.change_version, Task.id)
 
 
 class TaskRepository:
@@ -14,53 +164,401 @@ class TaskRepository:
     
     def __init__(self, db: Session):
         self.db = db
+        self.versions = CollectionVersionRepository(db)
+        self.counters = TaskCounterRepository(db)
+        self.tombstones = TaskTombstoneRepository(db)
+    
+    @replica_read
+    def get_collection_version(self, owner_id: Optional[int] = None) -> Optional[Row]:
+        """Get the (version, updated_at) of all tasks or of one owner's tasks"""
+        if owner_id is None:
+            return self.versions.get_total_version(OWNER_TASKS_SCOPE_PREFIX)
+        return self.versions.get_version(owner_tasks_scope(owner_id))
     
-    def get_tasks(self, skip: int = 0, limit: int = 100) -> List[Task]:
-        """Get all tasks with pagination"""
-        return self.db.query(Task).offset(skip).limit(limit).all()
+    @replica_read
+    def get_tasks(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+        filters: Optional[TaskFilter] = None,
+        sort: TaskSort = TaskSort.ID,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Get tasks with filtering, sorting and offset or keyset pagination as response-shaped rows"""
+        stmt = build_task_list_query(skip, limit, after, filters, sort, fields)
+        return list(self.db.execute(stmt))
     
+    @replica_read
+    def get_changes(self, since: Optional[int], owner_id: Optional[int] = None) -> Tuple[int, List[Row], List[int]]:
+        """Change watermark, tasks written since (all when None) and IDs deleted since"""
+        # Read first: every write below the watermark has committed, later ones may show up twice
+        watermark = self.db.scalar(build_watermark_query(self.db.get_bind().dialect.name))
+        tasks = list(self.db.execute(build_changes_query(since, owner_id)))
+        deleted = self.tombstones.get_deleted_ids(since, owner_id) if since is not None else []
+        return watermark, tasks, deleted
+    
+    @replica_read
     def get_task(self, task_id: int) -> Optional[Task]:
         """Get task by ID"""
         return self.db.query(Task).filter(Task.id == task_id).first()
     
-    def get_tasks_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Task]:
-        """Get tasks by user ID"""
-        return (
-            self.db.query(Task)
-            .filter(Task.owner_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+    @replica_read
+    def get_tasks_by_user(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Get tasks by user ID with offset or keyset pagination as response-shaped rows"""
+        stmt = select(*select_fields(TASK_LIST_COLUMNS, fields)).where(Task.owner_id == user_id)
+        return list(self.db.execute(paginate(stmt, Task.id, skip, limit, after)))
+    
+    def get_counters(self, owner_id: Optional[int] = None) -> Optional[Row]:
+        """Get the maintained counters of all tasks or of one owner's tasks"""
+        if owner_id is None:
+            return self.counters.get_total_counters(OWNER_TASKS_SCOPE_PREFIX)
+        return self.counters.get_counters(owner_tasks_scope(owner_id))
+    
+    def count_overdue(self, owner_id: Optional[int] = None) -> int:
+        """Count open tasks past their due date"""
+        return self.counters.count_overdue(owner_id, datetime.now(timezone.utc))
+    
+    def search_tasks(
+        self,
+        q: str,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TaskFilter] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Full-text search tasks by title and description, best matches first"""
+        stmt = build_task_search_query(self.db.get_bind().dialect.name, q, skip, limit, filters, fields)
+        if stmt is None:
+            return []
+        return list(self.db.execute(stmt))
+    
+    def iter_task_batches(self, filters: Optional[TaskFilter], batch_size: int) -> Iterator[List[Row]]:
+        """Stream filtered task rows in batches (no identity map)"""
+        result = self.db.execute(build_task_export_query(filters, batch_size))
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
     
     def create_task(self, task: TaskCreate) -> Task:
         """Create a new task"""
-        db_task = Task(**task.dict())
+        db_task = Task(**task.model_dump(), change_version=next_change_version(self.db.get_bind().dialect.name))
         self.db.add(db_task)
+        self.versions.bump(write_scopes([task.owner_id]))
+        self.counters.apply(counter_deltas([task]))
         self.db.commit()
         self.db.refresh(db_task)
         return db_task
     
-    def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
-        """Update an existing task"""
-        db_task = self.get_task(task_id)
-        if not db_task:
-            return None
-        
-        update_data = task_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_task, field, value)
+    def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Row]:
+        """Update an existing task with a single UPDATE ... RETURNING"""
+        table = Task.__table__
+        values = task_update.model_dump(exclude_unset=True)
+        # The previous values are only needed (and locked) when a counted field changes
+        old = None
+        if COUNTED_FIELDS & values.keys():
+            old = self.db.execute(
+                select(*COUNTED_COLUMNS).where(table.c.id == task_id).with_for_update()
+            ).first()
+        dialect = self.db.get_bind().dialect
+        stmt = update(table).where(table.c.id == task_id).values(
+            **values, change_version=next_change_version(dialect.name)
+        )
+        if dialect.update_returning:
+            row = self.db.execute(stmt.returning(*table.c)).first()
+        else:
+            updated = self.db.execute(stmt).rowcount
+            row = self.db.execute(select(*table.c).where(table.c.id == task_id)).first() if updated else None
+        if row is not None:
+            self.versions.bump(write_scopes([row.owner_id]))
+            if old is not None:
+                self.counters.apply(merge_deltas(counter_deltas([old], -1), counter_deltas([row])))
+        self.db.commit()
+        return row
+    
+    def delete_task(self, task_id: int) -> Optional[Row]:
+        """Delete a task with a single DELETE ... RETURNING, returning the deleted row"""
+        rows = self._delete_rows(Task.__table__.c.id == task_id)
+        self.db.commit()
+        return rows[0] if rows else None
+    
+    def bulk_create_tasks(self, tasks: List[TaskCreate]) -> Tuple[List[Row], List[BulkItemError]]:
+        """Create tasks in one transaction with a multi-row INSERT ... RETURNING"""
+        values = [task.model_dump() for task in tasks]
+        owner_ids = {value["owner_id"] for value in values}
+        known_owners = set(self.db.scalars(select(User.id).where(User.id.in_(owner_ids))))
         
+        errors = [
+            BulkItemError(index=index, detail="Owner not found")
+            for index, value in enumerate(values)
+            if value["owner_id"] not in known_owners
+        ]
+        values = [value for value in values if value["owner_id"] in known_owners]
+        rows = []
+        if values:
+            rows = self._insert_rows(values)
+            self.versions.bump(write_scopes({value["owner_id"] for value in values}))
+            self.counters.apply(counter_deltas(rows))
         self.db.commit()
-        self.db.refresh(db_task)
-        return db_task
+        return rows, errors
     
-    def delete_task(self, task_id: int) -> bool:
-        """Delete a task"""
-        db_task = self.get_task(task_id)
-        if not db_task:
-            return False
+    def bulk_update_tasks(self, items: List[TaskBulkUpdateItem]) -> Tuple[List[Row], List[BulkItemError]]:
+        """Update tasks in one transaction with a batched UPDATE by primary key"""
+        ids = [item.id for item in items]
+        # Stamping the change version locks the rows and returns the previous values for the counter
+        # update. The rows are locked before the version rows bumped below, the lock order of every
+        # other task write.
+        existing = {row.id: row for row in self._stamp_rows(ids)}
+        
+        errors = []
+        params = []
+        seen = set()
+        now = datetime.now(timezone.utc)
+        for index, item in enumerate(items):
+            if item.id in seen:
+                errors.append(BulkItemError(index=index, id=item.id, detail="Duplicate task id"))
+            elif item.id not in existing:
+                errors.append(BulkItemError(index=index, id=item.id, detail="Task not found"))
+            else:
+                params.append({**item.model_dump(exclude_unset=True), "updated_at": now})
+            seen.add(item.id)
         
-        self.db.delete(db_task)
+        rows = []
+        if params:
+            # ORM bulk UPDATE by primary key - one executemany per set of changed columns
+            self.db.execute(update(Task), params)
+            rows = self._select_rows([param["id"] for param in params])
+            self.versions.bump(write_scopes({row.owner_id for row in rows}))
+            self.counters.apply(merge_deltas(
+                counter_deltas((existing[row.id] for row in rows), -1), counter_deltas(rows)
+            ))
+        self.db.commit()
+        return rows, errors
+    
+    def bulk_delete_tasks(self, ids: List[int]) -> Tuple[List[Row], List[BulkItemError]]:
+        """Delete tasks in one transaction with a single DELETE ... RETURNING, returning the deleted rows"""
+        unique_ids = list(dict.fromkeys(ids))
+        deleted_rows = self._delete_rows(Task.__table__.c.id.in_(unique_ids))
         self.db.commit()
-        return True
+        
+        deleted = {row.id: row for row in deleted_rows}
+        errors = []
+        seen = set()
+        for index, task_id in enumerate(ids):
+            if task_id in seen:
+                errors.append(BulkItemError(index=index, id=task_id, detail="Duplicate task id"))
+            elif task_id not in deleted:
+                errors.append(BulkItemError(index=index, id=task_id, detail="Task not found"))
+            seen.add(task_id)
+        return [deleted[task_id] for task_id in unique_ids if task_id in deleted], errors
+    
+    def _insert_rows(self, values: List[dict]) -> List[Row]:
+        """Insert task rows and return them as plain rows (no identity map)"""
+        table = Task.__table__
+        dialect = self.db.get_bind().dialect
+        stmt = insert(table).values(change_version=next_change_version(dialect.name))
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            return list(self.db.execute(stmt.returning(*table.c, sort_by_parameter_order=True), values))
+        # Fallback for backends without multi-row RETURNING: read the new rows back in one SELECT
+        ids = [self.db.execute(stmt, value).inserted_primary_key[0] for value in values]
+        return self._select_rows(ids)
+    
+    def _stamp_rows(self, ids: List[int]) -> List[Row]:
+        """Set a new change version on tasks, locking them - returns their counted columns"""
+        table = Task.__table__
+        dialect = self.db.get_bind().dialect
+        stmt = update(table).where(table.c.id.in_(ids)).values(change_version=next_change_version(dialect.name))
+        if dialect.update_returning:
+            return self.db.execute(stmt.returning(table.c.id, *COUNTED_COLUMNS)).all()
+        rows = self.db.execute(select(table.c.id, *COUNTED_COLUMNS).where(table.c.id.in_(ids)).with_for_update()).all()
+        self.db.execute(stmt)
+        return rows
+    
+    def _delete_rows(self, condition) -> List[Row]:
+        """Delete the matching tasks with their tombstones, versions and counters - does not commit"""
+        table = Task.__table__
+        stmt = delete(table).where(condition)
+        if self.db.get_bind().dialect.delete_returning:
+            rows = self.db.execute(stmt.returning(*DELETED_COLUMNS)).all()
+        else:
+            rows = self.db.execute(select(*DELETED_COLUMNS).where(condition)).all()
+            self.db.execute(stmt)
+        if rows:
+            self.tombstones.add(rows)
+            self.versions.bump(write_scopes({row.owner_id for row in rows}))
+            self.counters.apply(counter_deltas(rows, -1))
+        return rows
+    
+    def _select_rows(self, ids: List[int]) -> List[Row]:
+        """Fetch task rows by ID as plain rows (no identity map)"""
+        table = Task.__table__
+        return list(self.db.execute(select(*table.c).where(table.c.id.in_(ids)).order_by(table.c.id)))
+
+
+class AsyncTaskRepository:
+    """Async task repository for database operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.versions = AsyncCollectionVersionRepository(db)
+        self.counters = AsyncTaskCounterRepository(db)
+        self.tombstones = AsyncTaskTombstoneRepository(db)
+    
+    @replica_read
+    async def get_collection_version(self, owner_id: Optional[int] = None) -> Optional[Row]:
+        """Get the (version, updated_at) of all tasks or of one owner's tasks"""
+        if owner_id is None:
+            return await self.versions.get_total_version(OWNER_TASKS_SCOPE_PREFIX)
+        return await self.versions.get_version(owner_tasks_scope(owner_id))
+    
+    @replica_read
+    async def get_tasks(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+        filters: Optional[TaskFilter] = None,
+        sort: TaskSort = TaskSort.ID,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Get tasks with filtering, sorting and offset or keyset pagination as response-shaped rows"""
+        result = await self.db.execute(build_task_list_query(skip, limit, after, filters, sort, fields))
+        return list(result.all())
+    
+    @replica_read
+    async def get_changes(
+        self, since: Optional[int], owner_id: Optional[int] = None
+    ) -> Tuple[int, List[Row], List[int]]:
+        """Change watermark, tasks written since (all when None) and IDs deleted since"""
+        watermark = await self.db.scalar(build_watermark_query(self.db.get_bind().dialect.name))
+        tasks = list((await self.db.execute(build_changes_query(since, owner_id))).all())
+        deleted = await self.tombstones.get_deleted_ids(since, owner_id) if since is not None else []
+        return watermark, tasks, deleted
+    
+    @replica_read
+    async def get_task(self, task_id: int) -> Optional[Task]:
+        """Get task by ID"""
+        return await self.db.scalar(select(Task).where(Task.id == task_id))
+    
+    @replica_read
+    async def get_tasks_by_user(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Get tasks by user ID with offset or keyset pagination as response-shaped rows"""
+        stmt = select(*select_fields(TASK_LIST_COLUMNS, fields)).where(Task.owner_id == user_id)
+        result = await self.db.execute(paginate(stmt, Task.id, skip, limit, after))
+        return list(result.all())
+    
+    async def get_counters(self, owner_id: Optional[int] = None) -> Optional[Row]:
+        """Get the maintained counters of all tasks or of one owner's tasks"""
+        if owner_id is None:
+            return await self.counters.get_total_counters(OWNER_TASKS_SCOPE_PREFIX)
+        return await self.counters.get_counters(owner_tasks_scope(owner_id))
+    
+    async def count_overdue(self, owner_id: Optional[int] = None) -> int:
+        """Count open tasks past their due date"""
+        return await self.counters.count_overdue(owner_id, datetime.now(timezone.utc))
+    
+    async def search_tasks(
+        self,
+        q: str,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TaskFilter] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Full-text search tasks by title and description, best matches first"""
+        stmt = build_task_search_query(self.db.get_bind().dialect.name, q, skip, limit, filters, fields)
+        if stmt is None:
+            return []
+        result = await self.db.execute(stmt)
+        return list(result.all())
+    
+    async def iter_task_batches(self, filters: Optional[TaskFilter], batch_size: int) -> AsyncIterator[List[Row]]:
+        """Stream filtered task rows in batches (no identity map)"""
+        result = await self.db.stream(build_task_export_query(filters, batch_size))
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+    
+    async def create_task(self, task: TaskCreate) -> Task:
+        """Create a new task"""
+        db_task = Task(**task.model_dump(), change_version=next_change_version(self.db.get_bind().dialect.name))
+        self.db.add(db_task)
+        await self.versions.bump(write_scopes([task.owner_id]))
+        await self.counters.apply(counter_deltas([task]))
+        await self.db.commit()
+        await self.db.refresh(db_task)
+        return db_task
+    
+    async def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Row]:
+        """Update an existing task with a single UPDATE ... RETURNING"""
+        table = Task.__table__
+        values = task_update.model_dump(exclude_unset=True)
+        # The previous values are only needed (and locked) when a counted field changes
+        old = None
+        if COUNTED_FIELDS & values.keys():
+            old = (await self.db.execute(
+                select(*COUNTED_COLUMNS).where(table.c.id == task_id).with_for_update()
+            )).first()
+        dialect = self.db.get_bind().dialect
+        stmt = update(table).where(table.c.id == task_id).values(
+            **values, change_version=next_change_version(dialect.name)
+        )
+        if dialect.update_returning:
+            row = (await self.db.execute(stmt.returning(*table.c))).first()
+        else:
+            updated = (await self.db.execute(stmt)).rowcount
+            row = (await self.db.execute(select(*table.c).where(table.c.id == task_id))).first() if updated else None
+        if row is not None:
+            await self.versions.bump(write_scopes([row.owner_id]))
+            if old is not None:
+                await self.counters.apply(merge_deltas(counter_deltas([old], -1), counter_deltas([row])))
+        await self.db.commit()
+        return row
+    
+    async def delete_task(self, task_id: int) -> Optional[Row]:
+        """Delete a task with a single DELETE ... RETURNING, returning the deleted row"""
+        table = Task.__table__
+        stmt = delete(table).where(table.c.id == task_id)
+        if self.db.get_bind().dialect.delete_returning:
+            row = (await self.db.execute(stmt.returning(*DELETED_COLUMNS))).first()
+        else:
+            row = (await self.db.execute(select(*DELETED_COLUMNS).where(table.c.id == task_id))).first()
+            await self.db.execute(stmt)
+        if row is None:
+            return None
+        await self.tombstones.add([row])
+        await self.versions.bump(write_scopes([row.owner_id]))
+        await self.counters.apply(counter_deltas([row], -1))
+        await self.db.commit()
+        return row
+    
+    # Bulk writes share the sync implementation; run_sync executes it on the async connection
+    
+    async def bulk_create_tasks(self, tasks: List[TaskCreate]) -> Tuple[List[Row], List[BulkItemError]]:
+        """Create tasks in one transaction with a multi-row INSERT ... RETURNING"""
+        return await self.db.run_sync(lambda db: TaskRepository(db).bulk_create_tasks(tasks))
+    
+    async def bulk_update_tasks(self, items: List[TaskBulkUpdateItem]) -> Tuple[List[Row], List[BulkItemError]]:
+        """Update tasks in one transaction with a batched UPDATE by primary key"""
+        return await self.db.run_sync(lambda db: TaskRepository(db).bulk_update_tasks(items))
+    
+    async def bulk_delete_tasks(self, ids: List[int]) -> Tuple[List[Row], List[BulkItemError]]:
+        """Delete tasks in one transaction with a single DELETE ... RETURNING, returning the deleted rows"""
+        return await self.db.run_sync(lambda db: TaskRepository(db).bulk_delete_tasks(ids))
@@ -0,0 +1,92 @@
+"""
+Task tombstone repository for database operations
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from sqlalchemy import Row, Select, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.task_tombstone import TaskTombstone
+from app.repositories.change_version import next_change_version
+from app.repositories.collection_version_repository import UPSERT_INSERTS
+
+# Expired tombstones are purged by the deletes themselves, at most once per interval per process
+_next_purge_at = 0.0
+
+
+def tombstone_cutoff(now: datetime) -> datetime:
+    """Tombstones older than this are purged - so are sync tokens issued before it"""
+    return now - timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+
+
+def build_deleted_ids_query(since: int, owner_id: Optional[int] = None) -> Select:
+    """IDs of tasks deleted at or after a change version"""
+    table = TaskTombstone.__table__
+    stmt = select(table.c.id).where(table.c.change_version >= since).order_by(table.c.change_version, table.c.id)
+    if owner_id is not None:
+        stmt = stmt.where(table.c.owner_id == owner_id)
+    return stmt
+
+
+class TaskTombstoneRepository:
+    """Task tombstone repository for database operations"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_deleted_ids(self, since: int, owner_id: Optional[int] = None) -> List[int]:
+        """IDs of tasks deleted at or after a change version"""
+        return list(self.db.scalars(build_deleted_ids_query(since, owner_id)))
+    
+    def add(self, rows: Iterable[Row]) -> None:
+        """Record deleted task rows (id, owner_id, change_version) inside the caller's transaction - does not commit"""
+        global _next_purge_at
+        rows = list(rows)
+        if not rows:
+            return
+        now = datetime.now(timezone.utc)
+        values = [{"id": row.id, "owner_id": row.owner_id, "deleted_at": now} for row in rows]
+        table = TaskTombstone.__table__
+        dialect_name = self.db.get_bind().dialect.name
+        change_version = next_change_version(dialect_name, after=max(row.change_version for row in rows))
+        # One tombstone per ID: an ID reused by the database replaces its older tombstone
+        if dialect_name in UPSERT_INSERTS:
+            stmt = UPSERT_INSERTS[dialect_name](table).values(change_version=change_version)
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.id],
+                set_={field: stmt.excluded[field] for field in ("owner_id", "change_version", "deleted_at")}
+            ), values)
+        else:
+            self.db.execute(delete(table).where(table.c.id.in_([value["id"] for value in values])))
+            self.db.execute(insert(table).values(change_version=change_version), values)
+        if time.monotonic() >= _next_purge_at:
+            _next_purge_at = time.monotonic() + settings.TASK_TOMBSTONE_PURGE_INTERVAL_SECONDS
+            self.purge(tombstone_cutoff(now))
+    
+    def purge(self, before: datetime) -> int:
+        """Delete tombstones older than a cutoff inside the caller's transaction - returns the number deleted"""
+        table = TaskTombstone.__table__
+        return self.db.execute(delete(table).where(table.c.deleted_at < before)).rowcount
+
+
+class AsyncTaskTombstoneRepository:
+    """Async task tombstone repository for database operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_deleted_ids(self, since: int, owner_id: Optional[int] = None) -> List[int]:
+        """IDs of tasks deleted at or after a change version"""
+        return list(await self.db.scalars(build_deleted_ids_query(since, owner_id)))
+    
+    async def add(self, rows: Iterable[Row]) -> None:
+        """Record deleted task rows (id, owner_id, change_version) inside the caller's transaction - does not commit"""
+        await self.db.run_sync(lambda db: TaskTombstoneRepository(db).add(rows))
+    
+    async def purge(self, before: datetime) -> int:
+        """Delete tombstones older than a cutoff inside the caller's transaction - returns the number deleted"""
+        return await self.db.run_sync(lambda db: TaskTombstoneRepository(db).purge(before))
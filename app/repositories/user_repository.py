@@ -2,13 +2,34 @@
 User repository for database operations
 """
 
-from typing import List, Optional
+from typing import Collection, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import Row, delete, exists, select, update
 
+from app.core.pagination import paginate
+from app.core.replicas import replica_read
+from app.core.serialization import schema_columns
+from app.models.collection_version import USERS_SCOPE
+from app.models.task import Task
 from app.models.user import User
+from app.repositories.collection_version_repository import (
+    AsyncCollectionVersionRepository,
+    CollectionVersionRepository,
+)
+from app.schemas.user import User as UserSchema
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, password_hasher
+
+
+# Columns of list queries - exactly the fields of the user response schema (never the password hash)
+USER_LIST_COLUMNS = schema_columns(User.__table__, UserSchema)
+
+
+def owned_tasks(user_id: int):
+    """EXISTS condition for tasks owned by a user - users are only deleted once they own none, since the
+    owner foreign key has no ON DELETE action and tasks must leave tombstones for delta sync"""
+    return exists().where(Task.owner_id == user_id)
 
 
 class UserRepository:
@@ -16,15 +37,32 @@ class UserRepository:
     
     def __init__(self, db: Session):
         self.db = db
+        self.versions = CollectionVersionRepository(db)
+    
+    @replica_read
+    def get_collection_version(self) -> Optional[Row]:
+        """Get the (version, updated_at) of the user collection"""
+        return self.versions.get_version(USERS_SCOPE)
+    
+    @replica_read
+    def get_users(self, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> List[Row]:
+        """Get all users with offset or keyset pagination as response-shaped rows"""
+        stmt = paginate(select(*USER_LIST_COLUMNS), User.id, skip, limit, after)
+        return list(self.db.execute(stmt))
     
-    def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        """Get all users with pagination"""
-        return self.db.query(User).offset(skip).limit(limit).all()
+    @replica_read
+    def get_users_by_ids(self, user_ids: Collection[int]) -> List[Row]:
+        """Get users by ID with a single IN query as response-shaped rows"""
+        if not user_ids:
+            return []
+        return list(self.db.execute(select(*USER_LIST_COLUMNS).where(User.id.in_(user_ids))))
     
+    @replica_read
     def get_user(self, user_id: int) -> Optional[User]:
         """Get user by ID"""
         return self.db.query(User).filter(User.id == user_id).first()
     
+    @replica_read
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         return self.db.query(User).filter(User.email == email).first()
@@ -40,33 +78,142 @@ class UserRepository:
             is_active=user.is_active
         )
         self.db.add(db_user)
+        self.versions.bump([USERS_SCOPE])
         self.db.commit()
         self.db.refresh(db_user)
         return db_user
     
-    def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
-        """Update an existing user"""
-        db_user = self.get_user(user_id)
-        if not db_user:
-            return None
-        
-        update_data = user_update.dict(exclude_unset=True)
+    def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[Row]:
+        """Update an existing user with a single UPDATE ... RETURNING"""
+        update_data = user_update.model_dump(exclude_unset=True)
         if "password" in update_data:
             update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
         
-        for field, value in update_data.items():
-            setattr(db_user, field, value)
-        
+        table = User.__table__
+        stmt = update(table).where(table.c.id == user_id).values(**update_data)
+        if self.db.get_bind().dialect.update_returning:
+            row = self.db.execute(stmt.returning(*table.c)).first()
+        else:
+            updated = self.db.execute(stmt).rowcount
+            row = self.db.execute(select(*table.c).where(table.c.id == user_id)).first() if updated else None
+        if row is not None:
+            self.versions.bump([USERS_SCOPE])
         self.db.commit()
-        self.db.refresh(db_user)
-        return db_user
+        return row
+    
+    def update_password_hash(self, user_id: int, hashed_password: str) -> None:
+        """Replace a password hash without touching updated_at (transparent rehash)"""
+        table = User.__table__
+        self.db.execute(
+            update(table)
+            .where(table.c.id == user_id)
+            .values(hashed_password=hashed_password, updated_at=table.c.updated_at)
+        )
+        self.db.commit()
+    
+    def owns_tasks(self, user_id: int) -> bool:
+        """Whether any task belongs to the user"""
+        return self.db.execute(select(owned_tasks(user_id))).scalar()
     
     def delete_user(self, user_id: int) -> bool:
-        """Delete a user"""
-        db_user = self.get_user(user_id)
-        if not db_user:
-            return False
-        
-        self.db.delete(db_user)
+        """Delete a user that owns no tasks with a single DELETE statement"""
+        table = User.__table__
+        deleted = self.db.execute(delete(table).where(table.c.id == user_id, ~owned_tasks(user_id))).rowcount
+        if deleted:
+            self.versions.bump([USERS_SCOPE])
         self.db.commit()
-        return True
+        return deleted > 0
+
+
+class AsyncUserRepository:
+    """Async user repository for database operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.versions = AsyncCollectionVersionRepository(db)
+    
+    @replica_read
+    async def get_collection_version(self) -> Optional[Row]:
+        """Get the (version, updated_at) of the user collection"""
+        return await self.versions.get_version(USERS_SCOPE)
+    
+    @replica_read
+    async def get_users(self, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> List[Row]:
+        """Get all users with offset or keyset pagination as response-shaped rows"""
+        result = await self.db.execute(paginate(select(*USER_LIST_COLUMNS), User.id, skip, limit, after))
+        return list(result.all())
+    
+    @replica_read
+    async def get_users_by_ids(self, user_ids: Collection[int]) -> List[Row]:
+        """Get users by ID with a single IN query as response-shaped rows"""
+        if not user_ids:
+            return []
+        result = await self.db.execute(select(*USER_LIST_COLUMNS).where(User.id.in_(user_ids)))
+        return list(result.all())
+    
+    @replica_read
+    async def get_user(self, user_id: int) -> Optional[User]:
+        """Get user by ID"""
+        return await self.db.scalar(select(User).where(User.id == user_id))
+    
+    @replica_read
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get user by email"""
+        return await self.db.scalar(select(User).where(User.email == email))
+    
+    async def create_user(self, user: UserCreate) -> User:
+        """Create a new user"""
+        hashed_password = await password_hasher.hash_async(user.password)
+        db_user = User(
+            email=user.email,
+            username=user.username,
+            hashed_password=hashed_password,
+            full_name=user.full_name,
+            is_active=user.is_active
+        )
+        self.db.add(db_user)
+        await self.versions.bump([USERS_SCOPE])
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        return db_user
+    
+    async def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[Row]:
+        """Update an existing user with a single UPDATE ... RETURNING"""
+        update_data = user_update.model_dump(exclude_unset=True)
+        if "password" in update_data:
+            update_data["hashed_password"] = await password_hasher.hash_async(update_data.pop("password"))
+        
+        table = User.__table__
+        stmt = update(table).where(table.c.id == user_id).values(**update_data)
+        if self.db.get_bind().dialect.update_returning:
+            row = (await self.db.execute(stmt.returning(*table.c))).first()
+        else:
+            updated = (await self.db.execute(stmt)).rowcount
+            row = (await self.db.execute(select(*table.c).where(table.c.id == user_id))).first() if updated else None
+        if row is not None:
+            await self.versions.bump([USERS_SCOPE])
+        await self.db.commit()
+        return row
+    
+    async def update_password_hash(self, user_id: int, hashed_password: str) -> None:
+        """Replace a password hash without touching updated_at (transparent rehash)"""
+        table = User.__table__
+        await self.db.execute(
+            update(table)
+            .where(table.c.id == user_id)
+            .values(hashed_password=hashed_password, updated_at=table.c.updated_at)
+        )
+        await self.db.commit()
+    
+    async def owns_tasks(self, user_id: int) -> bool:
+        """Whether any task belongs to the user"""
+        return (await self.db.execute(select(owned_tasks(user_id)))).scalar()
+    
+    async def delete_user(self, user_id: int) -> bool:
+        """Delete a user that owns no tasks with a single DELETE statement"""
+        table = User.__table__
+        deleted = (await self.db.execute(delete(table).where(table.c.id == user_id, ~owned_tasks(user_id)))).rowcount
+        if deleted:
+            await self.versions.bump([USERS_SCOPE])
+        await self.db.commit()
+        return deleted > 0
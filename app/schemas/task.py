@@ -2,9 +2,15 @@
 Task Pydantic schemas
 """
 
+import enum
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.cache import CachedSchema
+from app.core.config import settings
+from app.models.task import TaskPriority
+from app.schemas.user import User
 
 
 class TaskBase(BaseModel):
@@ -12,7 +18,7 @@ class TaskBase(BaseModel):
     title: str
     description: Optional[str] = None
     is_completed: bool = False
-    priority: str = "medium"
+    priority: TaskPriority = TaskPriority.MEDIUM
     due_date: Optional[datetime] = None
 
 
@@ -22,15 +28,23 @@ class TaskCreate(TaskBase):
 
 
 class TaskUpdate(BaseModel):
-    """Schema for updating a task"""
+    """Schema for updating a task - omitted fields are left unchanged"""
     title: Optional[str] = None
     description: Optional[str] = None
     is_completed: Optional[bool] = None
-    priority: Optional[str] = None
+    priority: Optional[TaskPriority] = None
     due_date: Optional[datetime] = None
+    
+    @field_validator("title", "is_completed", "priority")
+    @classmethod
+    def reject_null(cls, value):
+        """These columns are NOT NULL - omit a field to keep its value"""
+        if value is None:
+            raise ValueError("may not be null")
+        return value
 
 
-class Task(TaskBase):
+class Task(TaskBase, CachedSchema):
     """Schema for task response"""
     id: int
     owner_id: int
@@ -39,3 +53,109 @@ class Task(TaskBase):
     
     class Config:
         from_attributes = True
+
+
+class TaskWithOwner(Task):
+    """Schema for task listings - owner is only present with expand=owner"""
+    owner: Optional[User] = None
+
+
+class TaskBulkCreate(BaseModel):
+    """Schema for creating tasks in bulk"""
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    """Schema for one task of a bulk update"""
+    id: int
+
+
+class TaskBulkUpdate(BaseModel):
+    """Schema for updating tasks in bulk"""
+    items: List[TaskBulkUpdateItem] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class TaskBulkDelete(BaseModel):
+    """Schema for deleting tasks in bulk"""
+    ids: List[int] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class BulkItemError(BaseModel):
+    """Error for a single item of a bulk request"""
+    index: int
+    id: Optional[int] = None
+    detail: str
+
+
+class TaskBulkResult(BaseModel):
+    """Schema for bulk create/update response"""
+    items: List[Task]
+    errors: List[BulkItemError] = []
+
+
+class TaskBulkDeleteResult(BaseModel):
+    """Schema for bulk delete response"""
+    deleted: List[int]
+    errors: List[BulkItemError] = []
+
+
+class TaskSyncResult(BaseModel):
+    """Schema for delta sync response"""
+    token: str
+    items: List[Task]
+    deleted: List[int] = []
+
+
+class TaskPriorityCounts(BaseModel):
+    """Task counts per priority"""
+    low: int = 0
+    medium: int = 0
+    high: int = 0
+
+
+class TaskStats(BaseModel):
+    """Task counts for dashboards"""
+    total: int = 0
+    completed: int = 0
+    open: int = 0
+    overdue: int = 0
+    by_priority: TaskPriorityCounts = TaskPriorityCounts()
+
+
+class TaskFilter(BaseModel):
+    """Query filters for task listings"""
+    owner_id: Optional[int] = None
+    is_completed: Optional[bool] = None
+    priority: Optional[TaskPriority] = None
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+
+
+class TaskExpand(str, enum.Enum):
+    """Related objects that task listings can embed"""
+    OWNER = "owner"
+
+
+class TaskSort(str, enum.Enum):
+    """Allowed sort orders for task listings - prefix with '-' for descending"""
+    ID = "id"
+    ID_DESC = "-id"
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    DUE_DATE = "due_date"
+    DUE_DATE_DESC = "-due_date"
+    PRIORITY = "priority"
+    PRIORITY_DESC = "-priority"
+    
+    @property
+    def field(self) -> str:
+        return self.value.lstrip("-")
+    
+    @property
+    def descending(self) -> bool:
+        return self.value.startswith("-")
+    
+    @property
+    def is_keyset(self) -> bool:
+        """Whether cursor pagination is supported for this order"""
+        return self.field == "id"
@@ -0,0 +1,11 @@
+"""
+Token Pydantic schemas
+"""
+
+from pydantic import BaseModel
+
+
+class Token(BaseModel):
+    """Access token response"""
+    access_token: str
+    token_type: str = "bearer"
@@ -7,6 +7,8 @@ from typing import Optional
 from pydantic import BaseModel
 from pydantic import EmailStr
 
+from app.core.cache import CachedSchema
+
 
 class UserBase(BaseModel):
     """Base user schema"""
@@ -30,7 +32,7 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
 
 
-class User(UserBase):
+class User(UserBase, CachedSchema):
     """Schema for user response"""
     id: int
     is_superuser: bool
@@ -0,0 +1,94 @@
+"""
+Production server - multiple uvicorn workers sized to the host and the database
+
+Workers are spawned processes, each importing the app and creating its own engines, with the
+pool cut down to its share of DB_CONNECTION_BUDGET. On SIGTERM a worker stops accepting
+connections, ends its event streams and waits up to SERVER_GRACEFUL_TIMEOUT_SECONDS for
+in-flight requests before shutting down. State that must be shared by all workers (Idempotency-Keys)
+needs a shared backend; in-process entity and principal caches are switched off.
+"""
+
+import logging
+import os
+import socket
+from typing import List, Optional
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app.core.config import pool_limits, settings
+from app.core.events import task_events
+from app.core.idempotency import check_idempotency_backend
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def available_cores() -> int:
+    """CPU cores this process may run on (respects affinity masks such as container CPU sets)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    """SERVER_WORKERS, or one worker per core but no more than the connection budget allows"""
+    if settings.SERVER_WORKERS:
+        return settings.SERVER_WORKERS
+    workers = available_cores()
+    if settings.DB_CONNECTION_BUDGET is not None:
+        per_worker = 2 if settings.EVENTS_BACKEND == "postgres" else 1
+        workers = min(workers, max(1, settings.DB_CONNECTION_BUDGET // per_worker))
+    return workers
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that ends event streams on shutdown, so draining does not wait on them"""
+    
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        # Streams never finish by themselves; ending them here lets their clients reconnect to a
+        # worker that stays up. Nothing is accepted in between - the listeners close right after.
+        task_events.close_streams()
+        await super().shutdown(sockets)
+
+
+def check_shared_state(workers: int) -> None:
+    """Refuse per-process state that must be shared once there are several workers"""
+    check_idempotency_backend(workers)
+    if workers > 1 and settings.CACHE_BACKEND == "memory":
+        logger.warning(
+            "CACHE_BACKEND=memory is per process: the entity cache is off with %d workers, use CACHE_BACKEND=redis",
+            workers
+        )
+
+
+def serve() -> None:
+    """Run the app with the configured number of workers"""
+    workers = worker_count()
+    check_shared_state(workers)
+    pool_size, max_overflow = pool_limits(workers)
+    # Workers read their share of the connection budget from the worker count
+    os.environ["SERVER_WORKERS"] = str(workers)
+    config = uvicorn.Config(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        proxy_headers=settings.SERVER_PROXY_HEADERS,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        log_level=settings.LOG_LEVEL.lower(),
+        access_log=False,
+    )
+    logger.info(
+        "Starting %d workers: pool_size=%d max_overflow=%d, up to %d database connections",
+        workers, pool_size, max_overflow, workers * (pool_size + max_overflow)
+    )
+    server = DrainingServer(config)
+    if workers == 1:
+        server.run()
+        return
+    Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
@@ -2,41 +2,355 @@
 Task service layer
 """
 
-from typing import List, Optional
+import time
+from typing import AsyncIterator, Collection, Iterator, List, Optional, Union
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import EntityCache, build_cache_backend, replica_fill_delay
+from app.core.config import settings
+from app.core.events import TASK_CREATED, TASK_DELETED, TASK_UPDATED, task_events
+from app.core.export import ExportFormat, encode_csv_header, encode_rows
+from app.core.sync import SyncToken, encode_sync_token
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
-from app.repositories.task_repository import TaskRepository
+from app.schemas.task import Task as TaskSchema
+from app.schemas.task import (
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkDeleteResult,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskExpand,
+    TaskFilter,
+    TaskPriorityCounts,
+    TaskSort,
+    TaskStats,
+    TaskSyncResult,
+    TaskUpdate,
+)
+from app.repositories.task_repository import TASK_EXPORT_COLUMNS, AsyncTaskRepository, TaskRepository
+from app.repositories.user_repository import AsyncUserRepository, UserRepository
+
+# Column order of exported tasks
+EXPORT_COLUMNS = [column.name for column in TASK_EXPORT_COLUMNS]
+
+
+def expansion_fields(fields: Optional[Collection[str]], expand: Collection[TaskExpand]) -> Optional[List[str]]:
+    """Sparse fieldset plus the columns needed to resolve expansions"""
+    if fields is None or TaskExpand.OWNER not in expand:
+        return fields
+    return [*fields, "owner_id"]
+
+
+def build_task_stats(counters: Optional[Row], overdue: int) -> TaskStats:
+    """Task stats from a counters row (None when no task was ever counted) and the overdue count"""
+    if counters is None:
+        return TaskStats(overdue=overdue)
+    return TaskStats(
+        total=counters.total,
+        completed=counters.completed,
+        open=counters.total - counters.completed,
+        overdue=overdue,
+        by_priority=TaskPriorityCounts(
+            low=counters.priority_low, medium=counters.priority_medium, high=counters.priority_high
+        )
+    )
+
+
+def embed_owners(tasks: List[Row], owners: List[Row]) -> List[dict]:
+    """Attach each task's owner, from owners loaded with one IN query"""
+    owners_by_id = {owner.id: owner._asdict() for owner in owners}
+    return [{**task._asdict(), "owner": owners_by_id.get(task.owner_id)} for task in tasks]
+
+
+def build_sync_result(version: int, tasks: List[Row], deleted: List[int]) -> TaskSyncResult:
+    """Delta sync response with the token of the change version it is current to"""
+    # A task recreated under a deleted ID is a change, not a deletion
+    changed = {task.id for task in tasks}
+    return TaskSyncResult(
+        token=encode_sync_token(SyncToken(version, int(time.time()))),
+        items=tasks,
+        deleted=[task_id for task_id in deleted if task_id not in changed]
+    )
+
+
+def publish_changes(event_type: str, tasks: List[Union[Row, Task]]) -> None:
+    """Publish committed task writes to the change feed"""
+    if not task_events.running:
+        return
+    for task in tasks:
+        task_events.publish(event_type, task.owner_id, TaskSchema.model_validate(task).model_dump(mode="json"))
+
+
+def publish_deletes(rows: List[Row]) -> None:
+    """Publish committed task deletes to the change feed"""
+    for row in rows:
+        task_events.publish(TASK_DELETED, row.owner_id, {"id": row.id, "owner_id": row.owner_id})
+
+# Shared read-through cache for get_task, invalidated by every task write
+task_cache: EntityCache[TaskSchema] = EntityCache(build_cache_backend(), "task", TaskSchema, replica_fill_delay())
 
 
 class TaskService:
     """Task service for business logic"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: EntityCache[TaskSchema] = task_cache):
         self.db = db
         self.task_repository = TaskRepository(db)
+        self.user_repository = UserRepository(db)
+        self.cache = cache
+    
+    def get_collection_version(self, owner_id: Optional[int] = None) -> Optional[Row]:
+        """Get the (version, updated_at) of all tasks or of one owner's tasks"""
+        return self.task_repository.get_collection_version(owner_id)
+    
+    def get_tasks(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+        filters: Optional[TaskFilter] = None,
+        sort: TaskSort = TaskSort.ID,
+        fields: Optional[Collection[str]] = None,
+        expand: Collection[TaskExpand] = ()
+    ) -> List[Union[Row, dict]]:
+        """Get tasks with filtering, sorting, sparse fields, expansions and offset or keyset pagination"""
+        tasks = self.task_repository.get_tasks(
+            skip=skip, limit=limit, after=after, filters=filters, sort=sort,
+            fields=expansion_fields(fields, expand)
+        )
+        if TaskExpand.OWNER in expand:
+            return embed_owners(tasks, self.user_repository.get_users_by_ids({task.owner_id for task in tasks}))
+        return tasks
+    
+    def get_task(self, task_id: int) -> Optional[TaskSchema]:
+        """Get task by ID, served from the cache when possible"""
+        cached = self.cache.get(task_id)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation()
+        task = self.task_repository.get_task(task_id)
+        if task is None:
+            return None
+        return self.cache.set(task_id, task, generation)
     
-    def get_tasks(self, skip: int = 0, limit: int = 100) -> List[Task]:
-        """Get all tasks with pagination"""
-        return self.task_repository.get_tasks(skip=skip, limit=limit)
+    def get_tasks_by_user(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Get tasks by user ID with sparse fields and offset or keyset pagination"""
+        return self.task_repository.get_tasks_by_user(user_id, skip=skip, limit=limit, after=after, fields=fields)
     
-    def get_task(self, task_id: int) -> Optional[Task]:
-        """Get task by ID"""
-        return self.task_repository.get_task(task_id)
+    def sync_tasks(self, since: Optional[SyncToken], owner_id: Optional[int] = None) -> TaskSyncResult:
+        """Tasks created or updated since a sync token and the IDs deleted since - everything without one"""
+        version, tasks, deleted = self.task_repository.get_changes(
+            since.version if since is not None else None, owner_id
+        )
+        return build_sync_result(version, tasks, deleted)
     
-    def get_tasks_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Task]:
-        """Get tasks by user ID"""
-        return self.task_repository.get_tasks_by_user(user_id, skip=skip, limit=limit)
+    def get_stats(self, owner_id: Optional[int] = None) -> TaskStats:
+        """Get task counts of all tasks or of one owner's tasks"""
+        return build_task_stats(
+            self.task_repository.get_counters(owner_id), self.task_repository.count_overdue(owner_id)
+        )
+    
+    def search_tasks(
+        self,
+        q: str,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TaskFilter] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Full-text search tasks, ranked and paginated"""
+        return self.task_repository.search_tasks(q, skip=skip, limit=limit, filters=filters, fields=fields)
+    
+    def export_tasks(self, filters: Optional[TaskFilter], export_format: ExportFormat) -> Iterator[bytes]:
+        """Stream filtered tasks encoded as NDJSON or CSV, one chunk per batch"""
+        if export_format is ExportFormat.CSV:
+            yield encode_csv_header(EXPORT_COLUMNS)
+        for rows in self.task_repository.iter_task_batches(filters, settings.EXPORT_BATCH_SIZE):
+            yield encode_rows(export_format, rows)
     
     def create_task(self, task: TaskCreate) -> Task:
         """Create a new task"""
-        return self.task_repository.create_task(task)
+        db_task = self.task_repository.create_task(task)
+        publish_changes(TASK_CREATED, [db_task])
+        return db_task
     
-    def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
+    def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Row]:
         """Update an existing task"""
-        return self.task_repository.update_task(task_id, task_update)
+        task = self.task_repository.update_task(task_id, task_update)
+        self.cache.invalidate(task_id)
+        if task is not None:
+            publish_changes(TASK_UPDATED, [task])
+        return task
     
     def delete_task(self, task_id: int) -> bool:
         """Delete a task"""
-        return self.task_repository.delete_task(task_id)
+        row = self.task_repository.delete_task(task_id)
+        self.cache.invalidate(task_id)
+        if row is None:
+            return False
+        publish_deletes([row])
+        return True
+    
+    def bulk_create_tasks(self, bulk: TaskBulkCreate) -> TaskBulkResult:
+        """Create tasks in bulk"""
+        rows, errors = self.task_repository.bulk_create_tasks(bulk.items)
+        publish_changes(TASK_CREATED, rows)
+        return TaskBulkResult(items=rows, errors=errors)
+    
+    def bulk_update_tasks(self, bulk: TaskBulkUpdate) -> TaskBulkResult:
+        """Update tasks in bulk"""
+        rows, errors = self.task_repository.bulk_update_tasks(bulk.items)
+        self.cache.invalidate(*(row.id for row in rows))
+        publish_changes(TASK_UPDATED, rows)
+        return TaskBulkResult(items=rows, errors=errors)
+    
+    def bulk_delete_tasks(self, bulk: TaskBulkDelete) -> TaskBulkDeleteResult:
+        """Delete tasks in bulk"""
+        rows, errors = self.task_repository.bulk_delete_tasks(bulk.ids)
+        deleted = [row.id for row in rows]
+        self.cache.invalidate(*deleted)
+        publish_deletes(rows)
+        return TaskBulkDeleteResult(deleted=deleted, errors=errors)
+
+
+class AsyncTaskService:
+    """Async task service for business logic"""
+    
+    def __init__(self, db: AsyncSession, cache: EntityCache[TaskSchema] = task_cache):
+        self.db = db
+        self.task_repository = AsyncTaskRepository(db)
+        self.user_repository = AsyncUserRepository(db)
+        self.cache = cache
+    
+    async def get_collection_version(self, owner_id: Optional[int] = None) -> Optional[Row]:
+        """Get the (version, updated_at) of all tasks or of one owner's tasks"""
+        return await self.task_repository.get_collection_version(owner_id)
+    
+    async def get_tasks(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+        filters: Optional[TaskFilter] = None,
+        sort: TaskSort = TaskSort.ID,
+        fields: Optional[Collection[str]] = None,
+        expand: Collection[TaskExpand] = ()
+    ) -> List[Union[Row, dict]]:
+        """Get tasks with filtering, sorting, sparse fields, expansions and offset or keyset pagination"""
+        tasks = await self.task_repository.get_tasks(
+            skip=skip, limit=limit, after=after, filters=filters, sort=sort,
+            fields=expansion_fields(fields, expand)
+        )
+        if TaskExpand.OWNER in expand:
+            owners = await self.user_repository.get_users_by_ids({task.owner_id for task in tasks})
+            return embed_owners(tasks, owners)
+        return tasks
+    
+    async def get_task(self, task_id: int) -> Optional[TaskSchema]:
+        """Get task by ID, served from the cache when possible"""
+        cached = await self.cache.aget(task_id)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation()
+        task = await self.task_repository.get_task(task_id)
+        if task is None:
+            return None
+        return await self.cache.aset(task_id, task, generation)
+    
+    async def get_tasks_by_user(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Get tasks by user ID with sparse fields and offset or keyset pagination"""
+        return await self.task_repository.get_tasks_by_user(
+            user_id, skip=skip, limit=limit, after=after, fields=fields
+        )
+    
+    async def sync_tasks(self, since: Optional[SyncToken], owner_id: Optional[int] = None) -> TaskSyncResult:
+        """Tasks created or updated since a sync token and the IDs deleted since - everything without one"""
+        version, tasks, deleted = await self.task_repository.get_changes(
+            since.version if since is not None else None, owner_id
+        )
+        return build_sync_result(version, tasks, deleted)
+    
+    async def get_stats(self, owner_id: Optional[int] = None) -> TaskStats:
+        """Get task counts of all tasks or of one owner's tasks"""
+        return build_task_stats(
+            await self.task_repository.get_counters(owner_id), await self.task_repository.count_overdue(owner_id)
+        )
+    
+    async def search_tasks(
+        self,
+        q: str,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TaskFilter] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Row]:
+        """Full-text search tasks, ranked and paginated"""
+        return await self.task_repository.search_tasks(q, skip=skip, limit=limit, filters=filters, fields=fields)
+    
+    async def export_tasks(self, filters: Optional[TaskFilter], export_format: ExportFormat) -> AsyncIterator[bytes]:
+        """Stream filtered tasks encoded as NDJSON or CSV, one chunk per batch"""
+        if export_format is ExportFormat.CSV:
+            yield encode_csv_header(EXPORT_COLUMNS)
+        async for rows in self.task_repository.iter_task_batches(filters, settings.EXPORT_BATCH_SIZE):
+            yield encode_rows(export_format, rows)
+    
+    async def create_task(self, task: TaskCreate) -> Task:
+        """Create a new task"""
+        db_task = await self.task_repository.create_task(task)
+        publish_changes(TASK_CREATED, [db_task])
+        return db_task
+    
+    async def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Row]:
+        """Update an existing task"""
+        task = await self.task_repository.update_task(task_id, task_update)
+        await self.cache.ainvalidate(task_id)
+        if task is not None:
+            publish_changes(TASK_UPDATED, [task])
+        return task
+    
+    async def delete_task(self, task_id: int) -> bool:
+        """Delete a task"""
+        row = await self.task_repository.delete_task(task_id)
+        await self.cache.ainvalidate(task_id)
+        if row is None:
+            return False
+        publish_deletes([row])
+        return True
+    
+    async def bulk_create_tasks(self, bulk: TaskBulkCreate) -> TaskBulkResult:
+        """Create tasks in bulk"""
+        rows, errors = await self.task_repository.bulk_create_tasks(bulk.items)
+        publish_changes(TASK_CREATED, rows)
+        return TaskBulkResult(items=rows, errors=errors)
+    
+    async def bulk_update_tasks(self, bulk: TaskBulkUpdate) -> TaskBulkResult:
+        """Update tasks in bulk"""
+        rows, errors = await self.task_repository.bulk_update_tasks(bulk.items)
+        await self.cache.ainvalidate(*(row.id for row in rows))
+        publish_changes(TASK_UPDATED, rows)
+        return TaskBulkResult(items=rows, errors=errors)
+    
+    async def bulk_delete_tasks(self, bulk: TaskBulkDelete) -> TaskBulkDeleteResult:
+        """Delete tasks in bulk"""
+        rows, errors = await self.task_repository.bulk_delete_tasks(bulk.ids)
+        deleted = [row.id for row in rows]
+        await self.cache.ainvalidate(*deleted)
+        publish_deletes(rows)
+        return TaskBulkDeleteResult(deleted=deleted, errors=errors)
@@ -3,40 +3,187 @@ User service layer
 """
 
 from typing import List, Optional
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import EntityCache, TTLCache, build_cache_backend, replica_fill_delay
+from app.core.config import settings, single_worker
+from app.core.security import password_hasher
 from app.models.user import User
+from app.schemas.user import User as UserSchema
 from app.schemas.user import UserCreate, UserUpdate
-from app.repositories.user_repository import UserRepository
+from app.repositories.user_repository import AsyncUserRepository, UserRepository
+
+# Shared read-through cache for get_user, invalidated by every user write
+user_cache: EntityCache[UserSchema] = EntityCache(build_cache_backend(), "user", UserSchema, replica_fill_delay())
+
+
+def build_principal_cache() -> TTLCache:
+    """Principal cache - storing nothing with several workers, as a user write only reaches its own worker"""
+    max_entries = settings.AUTH_CACHE_MAX_ENTRIES if single_worker() else 0
+    return TTLCache(max_entries, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+# Authenticated principals (active users only) keyed by user ID, dropped by every user write
+principal_cache = build_principal_cache()
 
 
 class UserService:
     """User service for business logic"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: EntityCache[UserSchema] = user_cache):
         self.db = db
         self.user_repository = UserRepository(db)
+        self.cache = cache
+    
+    def get_collection_version(self) -> Optional[Row]:
+        """Get the (version, updated_at) of the user collection"""
+        return self.user_repository.get_collection_version()
+    
+    def get_users(self, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> List[Row]:
+        """Get all users with offset or keyset pagination"""
+        return self.user_repository.get_users(skip=skip, limit=limit, after=after)
     
-    def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        """Get all users with pagination"""
-        return self.user_repository.get_users(skip=skip, limit=limit)
+    def get_user(self, user_id: int) -> Optional[UserSchema]:
+        """Get user by ID, served from the cache when possible"""
+        cached = self.cache.get(user_id)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation()
+        user = self.user_repository.get_user(user_id)
+        if user is None:
+            return None
+        return self.cache.set(user_id, user, generation)
     
-    def get_user(self, user_id: int) -> Optional[User]:
-        """Get user by ID"""
-        return self.user_repository.get_user(user_id)
+    def get_active_user(self, user_id: int) -> Optional[UserSchema]:
+        """Get an active user for request authentication, served from the principal cache when possible"""
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+        generation = self.cache.generation()
+        user = self.get_user(user_id)
+        if user is None or not user.is_active:
+            return None
+        if self.cache.can_fill(user_id, generation):
+            principal_cache.set(user_id, user)
+        return user
     
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         return self.user_repository.get_user_by_email(email)
     
+    def authenticate(self, email: str, password: str) -> Optional[User]:
+        """Check credentials, upgrading the stored hash when its cost is outdated"""
+        user = self.user_repository.get_user_by_email(email)
+        if user is None:
+            return None
+        valid, new_hash = password_hasher.verify_and_update(password, user.hashed_password)
+        if not valid:
+            return None
+        if new_hash is not None:
+            self.user_repository.update_password_hash(user.id, new_hash)
+        return user
+    
     def create_user(self, user: UserCreate) -> User:
         """Create a new user"""
         return self.user_repository.create_user(user)
     
-    def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[Row]:
         """Update an existing user"""
-        return self.user_repository.update_user(user_id, user_update)
+        user = self.user_repository.update_user(user_id, user_update)
+        self.cache.invalidate(user_id)
+        principal_cache.delete(user_id)
+        return user
     
     def delete_user(self, user_id: int) -> bool:
-        """Delete a user"""
-        return self.user_repository.delete_user(user_id)
+        """Delete a user - False when not found or still owning tasks"""
+        deleted = self.user_repository.delete_user(user_id)
+        if deleted:
+            self.cache.invalidate(user_id)
+            principal_cache.delete(user_id)
+        return deleted
+    
+    def owns_tasks(self, user_id: int) -> bool:
+        """Whether any task belongs to the user"""
+        return self.user_repository.owns_tasks(user_id)
+
+
+class AsyncUserService:
+    """Async user service for business logic"""
+    
+    def __init__(self, db: AsyncSession, cache: EntityCache[UserSchema] = user_cache):
+        self.db = db
+        self.user_repository = AsyncUserRepository(db)
+        self.cache = cache
+    
+    async def get_collection_version(self) -> Optional[Row]:
+        """Get the (version, updated_at) of the user collection"""
+        return await self.user_repository.get_collection_version()
+    
+    async def get_users(self, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> List[Row]:
+        """Get all users with offset or keyset pagination"""
+        return await self.user_repository.get_users(skip=skip, limit=limit, after=after)
+    
+    async def get_user(self, user_id: int) -> Optional[UserSchema]:
+        """Get user by ID, served from the cache when possible"""
+        cached = await self.cache.aget(user_id)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation()
+        user = await self.user_repository.get_user(user_id)
+        if user is None:
+            return None
+        return await self.cache.aset(user_id, user, generation)
+    
+    async def get_active_user(self, user_id: int) -> Optional[UserSchema]:
+        """Get an active user for request authentication, served from the principal cache when possible"""
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+        generation = self.cache.generation()
+        user = await self.get_user(user_id)
+        if user is None or not user.is_active:
+            return None
+        if self.cache.can_fill(user_id, generation):
+            principal_cache.set(user_id, user)
+        return user
+    
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get user by email"""
+        return await self.user_repository.get_user_by_email(email)
+    
+    async def authenticate(self, email: str, password: str) -> Optional[User]:
+        """Check credentials, upgrading the stored hash when its cost is outdated"""
+        user = await self.user_repository.get_user_by_email(email)
+        if user is None:
+            return None
+        valid, new_hash = await password_hasher.verify_and_update_async(password, user.hashed_password)
+        if not valid:
+            return None
+        if new_hash is not None:
+            await self.user_repository.update_password_hash(user.id, new_hash)
+        return user
+    
+    async def create_user(self, user: UserCreate) -> User:
+        """Create a new user"""
+        return await self.user_repository.create_user(user)
+    
+    async def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[Row]:
+        """Update an existing user"""
+        user = await self.user_repository.update_user(user_id, user_update)
+        await self.cache.ainvalidate(user_id)
+        principal_cache.delete(user_id)
+        return user
+    
+    async def delete_user(self, user_id: int) -> bool:
+        """Delete a user - False when not found or still owning tasks"""
+        deleted = await self.user_repository.delete_user(user_id)
+        if deleted:
+            await self.cache.ainvalidate(user_id)
+            principal_cache.delete(user_id)
+        return deleted
+    
+    async def owns_tasks(self, user_id: int) -> bool:
+        """Whether any task belongs to the user"""
+        return await self.user_repository.owns_tasks(user_id)
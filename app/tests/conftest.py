@@ -0,0 +1,122 @@
+"""
+Shared test fixtures
+
+Settings are read when the app is imported, so the environment is set first: a throwaway SQLite
+database, async mode (both session factories exist, the sync stack is selected per test by
+overriding the session dependency) and the cheapest bcrypt cost.
+"""
+
+import itertools
+import os
+import tempfile
+from typing import AsyncIterator, Awaitable, Callable, List
+
+TEST_DIR = tempfile.mkdtemp(prefix="taskmanager-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}",
+    "DATABASE_ASYNC": "true",
+    "PASSWORD_HASH_ROUNDS": "4",
+    "CACHE_BACKEND": "memory",
+    "LOG_LEVEL": "WARNING",
+})
+
+import pytest  # noqa: E402
+import pytest_asyncio  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from app.core.cache import MemoryCacheBackend  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import Base, async_engine, engine, get_async_db, get_db  # noqa: E402
+from app.core import middleware  # noqa: E402
+from app.core.idempotency import idempotency_store  # noqa: E402
+from app.core.query_stats import QueryStats  # noqa: E402
+from app.core.security import token_cache  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.task_service import task_cache  # noqa: E402
+from app.services.user_service import principal_cache, user_cache  # noqa: E402
+
+API = settings.API_V1_STR
+PASSWORD = "correct-horse"
+
+
+@pytest.fixture(autouse=True)
+def database(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Empty tables and caches for every test"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    for entity_cache in (task_cache, user_cache):
+        backend = MemoryCacheBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+        monkeypatch.setattr(entity_cache, "backend", backend)
+    for cache in (principal_cache, token_cache, idempotency_store.responses):
+        cache.clear()
+
+
+@pytest.fixture(params=["sync", "async"])
+def database_mode(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Serve requests through the sync (thread pool) or the async (AsyncSession) stack"""
+    if request.param == "sync":
+        monkeypatch.setattr(settings, "DATABASE_ASYNC", False)
+        monkeypatch.setitem(app.dependency_overrides, get_async_db, get_db)
+    return request.param
+
+
+@pytest_asyncio.fixture
+async def client(database_mode: str) -> AsyncIterator[AsyncClient]:
+    """HTTP client calling the app in-process, with its startup and shutdown"""
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as http_client:
+            yield http_client
+    # Pooled aiosqlite connections belong to this test's event loop
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def make_user(client: AsyncClient) -> Callable[..., Awaitable[dict]]:
+    """Create users through the API - unique email and username unless given"""
+    sequence = itertools.count(1)
+    
+    async def make_user(**fields) -> dict:
+        number = next(sequence)
+        payload = {"email": f"user{number}@example.com", "username": f"user{number}", "password": PASSWORD, **fields}
+        response = await client.post(f"{API}/users/", json=payload)
+        assert response.status_code == 201, response.text
+        return response.json()
+    
+    return make_user
+
+
+@pytest.fixture
+def make_task(client: AsyncClient) -> Callable[..., Awaitable[dict]]:
+    """Create a task through the API"""
+    sequence = itertools.count(1)
+    
+    async def make_task(owner_id: int, **fields) -> dict:
+        payload = {"title": f"Task {next(sequence)}", "owner_id": owner_id, **fields}
+        response = await client.post(f"{API}/tasks/", json=payload)
+        assert response.status_code == 201, response.text
+        return response.json()
+    
+    return make_task
+
+
+@pytest_asyncio.fixture
+async def auth_headers(client: AsyncClient, make_user: Callable[..., Awaitable[dict]]) -> dict:
+    """Bearer token headers of a new active user"""
+    user = await make_user()
+    response = await client.post(f"{API}/auth/token", data={"username": user["email"], "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def query_stats(monkeypatch: pytest.MonkeyPatch) -> List[QueryStats]:
+    """Query stats of every request served from now on, statements included"""
+    collected = []
+    
+    def collect() -> QueryStats:
+        collected.append(QueryStats())
+        return collected[-1]
+    
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_DETECTION", True)
+    monkeypatch.setattr(middleware, "QueryStats", collect)
+    return collected
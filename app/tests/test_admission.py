@@ -0,0 +1,178 @@
+"""
+Admission control: priority lanes, per-client rate limits and CORS on rejections
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.core.admission import AdmissionController, Lane, RateLimiter
+from app.core.idempotency import IDEMPOTENCY_HEADER, REPLAYED_HEADER
+from app.core.middleware import AdmissionControlMiddleware
+from app.main import app
+from app.services.task_service import AsyncTaskService
+from app.tests.conftest import API
+
+ORIGIN = "http://localhost:3000"
+
+
+def http_scope(headers: dict, client: str = "10.0.0.1") -> dict:
+    """ASGI scope of a request from a client address"""
+    return {
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": (client, 50000),
+    }
+
+
+@pytest_asyncio.fixture
+async def admission(client) -> AdmissionControlMiddleware:
+    """App's admission middleware, once the middleware stack is built"""
+    await client.get("/health")
+    layer = app.middleware_stack
+    while not isinstance(layer, AdmissionControlMiddleware):
+        layer = layer.app
+    return layer
+
+
+@pytest.fixture
+def rate_limited(admission, monkeypatch: pytest.MonkeyPatch) -> None:
+    """App's admission middleware limiting every client to one request"""
+    monkeypatch.setattr(admission, "rate_limiter", RateLimiter(rate=0.001, burst=1, max_clients=10))
+
+
+@pytest.mark.asyncio
+async def test_slow_heavy_requests_do_not_inflate_the_read_wait_estimate():
+    # Arrange
+    controller = AdmissionController(limit=2, write_share=0.5, heavy_share=0.5, max_queue_seconds=1.0)
+    for _ in range(3):
+        await controller.acquire(Lane.HEAVY)
+        controller.release(Lane.HEAVY, 10.0)
+    await controller.acquire(Lane.READ)
+    await controller.acquire(Lane.READ)
+    
+    # Act
+    queued = asyncio.ensure_future(controller.acquire(Lane.READ))
+    await asyncio.sleep(0)
+    controller.release(Lane.READ, 0.01)
+    
+    # Assert
+    assert await queued is None
+    lanes = controller.get_stats()["lanes"]
+    assert lanes["heavy"]["service_ms"] > 1000
+    assert lanes["read"]["service_ms"] < 10
+
+
+def test_valid_bearer_tokens_are_limited_per_user(monkeypatch):
+    # Arrange
+    monkeypatch.setattr("app.core.middleware.decode_access_token", lambda token: {"sub": "7"})
+    
+    # Act
+    clients = {AdmissionControlMiddleware._client(http_scope({"Authorization": f"Bearer {token}"})) for token in "ab"}
+    
+    # Assert
+    assert clients == {"user:7"}
+
+
+@pytest.mark.parametrize("authorization", ["Bearer not-a-jwt", "Basic dXNlcjpwYXNz", "garbage"])
+def test_unverified_credentials_are_limited_per_address(authorization):
+    # Act
+    client = AdmissionControlMiddleware._client(http_scope({"Authorization": authorization}))
+    
+    # Assert
+    assert client == "10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_made_up_authorization_headers_share_the_address_bucket(client, rate_limited):
+    # Arrange
+    await client.get(f"{API}/users/", headers={"Authorization": "Bearer first"})
+    
+    # Act
+    response = await client.get(f"{API}/users/", headers={"Authorization": "Bearer second"})
+    
+    # Assert
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_responses_carry_cors_headers(client, rate_limited):
+    # Arrange
+    await client.get(f"{API}/users/", headers={"Origin": ORIGIN})
+    
+    # Act
+    response = await client.get(f"{API}/users/", headers={"Origin": ORIGIN})
+    
+    # Assert
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert "Retry-After" in response.headers["access-control-expose-headers"]
+
+
+@pytest.mark.asyncio
+async def test_preflight_requests_are_not_rate_limited(client, rate_limited):
+    # Arrange
+    await client.get(f"{API}/users/")
+    headers = {"Origin": ORIGIN, "Access-Control-Request-Method": "POST"}
+    
+    # Act
+    responses = [await client.options(f"{API}/tasks/", headers=headers) for _ in range(3)]
+    
+    # Assert
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert responses[-1].headers["access-control-allow-origin"] == ORIGIN
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("database_mode", ["async"], indirect=True)
+async def test_duplicate_waiting_on_its_in_flight_twin_holds_no_admission_slot(client, make_user, admission,
+                                                                               monkeypatch):
+    # Arrange
+    owner = await make_user()
+    controller = AdmissionController(limit=8, write_share=0.5, heavy_share=0.25, max_queue_seconds=1)
+    monkeypatch.setattr(admission, "controller", controller)
+    started, release = asyncio.Event(), asyncio.Event()
+    create_task = AsyncTaskService.create_task
+    
+    async def slow_create_task(self, task):
+        started.set()
+        await release.wait()
+        return await create_task(self, task)
+    
+    monkeypatch.setattr(AsyncTaskService, "create_task", slow_create_task)
+    request = {"json": {"title": "Slow", "owner_id": owner["id"]}, "headers": {IDEMPOTENCY_HEADER: "slow"}}
+    first = asyncio.ensure_future(client.post(f"{API}/tasks/", **request))
+    await started.wait()
+    duplicates = [asyncio.ensure_future(client.post(f"{API}/tasks/", **request)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    
+    # Act
+    active_writes = controller.active[Lane.WRITE]
+    release.set()
+    responses = await asyncio.gather(first, *duplicates)
+    
+    # Assert
+    assert active_writes == 1
+    assert {response.status_code for response in responses} == {201}
+    assert sum(REPLAYED_HEADER in response.headers for response in responses) == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_write_is_not_replayed_to_its_retry(client, make_user, admission, monkeypatch):
+    # Arrange
+    owner = await make_user()
+    request = {"json": {"title": "Retried", "owner_id": owner["id"]}, "headers": {IDEMPOTENCY_HEADER: "limited"}}
+    monkeypatch.setattr(admission, "rate_limiter", RateLimiter(rate=0.001, burst=1, max_clients=10))
+    await client.get(f"{API}/users/")
+    limited = await client.post(f"{API}/tasks/", **request)
+    monkeypatch.setattr(admission, "rate_limiter", None)
+    
+    # Act
+    retry = await client.post(f"{API}/tasks/", **request)
+    
+    # Assert
+    assert limited.status_code == 429
+    assert retry.status_code == 201
+    assert REPLAYED_HEADER not in retry.headers
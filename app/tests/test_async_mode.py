@@ -0,0 +1,108 @@
+"""
+Async database mode: the same API served by the sync and the async stack
+"""
+
+import threading
+import warnings
+
+import pytest
+from pydantic import PydanticDeprecatedSince20
+
+from app.api.deps import run_service
+from app.core.database import get_async_database_url
+from app.tests.conftest import API
+
+
+@pytest.mark.asyncio
+async def test_task_lifecycle_works_in_both_database_modes(client, make_user):
+    # Arrange
+    owner = await make_user()
+    
+    # Act
+    created = await client.post(f"{API}/tasks/", json={"title": "Write tests", "owner_id": owner["id"]})
+    task_id = created.json()["id"]
+    fetched = await client.get(f"{API}/tasks/{task_id}")
+    updated = await client.put(f"{API}/tasks/{task_id}", json={"is_completed": True})
+    deleted = await client.delete(f"{API}/tasks/{task_id}")
+    missing = await client.get(f"{API}/tasks/{task_id}")
+    
+    # Assert
+    assert created.status_code == 201
+    assert fetched.json()["title"] == "Write tests"
+    assert updated.json()["is_completed"] is True
+    assert deleted.status_code == 204
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_task_create_uses_no_deprecated_pydantic_api(client, make_user):
+    # Arrange
+    owner = await make_user()
+    
+    # Act
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", PydanticDeprecatedSince20)
+        response = await client.post(f"{API}/tasks/", json={"title": "Current API", "owner_id": owner["id"]})
+    
+    # Assert
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_user_listing_works_in_both_database_modes(client, make_user):
+    # Arrange
+    created = [await make_user() for _ in range(3)]
+    
+    # Act
+    response = await client.get(f"{API}/users/")
+    
+    # Assert
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()] == [user["id"] for user in created]
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./taskmanager.db", "sqlite+aiosqlite:///./taskmanager.db"),
+    ("postgresql://u:p@db:5432/tasks", "postgresql+asyncpg://u:p@db:5432/tasks"),
+    ("postgresql+psycopg2://u:p@db/tasks", "postgresql+asyncpg://u:p@db/tasks"),
+])
+def test_async_database_url_swaps_in_the_async_driver(url, expected):
+    # Act
+    async_url = get_async_database_url(url)
+    
+    # Assert
+    assert async_url == expected
+
+
+def test_async_database_url_rejects_dialects_without_an_async_driver():
+    # Act / Assert
+    with pytest.raises(ValueError, match="mssql"):
+        get_async_database_url("mssql://sa@db/tasks")
+
+
+@pytest.mark.asyncio
+async def test_run_service_runs_sync_methods_on_the_thread_pool():
+    # Arrange
+    def sync_method(value):
+        return value, threading.get_ident()
+    
+    # Act
+    value, thread = await run_service(sync_method, 42)
+    
+    # Assert
+    assert value == 42
+    assert thread != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_run_service_awaits_async_methods_on_the_event_loop():
+    # Arrange
+    async def async_method(value):
+        return value, threading.get_ident()
+    
+    # Act
+    value, thread = await run_service(async_method, 42)
+    
+    # Assert
+    assert value == 42
+    assert thread == threading.get_ident()
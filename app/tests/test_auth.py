@@ -0,0 +1,97 @@
+"""
+Token authentication: login, bearer token resolution and the cached principal
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from app.core.security import create_access_token, token_cache
+from app.tests.conftest import API, PASSWORD
+
+
+@pytest.mark.asyncio
+async def test_login_token_authenticates_the_user(client, make_user):
+    # Arrange
+    user = await make_user()
+    login = await client.post(f"{API}/auth/token", data={"username": user["email"], "password": PASSWORD})
+    
+    # Act
+    response = await client.get(f"{API}/users/me", headers={"Authorization": f"Bearer {login.json()['access_token']}"})
+    
+    # Assert
+    assert login.json()["token_type"] == "bearer"
+    assert response.status_code == 200
+    assert response.json()["id"] == user["id"]
+
+
+@pytest.mark.asyncio
+async def test_login_with_a_wrong_password_is_unauthorized(client, make_user):
+    # Arrange
+    user = await make_user()
+    
+    # Act
+    response = await client.post(f"{API}/auth/token", data={"username": user["email"], "password": "wrong"})
+    
+    # Assert
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authorization", [
+    None,
+    "Bearer not-a-jwt",
+    f"Bearer {create_access_token({'sub': 'not-a-number'})}",
+    f"Bearer {create_access_token({'sub': '1'}, expires_delta=timedelta(minutes=-1))}",
+])
+async def test_requests_without_a_valid_token_are_unauthorized(client, make_user, authorization):
+    # Arrange
+    await make_user()
+    headers = {"Authorization": authorization} if authorization else {}
+    
+    # Act
+    response = await client.get(f"{API}/users/me", headers=headers)
+    
+    # Assert
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_repeated_requests_resolve_the_principal_without_queries(client, auth_headers, query_stats):
+    # Arrange
+    await client.get(f"{API}/users/me", headers=auth_headers)
+    
+    # Act
+    response = await client.get(f"{API}/users/me", headers=auth_headers)
+    
+    # Assert
+    assert response.status_code == 200
+    assert query_stats[-1].count == 0
+    assert len(token_cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_deactivated_user_is_rejected_despite_the_cached_principal(client, auth_headers):
+    # Arrange
+    me = await client.get(f"{API}/users/me", headers=auth_headers)
+    await client.patch(f"{API}/users/{me.json()['id']}", json={"is_active": False})
+    
+    # Act
+    response = await client.get(f"{API}/users/me", headers=auth_headers)
+    
+    # Assert
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_deleted_user_token_is_rejected(client, auth_headers):
+    # Arrange
+    me = await client.get(f"{API}/users/me", headers=auth_headers)
+    await client.delete(f"{API}/users/{me.json()['id']}")
+    
+    # Act
+    response = await client.get(f"{API}/users/me", headers=auth_headers)
+    
+    # Assert
+    assert response.status_code == 401
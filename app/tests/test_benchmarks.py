@@ -0,0 +1,124 @@
+"""
+Benchmark suite helpers and the load workload run against the in-process app
+"""
+
+import argparse
+import random
+
+import pytest
+
+from app.tests.conftest import API
+from benchmarks.load import Workload, compare, parse_mix, percentile, run_phase, server_env, summarize
+from benchmarks.startup import parse_importtime
+
+
+def test_mix_is_parsed_into_operation_weights():
+    # Act
+    mix = parse_mix("list_tasks=40, get_task=2.5")
+    
+    # Assert
+    assert mix == {"list_tasks": 40.0, "get_task": 2.5}
+
+
+@pytest.mark.parametrize("pct, expected", [(50, 5), (95, 10), (99, 10), (1, 1)])
+def test_percentile_uses_the_nearest_rank(pct, expected):
+    # Act
+    value = percentile(list(range(1, 11)), pct)
+    
+    # Assert
+    assert value == expected
+
+
+def test_summary_reports_milliseconds_and_throughput():
+    # Act
+    summary = summarize([0.002, 0.001, 0.003], errors=1, elapsed=2.0)
+    
+    # Assert
+    assert summary == {
+        "requests": 3, "errors": 1, "rps": 1.5,
+        "p50_ms": 2.0, "p95_ms": 3.0, "p99_ms": 3.0, "mean_ms": 2.0, "max_ms": 3.0,
+    }
+
+
+@pytest.mark.parametrize("total_p95, expected", [(10.5, True), (12.0, False)])
+def test_only_the_total_gates_a_regression(total_p95, expected):
+    # Arrange
+    baseline = {
+        "meta": {"commit": "abc123", "timestamp": "2026-10-18T00:00:00+00:00"},
+        "results": {
+            "get_task": {"requests": 10, "p95_ms": 1.0, "rps": 100.0},
+            "total": {"requests": 10, "p95_ms": 10.0, "rps": 100.0},
+        },
+    }
+    results = {
+        "get_task": {"requests": 10, "p95_ms": 5.0, "rps": 100.0},
+        "total": {"requests": 10, "p95_ms": total_p95, "rps": 100.0},
+    }
+    
+    # Act
+    ok = compare(results, baseline, max_regression=10.0)
+    
+    # Assert
+    assert ok is expected
+
+
+def test_importtime_output_is_parsed_per_module():
+    # Arrange
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   jose\n"
+        "import time:      3000 |      45000 | app.main\n"
+    )
+    
+    # Act
+    modules = parse_importtime(output)
+    
+    # Assert
+    assert modules == {"jose": (120, 120), "app.main": (3000, 45000)}
+
+
+@pytest.mark.asyncio
+async def test_load_workload_runs_every_operation_without_errors(client):
+    # Arrange
+    workload = Workload(client, random.Random(7))
+    await workload.seed(users=3, tasks_per_user=4)
+    mix = parse_mix(
+        "list_tasks=1,get_task=1,create_task=1,update_task=1,delete_task=1,"
+        "list_users=1,get_user=1,create_user=1,update_user=1,delete_user=1"
+    )
+    
+    # Act
+    results = await run_phase(workload, mix, concurrency=2, duration=0.5)
+    
+    # Assert
+    assert results["total"]["requests"] > 0
+    assert results["total"]["errors"] == 0
+
+
+def test_benchmarked_server_runs_the_requested_number_of_workers():
+    # Arrange
+    args = argparse.Namespace(async_db=False, hash_rounds=4, workers=4)
+    
+    # Act
+    env = server_env(args, "sqlite:///bench.db", 8123)
+    
+    # Assert
+    assert env["SERVER_WORKERS"] == "4"
+    assert env["SERVER_PORT"] == "8123"
+
+
+@pytest.mark.asyncio
+async def test_load_workload_only_deletes_tasks_it_created(client):
+    # Arrange
+    workload = Workload(client, random.Random(7))
+    await workload.seed(users=1, tasks_per_user=3)
+    seeded = list(workload.task_ids)
+    
+    # Act
+    for _ in range(4):
+        await workload.delete_task()
+    
+    # Assert
+    assert workload.task_ids == seeded
+    for task_id in seeded:
+        assert (await client.get(f"{API}/tasks/{task_id}")).status_code == 200
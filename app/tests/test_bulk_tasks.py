@@ -0,0 +1,120 @@
+"""
+Bulk create, update and delete of tasks with per-item errors
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.tests.conftest import API
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_inserts_valid_items_and_reports_unknown_owners(client, make_user):
+    # Arrange
+    owner = await make_user()
+    items = [
+        {"title": "First", "owner_id": owner["id"]},
+        {"title": "Orphan", "owner_id": owner["id"] + 100},
+        {"title": "Second", "owner_id": owner["id"], "priority": "high"},
+    ]
+    
+    # Act
+    response = await client.post(f"{API}/tasks/bulk", json={"items": items})
+    listing = await client.get(f"{API}/tasks/")
+    
+    # Assert
+    body = response.json()
+    assert response.status_code == 200
+    assert [task["title"] for task in body["items"]] == ["First", "Second"]
+    assert body["items"][1]["priority"] == "high"
+    assert body["errors"] == [{"index": 1, "id": None, "detail": "Owner not found"}]
+    assert [task["id"] for task in listing.json()] == [task["id"] for task in body["items"]]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_applies_each_items_fields(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    first, second = await make_task(owner["id"]), await make_task(owner["id"])
+    items = [{"id": first["id"], "is_completed": True}, {"id": second["id"], "title": "Renamed"}]
+    
+    # Act
+    response = await client.patch(f"{API}/tasks/bulk", json={"items": items})
+    
+    # Assert
+    updated = {task["id"]: task for task in response.json()["items"]}
+    assert response.json()["errors"] == []
+    assert updated[first["id"]]["is_completed"] is True
+    assert updated[first["id"]]["title"] == first["title"]
+    assert updated[second["id"]]["title"] == "Renamed"
+    assert updated[second["id"]]["is_completed"] is False
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_reports_duplicate_and_missing_ids(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    items = [
+        {"id": task["id"], "title": "Kept"},
+        {"id": task["id"], "title": "Ignored"},
+        {"id": task["id"] + 100, "title": "Missing"},
+    ]
+    
+    # Act
+    response = await client.patch(f"{API}/tasks/bulk", json={"items": items})
+    
+    # Assert
+    body = response.json()
+    assert [item["title"] for item in body["items"]] == ["Kept"]
+    assert body["errors"] == [
+        {"index": 1, "id": task["id"], "detail": "Duplicate task id"},
+        {"index": 2, "id": task["id"] + 100, "detail": "Task not found"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_reports_duplicate_and_missing_ids(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    first, second = await make_task(owner["id"]), await make_task(owner["id"])
+    ids = [first["id"], second["id"], first["id"], second["id"] + 100]
+    
+    # Act
+    response = await client.request("DELETE", f"{API}/tasks/bulk", json={"ids": ids})
+    listing = await client.get(f"{API}/tasks/")
+    
+    # Assert
+    assert response.json() == {
+        "deleted": [first["id"], second["id"]],
+        "errors": [
+            {"index": 2, "id": first["id"], "detail": "Duplicate task id"},
+            {"index": 3, "id": second["id"] + 100, "detail": "Task not found"},
+        ],
+    }
+    assert listing.json() == []
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_invalidates_cached_tasks(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    await client.get(f"{API}/tasks/{task['id']}")
+    
+    # Act
+    await client.request("DELETE", f"{API}/tasks/bulk", json={"ids": [task["id"]]})
+    response = await client.get(f"{API}/tasks/{task['id']}")
+    
+    # Assert
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [0, settings.BULK_MAX_ITEMS + 1])
+async def test_bulk_requests_outside_the_item_limits_are_rejected(client, count):
+    # Act
+    response = await client.request("DELETE", f"{API}/tasks/bulk", json={"ids": list(range(1, count + 1))})
+    
+    # Assert
+    assert response.status_code == 422
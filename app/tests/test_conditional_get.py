@@ -0,0 +1,146 @@
+"""
+Conditional GET: ETag / Last-Modified validators and 304 responses
+"""
+
+import pytest
+from sqlalchemy import select
+
+from app.core.database import engine
+from app.models.collection_version import CollectionVersion
+from app.schemas.task import Task
+from app.schemas.user import User
+from app.tests.conftest import API
+
+
+@pytest.mark.asyncio
+async def test_unchanged_task_is_not_modified(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    first = await client.get(f"{API}/tasks/{task['id']}")
+    
+    # Act
+    response = await client.get(f"{API}/tasks/{task['id']}", headers={"If-None-Match": first.headers["ETag"]})
+    
+    # Assert
+    assert response.status_code == 304
+    assert response.headers["ETag"] == first.headers["ETag"]
+    assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_task_etag_changes_with_every_write_within_the_same_second(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    await client.put(f"{API}/tasks/{task['id']}", json={"title": "First"})
+    first = await client.get(f"{API}/tasks/{task['id']}")
+    await client.put(f"{API}/tasks/{task['id']}", json={"title": "Second"})
+    
+    # Act
+    response = await client.get(f"{API}/tasks/{task['id']}", headers={"If-None-Match": first.headers["ETag"]})
+    
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["title"] == "Second"
+    assert response.headers["ETag"] != first.headers["ETag"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, schema", [("tasks", Task), ("users", User)])
+async def test_conditional_get_of_a_cached_entity_serializes_nothing(client, make_user, make_task, monkeypatch,
+                                                                     path, schema):
+    # Arrange
+    owner = await make_user()
+    entity = owner if path == "users" else await make_task(owner["id"])
+    first = await client.get(f"{API}/{path}/{entity['id']}")
+    serialized = []
+    original = schema.model_dump_json
+    monkeypatch.setattr(schema, "model_dump_json", lambda self, **kwargs: serialized.append(self) or original(self))
+    
+    # Act
+    response = await client.get(f"{API}/{path}/{entity['id']}", headers={"If-None-Match": first.headers["ETag"]})
+    
+    # Assert
+    assert response.status_code == 304
+    assert serialized == []
+
+
+@pytest.mark.asyncio
+async def test_unchanged_user_is_not_modified_since_its_last_modified(client, make_user):
+    # Arrange
+    user = await make_user()
+    first = await client.get(f"{API}/users/{user['id']}")
+    
+    # Act
+    response = await client.get(
+        f"{API}/users/{user['id']}", headers={"If-Modified-Since": first.headers["Last-Modified"]}
+    )
+    
+    # Assert
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_task_listing_is_modified_by_a_write_of_any_owner(client, make_user, make_task):
+    # Arrange
+    owner, other = await make_user(), await make_user()
+    await make_task(owner["id"])
+    first = await client.get(f"{API}/tasks/")
+    cached = await client.get(f"{API}/tasks/", headers={"If-None-Match": first.headers["ETag"]})
+    await make_task(other["id"])
+    
+    # Act
+    response = await client.get(f"{API}/tasks/", headers={"If-None-Match": first.headers["ETag"]})
+    
+    # Assert
+    assert cached.status_code == 304
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_owner_listing_ignores_writes_of_other_owners(client, make_user, make_task):
+    # Arrange
+    owner, other = await make_user(), await make_user()
+    await make_task(owner["id"])
+    first = await client.get(f"{API}/tasks/", params={"owner_id": owner["id"]})
+    await make_task(other["id"])
+    
+    # Act
+    response = await client.get(
+        f"{API}/tasks/", params={"owner_id": owner["id"]}, headers={"If-None-Match": first.headers["ETag"]}
+    )
+    
+    # Assert
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_listing_etag_depends_on_the_query(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    await make_task(owner["id"])
+    first = await client.get(f"{API}/tasks/", params={"limit": 10})
+    
+    # Act
+    response = await client.get(f"{API}/tasks/", params={"limit": 5}, headers={"If-None-Match": first.headers["ETag"]})
+    
+    # Assert
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_task_writes_do_not_bump_a_global_version_row(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    
+    # Act
+    await client.put(f"{API}/tasks/{task['id']}", json={"is_completed": True})
+    await client.delete(f"{API}/tasks/{task['id']}")
+    
+    # Assert
+    table = CollectionVersion.__table__
+    with engine.connect() as connection:
+        assert connection.execute(select(table).where(table.c.scope == "tasks")).first() is None
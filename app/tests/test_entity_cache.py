@@ -0,0 +1,226 @@
+"""
+Read-through entity cache: fills that race a write never cache the old value
+"""
+
+import inspect
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.cache import EntityCache, MemoryCacheBackend, RedisCacheBackend
+from app.core.config import settings
+from app.repositories.task_repository import AsyncTaskRepository, TaskRepository
+from app.repositories.user_repository import AsyncUserRepository, UserRepository
+from app.schemas.task import Task
+from app.services.task_service import task_cache
+from app.services.user_service import principal_cache, user_cache
+from app.tests.conftest import API
+
+
+@pytest.fixture
+def cache() -> EntityCache[Task]:
+    """Task cache on a fresh in-process backend"""
+    return EntityCache(MemoryCacheBackend(100, 60), "tasks", Task)
+
+
+def task(task_id: int, title: str) -> Task:
+    """Task response schema"""
+    return Task(id=task_id, title=title, owner_id=1, created_at=datetime.now(timezone.utc))
+
+
+def test_entity_read_before_a_write_is_not_cached(cache):
+    # Arrange
+    generation = cache.generation()
+    stale = task(1, "Before the write")
+    cache.invalidate(1)
+    
+    # Act
+    returned = cache.set(1, stale, generation)
+    
+    # Assert
+    assert returned == stale
+    assert cache.get(1) is None
+
+
+def test_entity_read_after_its_last_write_is_cached(cache):
+    # Arrange
+    cache.invalidate(1)
+    generation = cache.generation()
+    
+    # Act
+    cache.set(1, task(1, "After the write"), generation)
+    
+    # Assert
+    assert cache.get(1).title == "After the write"
+
+
+def test_write_to_another_entity_does_not_block_a_fill(cache):
+    # Arrange
+    generation = cache.generation()
+    cache.invalidate(2)
+    
+    # Act
+    cache.set(1, task(1, "Untouched"), generation)
+    
+    # Assert
+    assert cache.get(1).title == "Untouched"
+
+
+def test_writes_evicted_from_the_generation_map_still_block_older_fills(cache, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "CACHE_MAX_ENTRIES", 2)
+    generation = cache.generation()
+    cache.invalidate(1, 2, 3)
+    
+    # Act
+    cache.set(1, task(1, "Evicted write"), generation)
+    
+    # Assert
+    assert cache.get(1) is None
+
+
+def racing_write(repository_class, method: str, entity_cache: EntityCache):
+    """Repository read that is overtaken by a write of the same entity before it returns"""
+    original = getattr(repository_class, method)
+    if inspect.iscoroutinefunction(original):
+        async def read(repository, entity_id):
+            found = await original(repository, entity_id)
+            entity_cache.invalidate(entity_id)
+            return found
+    else:
+        def read(repository, entity_id):
+            found = original(repository, entity_id)
+            entity_cache.invalidate(entity_id)
+            return found
+    return read
+
+
+@pytest.mark.asyncio
+async def test_task_read_overtaken_by_a_write_is_served_but_not_cached(client, make_user, make_task, monkeypatch):
+    # Arrange
+    owner = await make_user()
+    created = await make_task(owner["id"])
+    for repository_class in (TaskRepository, AsyncTaskRepository):
+        monkeypatch.setattr(repository_class, "get_task", racing_write(repository_class, "get_task", task_cache))
+    
+    # Act
+    response = await client.get(f"{API}/tasks/{created['id']}")
+    
+    # Assert
+    assert response.json() == created
+    assert task_cache.get(created["id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_task_read_is_cached_when_no_write_overtakes_it(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    created = await make_task(owner["id"])
+    
+    # Act
+    await client.get(f"{API}/tasks/{created['id']}")
+    
+    # Assert
+    assert task_cache.get(created["id"]).title == created["title"]
+
+
+@pytest.mark.asyncio
+async def test_principal_read_overtaken_by_a_write_is_not_cached(client, auth_headers, monkeypatch):
+    # Arrange
+    for repository_class in (UserRepository, AsyncUserRepository):
+        monkeypatch.setattr(repository_class, "get_user", racing_write(repository_class, "get_user", user_cache))
+    
+    # Act
+    response = await client.get(f"{API}/users/me", headers=auth_headers)
+    
+    # Assert
+    assert response.status_code == 200
+    assert principal_cache.get(response.json()["id"]) is None
+
+
+class RecordingRedis:
+    """In-memory stand-in for a Redis client that records the thread of every call"""
+    
+    def __init__(self):
+        self.values = {}
+        self.threads = []
+    
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return self.values.get(key)
+    
+    def set(self, key, value, ex=None):
+        self.threads.append(threading.get_ident())
+        self.values[key] = value
+    
+    def delete(self, key):
+        self.threads.append(threading.get_ident())
+        self.values.pop(key, None)
+
+
+class AsyncRecordingRedis(RecordingRedis):
+    """The asyncio flavour of RecordingRedis"""
+    
+    async def get(self, key):
+        return super().get(key)
+    
+    async def set(self, key, value, ex=None):
+        super().set(key, value, ex)
+    
+    async def delete(self, key):
+        super().delete(key)
+
+
+@pytest.mark.asyncio
+async def test_async_path_uses_the_async_redis_client():
+    # Arrange
+    client, async_client = RecordingRedis(), AsyncRecordingRedis()
+    cache = EntityCache(RedisCacheBackend(client, 60, async_client=async_client), "tasks", Task)
+    
+    # Act
+    await cache.aset(1, task(1, "Cached"), cache.generation())
+    cached = await cache.aget(1)
+    await cache.ainvalidate(1)
+    
+    # Assert
+    assert cached.title == "Cached"
+    assert await cache.aget(1) is None
+    assert len(async_client.threads) == 4
+    assert client.threads == []
+
+
+@pytest.mark.asyncio
+async def test_async_path_without_an_async_client_calls_redis_off_the_event_loop():
+    # Arrange
+    client = RecordingRedis()
+    cache = EntityCache(RedisCacheBackend(client, 60), "tasks", Task)
+    
+    # Act
+    await cache.aset(1, task(1, "Cached"), cache.generation())
+    cached = await cache.aget(1)
+    await cache.ainvalidate(1)
+    
+    # Assert
+    assert cached.title == "Cached"
+    assert len(client.threads) == 3
+    assert threading.get_ident() not in client.threads
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("database_mode", ["async"], indirect=True)
+async def test_async_database_mode_never_calls_the_blocking_redis_client(client, make_user, make_task, monkeypatch):
+    # Arrange
+    redis_client, async_redis = RecordingRedis(), AsyncRecordingRedis()
+    owner = await make_user()
+    created = await make_task(owner["id"])
+    monkeypatch.setattr(task_cache, "backend", RedisCacheBackend(redis_client, 60, async_client=async_redis))
+    
+    # Act
+    await client.get(f"{API}/tasks/{created['id']}")
+    await client.get(f"{API}/tasks/{created['id']}")
+    await client.put(f"{API}/tasks/{created['id']}", json={"title": "Renamed"})
+    
+    # Assert
+    assert async_redis.threads
+    assert redis_client.threads == []
@@ -0,0 +1,72 @@
+"""
+Streaming NDJSON / CSV export of tasks
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.export import encode_csv
+from app.schemas.task import TaskPriority
+from app.tests.conftest import API
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_streams_every_matching_task_across_batches(client, make_user, make_task, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    owner, other = await make_user(), await make_user()
+    tasks = [await make_task(owner["id"], priority="high") for _ in range(5)]
+    await make_task(other["id"])
+    
+    # Act
+    response = await client.get(f"{API}/tasks/export", params={"owner_id": owner["id"]})
+    
+    # Assert
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [line["id"] for line in lines] == [task["id"] for task in tasks]
+    assert lines[0]["priority"] == "high"
+    assert "change_version" not in lines[0]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_has_a_header_and_one_row_per_task(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    tasks = [await make_task(owner["id"], title="Comma, quoted"), await make_task(owner["id"])]
+    
+    # Act
+    response = await client.get(f"{API}/tasks/export", params={"format": "csv"})
+    
+    # Assert
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="tasks.csv"'
+    assert [int(row["id"]) for row in rows] == [task["id"] for task in tasks]
+    assert rows[0]["title"] == "Comma, quoted"
+
+
+@pytest.mark.asyncio
+async def test_export_of_no_tasks_is_empty(client):
+    # Act
+    response = await client.get(f"{API}/tasks/export")
+    
+    # Assert
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+def test_csv_values_are_exported_as_plain_text():
+    # Arrange
+    due = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+    
+    # Act
+    encoded = encode_csv([[1, TaskPriority.HIGH, due, None]])
+    
+    # Assert
+    assert encoded == b"1,high,2026-03-01T12:30:00+00:00,\r\n"
@@ -0,0 +1,219 @@
+"""
+Idempotency-Key replay of retried writes and the idempotency stores
+"""
+
+import asyncio
+
+import pytest
+
+from app import server
+from app.core.config import settings
+from app.core.idempotency import (
+    IDEMPOTENCY_HEADER,
+    REPLAYED_HEADER,
+    MemoryIdempotencyStore,
+    RedisIdempotencyStore,
+    StoredResponse,
+)
+from app.core.middleware import IdempotencyMiddleware
+from app.tests.conftest import API
+
+
+class FakeRedis:
+    """In-memory stand-in for the asyncio Redis client, without expiry"""
+    
+    def __init__(self):
+        self.values = {}
+    
+    async def get(self, key):
+        return self.values.get(key)
+    
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value.encode() if isinstance(value, str) else value
+        return True
+    
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+@pytest.fixture
+def redis_store() -> RedisIdempotencyStore:
+    """Redis store on a fake client, polling quickly"""
+    return RedisIdempotencyStore(FakeRedis(), ttl_seconds=60, lock_seconds=60, poll_seconds=0.01)
+
+
+@pytest.mark.asyncio
+async def test_retry_with_the_same_key_replays_the_first_response(client, make_user):
+    # Arrange
+    owner = await make_user()
+    payload = {"title": "Once", "owner_id": owner["id"]}
+    headers = {IDEMPOTENCY_HEADER: "create-once"}
+    first = await client.post(f"{API}/tasks/", json=payload, headers=headers)
+    
+    # Act
+    retry = await client.post(f"{API}/tasks/", json=payload, headers=headers)
+    listing = await client.get(f"{API}/tasks/")
+    
+    # Assert
+    assert retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert REPLAYED_HEADER not in first.headers
+    assert [task["id"] for task in listing.json()] == [first.json()["id"]]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_with_the_same_key_run_the_endpoint_once(client, make_user):
+    # Arrange
+    owner = await make_user()
+    payload = {"title": "Raced", "owner_id": owner["id"]}
+    headers = {IDEMPOTENCY_HEADER: "raced"}
+    
+    # Act
+    responses = await asyncio.gather(*(client.post(f"{API}/tasks/", json=payload, headers=headers) for _ in range(3)))
+    listing = await client.get(f"{API}/tasks/")
+    
+    # Assert
+    assert {response.status_code for response in responses} == {201}
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert sum(REPLAYED_HEADER in response.headers for response in responses) == 2
+    assert len(listing.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_a_different_body_is_rejected(client, make_user):
+    # Arrange
+    owner = await make_user()
+    headers = {IDEMPOTENCY_HEADER: "reused"}
+    await client.post(f"{API}/tasks/", json={"title": "First", "owner_id": owner["id"]}, headers=headers)
+    
+    # Act
+    response = await client.post(f"{API}/tasks/", json={"title": "Second", "owner_id": owner["id"]}, headers=headers)
+    
+    # Assert
+    assert response.status_code == 422
+    assert IDEMPOTENCY_HEADER in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_same_key_with_other_credentials_is_not_replayed(client, make_user, auth_headers):
+    # Arrange
+    owner = await make_user()
+    payload = {"title": "Mine", "owner_id": owner["id"]}
+    await client.post(f"{API}/tasks/", json=payload, headers={IDEMPOTENCY_HEADER: "shared"})
+    
+    # Act
+    response = await client.post(f"{API}/tasks/", json=payload, headers={**auth_headers, IDEMPOTENCY_HEADER: "shared"})
+    
+    # Assert
+    assert response.status_code == 201
+    assert REPLAYED_HEADER not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_endpoint_receives_the_body_once_then_the_clients_messages():
+    # Arrange
+    received = []
+    client_messages = [
+        {"type": "http.request", "body": b"{}", "more_body": False},
+        {"type": "http.disconnect"},
+    ]
+    
+    async def endpoint(scope, receive, send):
+        received.extend([await receive(), await receive()])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    
+    async def receive():
+        return client_messages.pop(0)
+    
+    async def send(message):
+        pass
+    
+    middleware = IdempotencyMiddleware(endpoint, MemoryIdempotencyStore(10, 60), wait_seconds=1, max_body_bytes=1024)
+    headers = [(b"idempotency-key", b"k")]
+    scope = {"type": "http", "method": "POST", "path": "/", "query_string": b"", "headers": headers}
+    
+    # Act
+    await middleware(scope, receive, send)
+    
+    # Assert
+    assert received == [{"type": "http.request", "body": b"{}", "more_body": False}, {"type": "http.disconnect"}]
+
+
+@pytest.mark.asyncio
+async def test_redis_store_lets_one_request_claim_a_key(redis_store):
+    # Arrange
+    key = ("credentials", "key")
+    
+    # Act
+    first = await redis_store.begin(key, "fingerprint")
+    second = await redis_store.begin(key, "other")
+    
+    # Assert
+    assert first is None
+    assert second == "fingerprint"
+    assert redis_store.get_stats()["in_flight"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_store_replays_the_finished_response(redis_store):
+    # Arrange
+    key = ("credentials", "key")
+    stored = StoredResponse("fingerprint", 201, [(b"content-type", b"application/json")], b'{"id": 1}')
+    await redis_store.begin(key, "fingerprint")
+    
+    # Act
+    await redis_store.finish(key, stored)
+    
+    # Assert
+    assert await redis_store.get(key) == stored
+    assert await redis_store.begin(key, "fingerprint") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_store_wait_returns_once_the_claim_is_released(redis_store):
+    # Arrange
+    key = ("credentials", "key")
+    await redis_store.begin(key, "fingerprint")
+    asyncio.get_running_loop().call_later(0.05, asyncio.ensure_future, redis_store.finish(key, None))
+    
+    # Act
+    finished = await redis_store.wait(key, timeout=1)
+    
+    # Assert
+    assert finished is True
+    assert await redis_store.get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_store_wait_times_out_while_the_key_is_claimed(redis_store):
+    # Arrange
+    key = ("credentials", "key")
+    await redis_store.begin(key, "fingerprint")
+    
+    # Act
+    finished = await redis_store.wait(key, timeout=0.05)
+    
+    # Assert
+    assert finished is False
+
+
+def test_several_workers_with_the_memory_store_refuse_to_start(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "IDEMPOTENCY_BACKEND", "memory")
+    
+    # Act / Assert
+    with pytest.raises(ValueError, match="IDEMPOTENCY_BACKEND"):
+        server.check_shared_state(2)
+
+
+@pytest.mark.parametrize("backend, workers", [("memory", 1), ("redis", 4)])
+def test_a_single_worker_or_the_redis_store_may_start(monkeypatch, backend, workers):
+    # Arrange
+    monkeypatch.setattr(settings, "IDEMPOTENCY_BACKEND", backend)
+    
+    # Act / Assert
+    server.check_shared_state(workers)
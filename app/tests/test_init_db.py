@@ -0,0 +1,99 @@
+"""
+Synthetic data generator of init_db.py (scale mode)
+"""
+
+import random
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+import init_db
+from app.core.database import engine
+from app.models.task import Task
+from app.tests.conftest import API
+
+
+@pytest.fixture
+def scale_db(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Point init_db at the test database"""
+    monkeypatch.setattr(init_db, "engine", engine)
+    monkeypatch.setattr(init_db, "SessionLocal", sessionmaker(bind=engine))
+
+
+def test_generated_tasks_are_reproducible_from_the_seed():
+    # Act
+    first = list(init_db.generate_tasks(random.Random(1), range(1, 3), 5))
+    second = list(init_db.generate_tasks(random.Random(1), range(1, 3), 5))
+    
+    # Assert
+    assert len(first) == 10
+    assert [task["title"] for task in first] == [task["title"] for task in second]
+    assert [task["owner_id"] for task in first] == [1] * 5 + [2] * 5
+
+
+def test_rows_are_chunked_into_batches():
+    # Act
+    chunks = list(init_db.chunked(iter(range(7)), 3))
+    
+    # Assert
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+@pytest.mark.asyncio
+async def test_scale_mode_loads_users_tasks_and_counters(client, scale_db):
+    # Act
+    init_db.seed_scale(users=3, tasks_per_user=4, batch_size=5)
+    
+    # Assert
+    users = (await client.get(f"{API}/users/")).json()
+    stats = (await client.get(f"{API}/tasks/stats")).json()
+    assert len(users) == 3
+    assert stats["total"] == 12
+    assert (await client.get(f"{API}/users/{users[0]['id']}/stats")).json()["total"] == 4
+
+
+@pytest.mark.asyncio
+async def test_scale_mode_appends_to_an_existing_database(client, scale_db, make_user):
+    # Arrange
+    existing = await make_user()
+    
+    # Act
+    init_db.seed_scale(users=2, tasks_per_user=1, batch_size=10)
+    
+    # Assert
+    ids = [user["id"] for user in (await client.get(f"{API}/users/")).json()]
+    assert ids == [existing["id"], existing["id"] + 1, existing["id"] + 2]
+    assert (await client.get(f"{API}/tasks/stats")).json()["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_scale_mode_keeps_search_in_sync_after_the_load(client, scale_db, make_task):
+    # Arrange
+    init_db.seed_scale(users=1, tasks_per_user=2, batch_size=10)
+    owner_id = (await client.get(f"{API}/users/")).json()[0]["id"]
+    
+    # Act
+    created = await make_task(owner_id, title="Quokka census")
+    
+    # Assert
+    found = (await client.get(f"{API}/tasks/search", params={"q": "quokka"})).json()
+    assert [task["id"] for task in found] == [created["id"]]
+
+
+@pytest.mark.asyncio
+async def test_scale_mode_tasks_reach_clients_that_synced_before(client, scale_db, make_user):
+    # Arrange
+    await make_user()
+    token = (await client.get(f"{API}/tasks/sync")).json()["token"]
+    
+    # Act
+    init_db.seed_scale(users=2, tasks_per_user=3, batch_size=4)
+    
+    # Assert
+    with engine.connect() as connection:
+        versions = connection.execute(select(Task.change_version)).scalars().all()
+    synced = (await client.get(f"{API}/tasks/sync", params={"since": token})).json()
+    assert len(versions) == 6 and min(versions) > 0
+    assert len(set(versions)) == 2
+    assert len(synced["items"]) == 6
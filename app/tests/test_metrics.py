@@ -0,0 +1,105 @@
+"""
+Prometheus metrics: sharded counters and histograms, and the request metrics middleware
+"""
+
+import threading
+
+import pytest
+
+from app.core.metrics import Counter, Gauge, Histogram, Metric, http_requests_total
+from app.tests.conftest import API
+
+
+def test_counter_sums_the_increments_of_every_thread():
+    # Arrange
+    counter = Counter("jobs_total", "Jobs", ("kind",))
+    threads = [threading.Thread(target=lambda: [counter.inc(("import",)) for _ in range(1000)]) for _ in range(4)]
+    
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # Assert
+    assert counter.values() == {("import",): 4000}
+    assert counter.samples() == ['jobs_total{kind="import"} 4000']
+
+
+def test_gauge_goes_down_as_well_as_up():
+    # Arrange
+    gauge = Gauge("in_flight", "In flight")
+    
+    # Act
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    
+    # Assert
+    assert gauge.expose() == "# HELP in_flight In flight\n# TYPE in_flight gauge\nin_flight 1"
+
+
+def test_histogram_buckets_are_cumulative():
+    # Arrange
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    
+    # Act
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    
+    # Assert
+    assert histogram.samples() == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_label_values_are_escaped():
+    # Arrange
+    counter = Counter("errors_total", "Errors", ("message",))
+    
+    # Act
+    counter.inc(('say "hi"\n',))
+    
+    # Assert
+    assert counter.samples() == ['errors_total{message="say \\"hi\\"\\n"} 1']
+
+
+def test_metric_without_samples_cannot_be_created():
+    # Arrange
+    class Unfinished(Metric):
+        kind = "gauge"
+    
+    # Act / Assert
+    with pytest.raises(TypeError, match="samples"):
+        Unfinished("unfinished", "Never exposed")
+
+
+@pytest.mark.asyncio
+async def test_requests_are_counted_by_route_template(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    labels = ("GET", f"{API}/tasks/{{task_id}}", "200")
+    before = http_requests_total.values().get(labels, 0)
+    
+    # Act
+    await client.get(f"{API}/tasks/{task['id']}")
+    await client.get(f"{API}/tasks/{task['id']}")
+    
+    # Assert
+    assert http_requests_total.values()[labels] - before == 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_prometheus_text(client):
+    # Act
+    response = await client.get("/metrics")
+    
+    # Assert
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'db_pool_size{engine=' in response.text
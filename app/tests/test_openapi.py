@@ -0,0 +1,102 @@
+"""
+Cold start: import time of the app and the cached OpenAPI schema
+"""
+
+import subprocess
+import sys
+from typing import List
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from pydantic import BaseModel, Field
+
+from app.core.openapi import install_schema_cache, schema_fingerprint
+from benchmarks.startup import DEFAULT_BUDGET_MS, DEFAULT_LAZY, ROOT, TARGET, parse_importtime
+
+
+def build_app(max_items: int) -> FastAPI:
+    """App with one route whose body limits its items, like the bulk endpoints"""
+    
+    class Bulk(BaseModel):
+        ids: List[int] = Field(..., min_length=1, max_length=max_items)
+    
+    app = FastAPI(title="Fingerprinted")
+    
+    @app.post("/bulk")
+    def bulk(body: Bulk) -> dict:
+        return {}
+    
+    return app
+
+
+@pytest.fixture(scope="module")
+def imported_modules() -> dict:
+    """Module import times of the app in a fresh interpreter - the fastest of three runs"""
+    runs = []
+    for _ in range(3):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        runs.append(parse_importtime(result.stderr))
+    return min(runs, key=lambda modules: modules[TARGET][1])
+
+
+def test_app_imports_within_the_startup_budget(imported_modules):
+    # Act
+    import_ms = imported_modules[TARGET][1] / 1000
+    
+    # Assert
+    assert import_ms <= DEFAULT_BUDGET_MS
+
+
+def test_app_import_leaves_the_auth_libraries_for_first_use(imported_modules):
+    # Act
+    eager = {name.split(".")[0] for name in imported_modules} & set(DEFAULT_LAZY)
+    
+    # Assert
+    assert eager == set()
+
+
+def test_fingerprint_changes_with_a_schema_constraint_from_settings():
+    # Act
+    fingerprints = {schema_fingerprint(build_app(max_items)) for max_items in (1000, 1000, 50)}
+    
+    # Assert
+    assert len(fingerprints) == 2
+
+
+def test_generated_schema_is_saved_and_served_from_the_cache(tmp_path):
+    # Arrange
+    path = tmp_path / "openapi.json"
+    first = build_app(1000)
+    install_schema_cache(first, str(path))
+    schema = first.openapi()
+    second = build_app(1000)
+    second.openapi = lambda: pytest.fail("generated again")
+    
+    # Act
+    install_schema_cache(second, str(path))
+    cached = second.openapi()
+    
+    # Assert
+    assert cached == schema
+    assert orjson.loads(path.read_bytes())["fingerprint"] == schema_fingerprint(second)
+
+
+def test_stale_cache_is_regenerated(tmp_path):
+    # Arrange
+    path = tmp_path / "openapi.json"
+    stale = build_app(1000)
+    install_schema_cache(stale, str(path))
+    stale.openapi()
+    changed = build_app(50)
+    install_schema_cache(changed, str(path))
+    
+    # Act
+    schema = changed.openapi()
+    
+    # Assert
+    assert schema["components"]["schemas"]["Bulk"]["properties"]["ids"]["maxItems"] == 50
+    assert orjson.loads(path.read_bytes())["fingerprint"] == schema_fingerprint(changed)
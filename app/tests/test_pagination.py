@@ -0,0 +1,121 @@
+"""
+Keyset (cursor) pagination of task and user listings
+"""
+
+import pytest
+
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.tests.conftest import API
+
+
+async def collect_pages(client, url: str, **params) -> list:
+    """Follow X-Next-Cursor to the last page - the ids of every page"""
+    pages = []
+    response = await client.get(url, params=params)
+    pages.append([item["id"] for item in response.json()])
+    while NEXT_CURSOR_HEADER in response.headers:
+        response = await client.get(url, params={**params, "after": response.headers[NEXT_CURSOR_HEADER]})
+        assert response.status_code == 200, response.text
+        pages.append([item["id"] for item in response.json()])
+    return pages
+
+
+@pytest.mark.asyncio
+async def test_task_cursor_walks_every_task_once_in_id_order(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    ids = [(await make_task(owner["id"]))["id"] for _ in range(5)]
+    
+    # Act
+    pages = await collect_pages(client, f"{API}/tasks/", limit=2)
+    
+    # Assert
+    assert pages == [ids[0:2], ids[2:4], ids[4:5]]
+
+
+@pytest.mark.asyncio
+async def test_task_cursor_follows_descending_id_order(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    ids = [(await make_task(owner["id"]))["id"] for _ in range(4)]
+    
+    # Act
+    pages = await collect_pages(client, f"{API}/tasks/", limit=2, sort="-id")
+    
+    # Assert
+    assert pages == [ids[:1:-1], ids[1::-1], []]
+
+
+@pytest.mark.asyncio
+async def test_task_cursor_skips_rows_deleted_before_the_next_page(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    ids = [(await make_task(owner["id"]))["id"] for _ in range(4)]
+    first = await client.get(f"{API}/tasks/", params={"limit": 2})
+    await client.delete(f"{API}/tasks/{ids[1]}")
+    
+    # Act
+    second = await client.get(f"{API}/tasks/", params={"limit": 2, "after": first.headers[NEXT_CURSOR_HEADER]})
+    
+    # Assert
+    assert [task["id"] for task in second.json()] == ids[2:4]
+
+
+@pytest.mark.asyncio
+async def test_user_cursor_walks_every_user_once(client, make_user):
+    # Arrange
+    ids = [(await make_user())["id"] for _ in range(3)]
+    
+    # Act
+    pages = await collect_pages(client, f"{API}/users/", limit=2)
+    
+    # Assert
+    assert pages == [ids[0:2], ids[2:3]]
+
+
+@pytest.mark.asyncio
+async def test_user_tasks_cursor_walks_only_that_users_tasks(client, make_user, make_task):
+    # Arrange
+    owner, other = await make_user(), await make_user()
+    ids = [(await make_task(owner["id"]))["id"] for _ in range(3)]
+    await make_task(other["id"])
+    
+    # Act
+    pages = await collect_pages(client, f"{API}/users/{owner['id']}/tasks", limit=2)
+    
+    # Assert
+    assert pages == [ids[0:2], ids[2:3]]
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_a_bad_request(client):
+    # Act
+    response = await client.get(f"{API}/tasks/", params={"after": "not-a-cursor"})
+    
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+@pytest.mark.asyncio
+async def test_cursor_with_a_non_id_sort_is_a_bad_request(client):
+    # Act
+    response = await client.get(f"{API}/tasks/", params={"after": encode_cursor(1), "sort": "due_date"})
+    
+    # Assert
+    assert response.status_code == 400
+
+
+def test_cursor_round_trips_the_last_id():
+    # Act
+    decoded = decode_cursor(encode_cursor(12345))
+    
+    # Assert
+    assert decoded == 12345
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "eDox", encode_cursor(1)[:-1] + "$"])
+def test_malformed_cursors_are_rejected(cursor):
+    # Act / Assert
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
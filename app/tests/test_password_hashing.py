@@ -0,0 +1,145 @@
+"""
+Password hashing on a bounded executor, cost calibration and hash upgrades on login
+"""
+
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import select
+
+from app.core import security
+from app.core.database import engine
+from app.core.security import PasswordHasher, PasswordHashingBusyError, password_hasher
+from app.models.user import User
+from app.tests.conftest import API, PASSWORD
+
+
+@pytest.fixture
+def hasher() -> PasswordHasher:
+    """Cheapest-cost hasher with its own executor"""
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=2)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_verifies_only_the_hashed_password(hasher):
+    # Arrange
+    hashed = hasher.hash("secret")
+    
+    # Act
+    valid, invalid = hasher.verify("secret", hashed), hasher.verify("not-secret", hashed)
+    
+    # Assert
+    assert valid is True
+    assert invalid is False
+    assert hasher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_async_hashing_runs_off_the_event_loop_thread(hasher, monkeypatch):
+    # Arrange
+    threads = []
+    original = security._hash_password
+    
+    def recording_hash(password, rounds):
+        threads.append(threading.get_ident())
+        return original(password, rounds)
+    
+    monkeypatch.setattr(security, "_hash_password", recording_hash)
+    monkeypatch.setitem(security.HASH_OPERATIONS, recording_hash, "hash")
+    
+    # Act
+    hashed = await hasher.hash_async("secret")
+    
+    # Assert
+    assert await hasher.verify_async("secret", hashed) is True
+    assert threads and threads[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_hashing_beyond_the_pending_limit_fails_fast(hasher, monkeypatch):
+    # Arrange
+    release = threading.Event()
+    
+    def blocked_hash(password, rounds):
+        release.wait(5)
+        return password
+    
+    monkeypatch.setattr(security, "_hash_password", blocked_hash)
+    monkeypatch.setitem(security.HASH_OPERATIONS, blocked_hash, "hash")
+    queued = [asyncio.ensure_future(hasher.hash_async("secret")) for _ in range(hasher.max_pending)]
+    await asyncio.sleep(0)
+    
+    # Act / Assert
+    with pytest.raises(PasswordHashingBusyError):
+        await hasher.hash_async("secret")
+    release.set()
+    await asyncio.gather(*queued)
+    assert hasher.pending == 0
+
+
+def test_outdated_hash_is_upgraded_to_the_current_cost(hasher):
+    # Arrange
+    old_hash = PasswordHasher(rounds=4).hash("secret")
+    hasher.rounds = 5
+    
+    # Act
+    valid, new_hash = hasher.verify_and_update("secret", old_hash)
+    
+    # Assert
+    assert valid is True
+    assert new_hash is not None and not hasher.needs_update(new_hash)
+    assert hasher.verify("secret", new_hash) is True
+
+
+def test_current_hash_is_not_upgraded(hasher):
+    # Arrange
+    hashed = hasher.hash("secret")
+    
+    # Act
+    valid, new_hash = hasher.verify_and_update("secret", hashed)
+    
+    # Assert
+    assert valid is True
+    assert new_hash is None
+
+
+@pytest.mark.parametrize("target_ms, expected", [(0.001, 4), (10 ** 9, 6)])
+def test_calibration_stays_within_the_cost_bounds(hasher, target_ms, expected):
+    # Act
+    rounds = hasher.calibrate(target_ms, min_rounds=4, max_rounds=6)
+    
+    # Assert
+    assert rounds == expected
+    assert hasher.rounds == expected
+
+
+@pytest.mark.asyncio
+async def test_login_is_shed_with_503_when_hashing_is_saturated(client, make_user, monkeypatch):
+    # Arrange
+    user = await make_user()
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    
+    # Act
+    response = await client.post(f"{API}/auth/token", data={"username": user["email"], "password": PASSWORD})
+    
+    # Assert
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_a_hash_below_the_current_cost(client, make_user, monkeypatch):
+    # Arrange
+    user = await make_user()
+    monkeypatch.setattr(password_hasher, "rounds", 5)
+    
+    # Act
+    response = await client.post(f"{API}/auth/token", data={"username": user["email"], "password": PASSWORD})
+    
+    # Assert
+    with engine.connect() as connection:
+        hashed = connection.scalar(select(User.hashed_password).where(User.id == user["id"]))
+    assert response.status_code == 200
+    assert not password_hasher.needs_update(hashed)
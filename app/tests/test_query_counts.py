@@ -0,0 +1,49 @@
+"""
+Statement counts of list endpoints - fixed whatever the page size (no N+1)
+"""
+
+import pytest
+
+from app.tests.conftest import API
+
+
+async def statement_count(client, query_stats, url: str, **params) -> int:
+    """Statements executed to serve one request"""
+    response = await client.get(url, params=params)
+    assert response.status_code == 200, response.text
+    return query_stats[-1].count
+
+
+@pytest.mark.asyncio
+async def test_task_listing_with_owners_runs_the_same_statements_for_any_page_size(
+    client, make_user, make_task, query_stats
+):
+    # Arrange
+    owners = [await make_user() for _ in range(4)]
+    for owner in owners:
+        for _ in range(3):
+            await make_task(owner["id"])
+    
+    # Act
+    counts = [
+        await statement_count(client, query_stats, f"{API}/tasks/", limit=limit, expand="owner")
+        for limit in (1, 5, 12)
+    ]
+    
+    # Assert
+    assert len(set(counts)) == 1, counts
+    assert max(query_stats[-1].statements.values()) == 1
+
+
+@pytest.mark.asyncio
+async def test_user_listing_runs_the_same_statements_for_any_page_size(client, make_user, query_stats):
+    # Arrange
+    for _ in range(6):
+        await make_user()
+    
+    # Act
+    counts = [await statement_count(client, query_stats, f"{API}/users/", limit=limit) for limit in (1, 3, 6)]
+    
+    # Assert
+    assert len(set(counts)) == 1, counts
+    assert max(query_stats[-1].statements.values()) == 1
@@ -0,0 +1,88 @@
+"""
+Per-request SQL instrumentation: Server-Timing, the slow query log and the N+1 detector
+"""
+
+import logging
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.middleware import QueryStatsMiddleware
+from app.core.query_stats import QueryStats, current_query_stats
+from app.tests.conftest import API
+
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_the_requests_queries(client, make_user, query_stats):
+    # Arrange
+    user = await make_user()
+    
+    # Act
+    response = await client.get(f"{API}/users/{user['id']}")
+    
+    # Assert
+    match = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries"', response.headers["Server-Timing"])
+    assert match is not None
+    assert int(match.group(2)) == query_stats[-1].count > 0
+
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_logged_without_parameters(client, make_user, monkeypatch, caplog):
+    # Arrange
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0.0)
+    
+    # Act
+    with caplog.at_level(logging.WARNING, logger="app.db"):
+        await make_user(email="secret@example.com")
+    
+    # Assert
+    messages = [record.getMessage() for record in caplog.records if record.name == "app.db"]
+    assert any(message.startswith("slow_query") and "INSERT INTO users" in message for message in messages)
+    assert not any("secret@example.com" in message for message in messages)
+
+
+def test_repeated_statements_are_reported_as_n_plus_one(monkeypatch, caplog):
+    # Arrange
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 3)
+    stats = QueryStats()
+    stats.statements.update({"SELECT * FROM users WHERE id = ?": 3, "SELECT * FROM tasks": 1})
+    
+    # Act
+    with caplog.at_level(logging.WARNING, logger="app.db"):
+        QueryStatsMiddleware._report_repeated({"method": "GET", "path": f"{API}/tasks/"}, stats)
+    
+    # Assert
+    assert [record.getMessage() for record in caplog.records] == [
+        f"n_plus_one method=GET route={API}/tasks/ count=3 statement='SELECT * FROM users WHERE id = ?'"
+    ]
+
+
+def test_statements_are_counted_only_while_a_request_is_served():
+    # Arrange
+    stats = QueryStats()
+    
+    # Act
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        token = current_query_stats.set(stats)
+        try:
+            connection.execute(text("SELECT 2"))
+        finally:
+            current_query_stats.reset(token)
+    
+    # Assert
+    assert stats.count == 1
+
+
+def test_failed_statements_do_not_leak_timers():
+    # Act
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM missing_table"))
+        
+        # Assert
+        assert connection.info.get("query_started_at") == []
@@ -0,0 +1,144 @@
+"""
+Read replica routing: replica reads, primary fallbacks and read-your-writes pinning
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Iterator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import Engine, create_engine, insert, text, update
+from starlette.responses import PlainTextResponse
+
+from app.core.database import Base, engine
+from app.core.middleware import READ_PRIMARY_COOKIE, ReadYourWritesMiddleware
+from app.core.replicas import ReplicaSet, RoutingSession, primary_reads
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.tests.conftest import TEST_DIR
+
+
+def add_user(bind: Engine, username: str) -> None:
+    """Insert a user directly into one database"""
+    with bind.begin() as connection:
+        connection.execute(insert(User.__table__).values(
+            email=f"{username}@example.com", username=username, hashed_password="x",
+            is_active=True, is_superuser=False, created_at=datetime.now(timezone.utc)
+        ))
+
+
+@pytest.fixture
+def replica() -> Iterator[Engine]:
+    """Separate database standing in for a replica, holding different rows than the primary"""
+    replica_engine = create_engine(f"sqlite:///{os.path.join(TEST_DIR, 'replica.db')}")
+    Base.metadata.drop_all(replica_engine)
+    Base.metadata.create_all(replica_engine)
+    add_user(replica_engine, "on_replica")
+    add_user(engine, "on_primary")
+    yield replica_engine
+    replica_engine.dispose()
+
+
+@pytest.fixture
+def replicas(replica: Engine) -> ReplicaSet:
+    """Replica set of the one replica"""
+    return ReplicaSet([replica], retry_seconds=30)
+
+
+@pytest.fixture
+def session(replicas: ReplicaSet) -> Iterator[RoutingSession]:
+    """Routing session on the test database as the primary"""
+    with RoutingSession(bind=engine, replicas=replicas) as session:
+        yield session
+
+
+def usernames(session: RoutingSession) -> list:
+    """Usernames listed by a replica-read repository method"""
+    return [user.username for user in UserRepository(session).get_users()]
+
+
+def test_replica_reads_go_to_a_replica(session):
+    # Act
+    names = usernames(session)
+    
+    # Assert
+    assert names == ["on_replica"]
+
+
+def test_other_reads_stay_on_the_primary(session):
+    # Act
+    names = [row.username for row in session.execute(text("SELECT username FROM users"))]
+    
+    # Assert
+    assert names == ["on_primary"]
+
+
+def test_reads_after_a_write_in_the_session_go_to_the_primary(session):
+    # Arrange
+    session.execute(update(User.__table__).values(full_name="Written"))
+    
+    # Act
+    names = usernames(session)
+    
+    # Assert
+    assert names == ["on_primary"]
+
+
+def test_requests_pinned_to_the_primary_read_from_it(session):
+    # Arrange
+    token = primary_reads.set(True)
+    
+    # Act
+    try:
+        names = usernames(session)
+    finally:
+        primary_reads.reset(token)
+    
+    # Assert
+    assert names == ["on_primary"]
+
+
+def test_reads_fall_back_to_the_primary_when_every_replica_is_ejected(session, replicas, replica):
+    # Arrange
+    replicas.eject(replica)
+    
+    # Act
+    names = usernames(session)
+    
+    # Assert
+    assert replicas.healthy() == 0
+    assert names == ["on_primary"]
+
+
+def test_replicas_are_chosen_round_robin_skipping_ejected_ones(replica):
+    # Arrange
+    others = [create_engine("sqlite://") for _ in range(2)]
+    replicas = ReplicaSet([replica, *others], retry_seconds=30)
+    replicas.eject(others[0])
+    
+    # Act
+    chosen = [replicas.choose() for _ in range(4)]
+    
+    # Assert
+    assert chosen == [replica, others[1], replica, others[1]]
+
+
+@pytest.mark.asyncio
+async def test_clients_that_just_wrote_are_pinned_to_the_primary():
+    # Arrange
+    async def echo_pinning(scope, receive, send):
+        await PlainTextResponse(str(primary_reads.get()))(scope, receive, send)
+    
+    app = ReadYourWritesMiddleware(echo_pinning, sticky_seconds=5)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as http_client:
+        # Act
+        before = await http_client.get("/")
+        write = await http_client.post("/")
+        after = await http_client.get("/")
+    
+    # Assert
+    assert before.text == "False"
+    assert write.text == "True"
+    assert READ_PRIMARY_COOKIE in write.headers["set-cookie"]
+    assert after.text == "True"
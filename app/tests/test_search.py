@@ -0,0 +1,96 @@
+"""
+Full-text task search: ranking, stemming, filters and updates kept in sync
+"""
+
+import pytest
+
+from app.tests.conftest import API
+
+
+async def search(client, q: str, **params) -> list:
+    """IDs of the matching tasks, best match first"""
+    response = await client.get(f"{API}/tasks/search", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return [task["id"] for task in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_title_matches_rank_above_description_matches(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    in_description = await make_task(owner["id"], title="Chores", description="Pay the invoice")
+    in_title = await make_task(owner["id"], title="Invoice for March")
+    await make_task(owner["id"], title="Unrelated")
+    
+    # Act
+    ids = await search(client, "invoice")
+    
+    # Assert
+    assert ids == [in_title["id"], in_description["id"]]
+
+
+@pytest.mark.asyncio
+async def test_search_matches_word_stems(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"], title="Running the migrations")
+    
+    # Act
+    ids = await search(client, "run migration")
+    
+    # Assert
+    assert ids == [task["id"]]
+
+
+@pytest.mark.asyncio
+async def test_search_applies_task_filters(client, make_user, make_task):
+    # Arrange
+    owner, other = await make_user(), await make_user()
+    match = await make_task(owner["id"], title="Report")
+    await make_task(other["id"], title="Report")
+    
+    # Act
+    ids = await search(client, "report", owner_id=owner["id"])
+    
+    # Assert
+    assert ids == [match["id"]]
+
+
+@pytest.mark.asyncio
+async def test_search_sees_updates_and_deletes(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    renamed = await make_task(owner["id"], title="Draft")
+    deleted = await make_task(owner["id"], title="Draft")
+    await client.put(f"{API}/tasks/{renamed['id']}", json={"title": "Final"})
+    await client.delete(f"{API}/tasks/{deleted['id']}")
+    
+    # Act
+    drafts, finals = await search(client, "draft"), await search(client, "final")
+    
+    # Assert
+    assert drafts == []
+    assert finals == [renamed["id"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("q", ['"', "AND OR NOT", "*", "title:"])
+async def test_search_syntax_characters_never_fail(client, make_user, make_task, q):
+    # Arrange
+    owner = await make_user()
+    await make_task(owner["id"], title="Plain")
+    
+    # Act
+    response = await client.get(f"{API}/tasks/search", params={"q": q})
+    
+    # Assert
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_empty_search_query_is_rejected(client):
+    # Act
+    response = await client.get(f"{API}/tasks/search", params={"q": ""})
+    
+    # Assert
+    assert response.status_code == 422
@@ -0,0 +1,114 @@
+"""
+Fast serialization path of list endpoints: orjson rows matching the validated response models
+"""
+
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from app.core.serialization import ORJSONResponse, dump_rows
+from app.main import app
+from app.schemas.task import Task, TaskWithOwner
+from app.tests.conftest import API
+
+
+@pytest.mark.asyncio
+async def test_task_listing_matches_the_validated_single_task_responses(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    await make_task(owner["id"], due_date="2026-03-01T12:30:00Z", description="Notes")
+    await make_task(owner["id"], priority="low")
+    
+    # Act
+    listing = await client.get(f"{API}/tasks/")
+    
+    # Assert
+    singles = [(await client.get(f"{API}/tasks/{task['id']}")).json() for task in listing.json()]
+    assert listing.json() == singles
+    assert listing.json()[0]["due_date"].startswith("2026-03-01T12:30:00")
+
+
+@pytest.mark.asyncio
+async def test_user_listing_never_includes_the_password_hash(client, make_user):
+    # Arrange
+    await make_user()
+    
+    # Act
+    response = await client.get(f"{API}/users/")
+    
+    # Assert
+    assert "hashed_password" not in response.json()[0]
+    assert b"hashed_password" not in response.content
+
+
+@pytest.mark.asyncio
+async def test_sparse_fieldset_returns_the_requested_fields_and_the_id(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    
+    # Act
+    response = await client.get(f"{API}/tasks/", params={"fields": "title,priority"})
+    
+    # Assert
+    assert response.json() == [{"id": task["id"], "title": task["title"], "priority": task["priority"]}]
+
+
+@pytest.mark.asyncio
+async def test_expanded_owner_validates_against_the_declared_response_model(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    await make_task(owner["id"])
+    
+    # Act
+    response = await client.get(f"{API}/tasks/", params={"expand": "owner"})
+    
+    # Assert
+    expanded = [TaskWithOwner.model_validate(task) for task in response.json()]
+    assert expanded[0].owner.model_dump(mode="json") == owner
+
+
+def test_task_listing_documents_the_expanded_owner():
+    # Act
+    schema = app.openapi()
+    
+    # Assert
+    listing = schema["paths"][f"{API}/tasks/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert listing["items"]["$ref"].endswith("/TaskWithOwner")
+    owner = schema["components"]["schemas"]["TaskWithOwner"]["properties"]["owner"]
+    assert {"$ref": "#/components/schemas/User"} in owner["anyOf"]
+    assert "owner" not in schema["components"]["schemas"]["TaskWithOwner"].get("required", [])
+
+
+@pytest.mark.asyncio
+async def test_unknown_sparse_field_is_a_bad_request(client):
+    # Act
+    response = await client.get(f"{API}/tasks/", params={"fields": "title,hashed_password"})
+    
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: hashed_password"
+
+
+def test_orjson_datetimes_match_pydantic_output():
+    # Arrange
+    task = Task(
+        id=1, title="Due", owner_id=1,
+        created_at=datetime(2026, 3, 1, 12, 30, 15, 250000, tzinfo=timezone.utc),
+        due_date=datetime(2026, 3, 2, tzinfo=timezone.utc)
+    )
+    
+    # Act
+    encoded = ORJSONResponse(task.model_dump()).body
+    
+    # Assert
+    assert orjson.loads(encoded) == orjson.loads(task.model_dump_json())
+
+
+def test_dump_rows_accepts_dicts():
+    # Act
+    encoded = dump_rows([{"id": 1, "title": "Plain"}])
+    
+    # Assert
+    assert encoded == b'[{"id":1,"title":"Plain"}]'
@@ -0,0 +1,185 @@
+"""
+Production server sizing and per-process state with several workers
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app import server
+from app.core.cache import MemoryCacheBackend, NullCacheBackend, build_cache_backend
+from app.core.config import pool_limits, settings, worker_processes
+from app.core.idempotency import check_idempotency_backend
+from app.services import user_service
+from app.services.user_service import build_principal_cache
+from app.tests.conftest import API
+from benchmarks.load import ROOT, free_port
+
+
+@pytest.fixture
+def several_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Settings of a worker started by the production server with four workers"""
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 4)
+
+
+@pytest.fixture
+def spawned_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A worker spawned by a process manager (uvicorn --workers) without SERVER_WORKERS"""
+    monkeypatch.setattr(settings, "SERVER_WORKERS", None)
+    monkeypatch.setattr(multiprocessing, "parent_process", lambda: object())
+
+
+def test_configured_worker_count_is_used_as_is(several_workers):
+    # Act
+    workers = server.worker_count()
+    
+    # Assert
+    assert workers == 4
+
+
+def test_worker_count_defaults_to_the_cores_within_the_connection_budget(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "SERVER_WORKERS", None)
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 3)
+    monkeypatch.setattr(server, "available_cores", lambda: 8)
+    
+    # Act
+    workers = server.worker_count()
+    
+    # Assert
+    assert workers == 3
+
+
+def test_each_worker_pool_gets_its_share_of_the_connection_budget(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 20)
+    
+    # Act
+    pool_size, max_overflow = pool_limits(workers=4)
+    
+    # Assert
+    assert pool_size + max_overflow == 5
+
+
+def test_memory_entity_cache_is_off_with_several_workers(several_workers, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    
+    # Act
+    backend = build_cache_backend()
+    
+    # Assert
+    assert isinstance(backend, NullCacheBackend)
+
+
+def test_memory_entity_cache_is_used_with_a_single_worker(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 1)
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    
+    # Act
+    backend = build_cache_backend()
+    
+    # Assert
+    assert isinstance(backend, MemoryCacheBackend)
+
+
+def test_several_workers_with_the_memory_cache_log_a_warning(several_workers, monkeypatch, caplog):
+    # Arrange
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "IDEMPOTENCY_BACKEND", "redis")
+    
+    # Act
+    with caplog.at_level(logging.WARNING, logger="uvicorn.error"):
+        server.check_shared_state(4)
+    
+    # Assert
+    assert "CACHE_BACKEND=memory" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_principals_are_not_cached_with_several_workers(client, auth_headers, several_workers, monkeypatch):
+    # Arrange
+    principal_cache = build_principal_cache()
+    monkeypatch.setattr(user_service, "principal_cache", principal_cache)
+    
+    # Act
+    response = await client.get(f"{API}/users/me", headers=auth_headers)
+    
+    # Assert
+    assert response.status_code == 200
+    assert len(principal_cache) == 0
+
+
+@pytest.mark.parametrize("configured, expected", [(None, 1), (1, 1), (4, 4)])
+def test_lone_process_serves_alone_unless_configured_otherwise(monkeypatch, configured, expected):
+    # Arrange
+    monkeypatch.setattr(settings, "SERVER_WORKERS", configured)
+    
+    # Act
+    workers = worker_processes()
+    
+    # Assert
+    assert workers == expected
+
+
+def test_spawned_worker_does_not_know_how_many_workers_there_are(spawned_worker):
+    # Act
+    workers = worker_processes()
+    
+    # Assert
+    assert workers is None
+
+
+def test_spawned_worker_keeps_no_per_process_caches(spawned_worker, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    
+    # Act
+    backend = build_cache_backend()
+    principal_cache = build_principal_cache()
+    
+    # Assert
+    assert isinstance(backend, NullCacheBackend)
+    assert principal_cache.max_entries == 0
+
+
+def test_spawned_worker_refuses_the_memory_idempotency_store(spawned_worker, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "IDEMPOTENCY_BACKEND", "memory")
+    
+    # Act / Assert
+    with pytest.raises(ValueError, match="IDEMPOTENCY_BACKEND=memory"):
+        check_idempotency_backend(worker_processes())
+
+
+def test_uvicorn_with_several_workers_and_no_server_workers_refuses_to_start(tmp_path):
+    # Arrange
+    env = {name: value for name, value in os.environ.items() if name != "SERVER_WORKERS"}
+    env.update(DATABASE_URL=f"sqlite:///{tmp_path}/app.db", IDEMPOTENCY_BACKEND="memory")
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--workers", "2", "--port", str(free_port())]
+    log_path = tmp_path / "server.log"
+    
+    # Act
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                   start_new_session=True)
+        try:
+            # The supervisor restarts failed workers, so it never exits by itself
+            deadline = time.monotonic() + 30
+            while b"IDEMPOTENCY_BACKEND=memory" not in log_path.read_bytes() and time.monotonic() < deadline:
+                time.sleep(0.2)
+        finally:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+    
+    # Assert
+    output = log_path.read_text()
+    assert "IDEMPOTENCY_BACKEND=memory" in output
+    assert "Application startup failed" in output
@@ -0,0 +1,104 @@
+"""
+Delta sync: signed tokens and the change versions stamped by task writes
+"""
+
+import base64
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.sync import SyncToken, decode_sync_token, encode_sync_token
+from app.tests.conftest import API
+
+
+def unsigned_token(version: int, issued_at: int) -> str:
+    """Token in the unsigned format, as a client forging one would build it"""
+    return base64.urlsafe_b64encode(f"v:{version}:{issued_at}".encode()).decode().rstrip("=")
+
+
+def test_token_round_trips_the_sync_position():
+    # Arrange
+    token = SyncToken(version=42, issued_at=1700000000)
+    
+    # Act
+    decoded = decode_sync_token(encode_sync_token(token))
+    
+    # Assert
+    assert decoded == token
+
+
+def test_token_with_a_changed_issue_time_is_rejected():
+    # Arrange
+    token = encode_sync_token(SyncToken(42, 1700000000))
+    signature = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode().rpartition(":")[2]
+    forged = base64.urlsafe_b64encode(f"v:42:{int(time.time())}:{signature}".encode()).decode()
+    
+    # Act / Assert
+    with pytest.raises(ValueError):
+        decode_sync_token(forged)
+
+
+def test_token_signed_with_another_key_is_rejected(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "SECRET_KEY", "another-key")
+    token = encode_sync_token(SyncToken(42, 1700000000))
+    monkeypatch.undo()
+    
+    # Act / Assert
+    with pytest.raises(ValueError):
+        decode_sync_token(token)
+
+
+@pytest.mark.parametrize("token", [unsigned_token(1, 2000000000), "", "not-a-token"])
+def test_unsigned_or_malformed_tokens_are_rejected(token):
+    # Act / Assert
+    with pytest.raises(ValueError):
+        decode_sync_token(token)
+
+
+@pytest.mark.asyncio
+async def test_sync_with_a_forged_token_is_a_bad_request(client):
+    # Act
+    response = await client.get(f"{API}/tasks/sync", params={"since": unsigned_token(0, int(time.time()))})
+    
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid sync token"
+
+
+@pytest.mark.asyncio
+async def test_sync_after_deleting_the_newest_task_reports_the_delete_and_later_writes(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    kept = await make_task(owner["id"])
+    newest = await make_task(owner["id"])
+    token = (await client.get(f"{API}/tasks/sync")).json()["token"]
+    await client.delete(f"{API}/tasks/{newest['id']}")
+    await client.put(f"{API}/tasks/{kept['id']}", json={"is_completed": True})
+    
+    # Act
+    response = await client.get(f"{API}/tasks/sync", params={"since": token})
+    
+    # Assert
+    body = response.json()
+    assert [task["id"] for task in body["items"]] == [kept["id"]]
+    assert body["items"][0]["is_completed"] is True
+    assert body["deleted"] == [newest["id"]]
+
+
+@pytest.mark.asyncio
+async def test_sync_token_catches_up_without_repeating_older_writes(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    await make_task(owner["id"])
+    first = (await client.get(f"{API}/tasks/sync")).json()["token"]
+    await make_task(owner["id"])
+    second = (await client.get(f"{API}/tasks/sync", params={"since": first})).json()["token"]
+    
+    # Act
+    response = await client.get(f"{API}/tasks/sync", params={"since": second})
+    
+    # Assert
+    assert response.json()["items"] == []
+    assert response.json()["deleted"] == []
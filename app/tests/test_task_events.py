@@ -0,0 +1,215 @@
+"""
+Task change feed: Server-Sent Events, owner filtering, Last-Event-ID resume and slow subscribers
+"""
+
+import asyncio
+
+import orjson
+import pytest
+import pytest_asyncio
+
+from app.core.events import (
+    RESET_EVENT,
+    TASK_CREATED,
+    TASK_DELETED,
+    TASK_UPDATED,
+    EventBroker,
+    event_stream,
+    task_events,
+)
+from app.main import app
+from app.tests.conftest import API
+
+
+def parse_event(chunk: bytes) -> dict:
+    """Fields of one Server-Sent Event, with its data decoded"""
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n"))
+    return {**fields, "data": orjson.loads(fields["data"])}
+
+
+async def next_chunk(stream) -> bytes:
+    """Next chunk of a stream, failing instead of hanging when nothing arrives"""
+    return await asyncio.wait_for(anext(stream), 1)
+
+
+async def subscribed(broker: EventBroker) -> None:
+    """Wait until a pending stream has subscribed"""
+    while broker.subscribers == 0:
+        await asyncio.sleep(0)
+
+
+@pytest_asyncio.fixture
+async def broker() -> EventBroker:
+    """Broker with a small history and queue, delivering on the test's event loop"""
+    broker = EventBroker(history_size=3, max_queue=2)
+    broker.start(asyncio.get_running_loop())
+    return broker
+
+
+@pytest.mark.asyncio
+async def test_subscriber_receives_published_events(broker):
+    # Arrange
+    stream = event_stream(broker, None, None, heartbeat_seconds=10)
+    first = asyncio.ensure_future(next_chunk(stream))
+    await subscribed(broker)
+    
+    # Act
+    broker.publish(TASK_CREATED, 1, {"id": 10})
+    event = parse_event(await first)
+    
+    # Assert
+    assert event["event"] == TASK_CREATED
+    assert event["data"] == {"id": 10}
+    assert event["id"] == broker.last_event_id()
+
+
+@pytest.mark.asyncio
+async def test_subscriber_of_an_owner_only_receives_that_owners_events(broker):
+    # Arrange
+    stream = event_stream(broker, 2, None, heartbeat_seconds=10)
+    first = asyncio.ensure_future(next_chunk(stream))
+    await subscribed(broker)
+    
+    # Act
+    broker.publish(TASK_CREATED, 1, {"id": 10})
+    broker.publish(TASK_UPDATED, 2, {"id": 20})
+    event = parse_event(await first)
+    
+    # Assert
+    assert (event["event"], event["data"]) == (TASK_UPDATED, {"id": 20})
+
+
+@pytest.mark.asyncio
+async def test_reconnect_with_last_event_id_replays_the_missed_events(broker):
+    # Arrange
+    broker.publish(TASK_CREATED, 1, {"id": 10})
+    await asyncio.sleep(0)
+    seen = broker.last_event_id()
+    broker.publish(TASK_UPDATED, 1, {"id": 10})
+    broker.publish(TASK_DELETED, 1, {"id": 10})
+    await asyncio.sleep(0)
+    
+    # Act
+    stream = event_stream(broker, None, seen, heartbeat_seconds=10)
+    missed = [parse_event(await next_chunk(stream)) for _ in range(2)]
+    
+    # Assert
+    assert [event["event"] for event in missed] == [TASK_UPDATED, TASK_DELETED]
+
+
+@pytest.mark.asyncio
+async def test_unknown_last_event_id_gets_a_reset_with_the_newest_id(broker):
+    # Arrange
+    broker.publish(TASK_CREATED, 1, {"id": 10})
+    await asyncio.sleep(0)
+    
+    # Act
+    stream = event_stream(broker, None, "evicted-1", heartbeat_seconds=10)
+    event = parse_event(await next_chunk(stream))
+    
+    # Assert
+    assert event["event"] == RESET_EVENT
+    assert event["id"] == broker.last_event_id()
+
+
+@pytest.mark.asyncio
+async def test_subscriber_that_falls_behind_is_disconnected_after_its_queue(broker):
+    # Arrange
+    stream = event_stream(broker, None, None, heartbeat_seconds=10)
+    first = asyncio.ensure_future(next_chunk(stream))
+    await subscribed(broker)
+    
+    # Act
+    for task_id in range(4):
+        broker.publish(TASK_CREATED, 1, {"id": task_id})
+    await asyncio.sleep(0)
+    received = [parse_event(await first), parse_event(await next_chunk(stream))]
+    
+    # Assert
+    assert [event["data"]["id"] for event in received] == [0, 1]
+    with pytest.raises(StopAsyncIteration):
+        await next_chunk(stream)
+    assert broker.subscribers == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_stream_sends_heartbeats(broker):
+    # Arrange
+    stream = event_stream(broker, None, None, heartbeat_seconds=0.01)
+    
+    # Act
+    chunk = await next_chunk(stream)
+    
+    # Assert
+    assert chunk == b": keep-alive\n\n"
+
+
+@pytest.mark.asyncio
+async def test_close_streams_ends_every_stream(broker):
+    # Arrange
+    stream = event_stream(broker, None, None, heartbeat_seconds=10)
+    pending = asyncio.ensure_future(next_chunk(stream))
+    await subscribed(broker)
+    
+    # Act
+    broker.close_streams()
+    
+    # Assert
+    with pytest.raises(StopAsyncIteration):
+        await pending
+
+
+@pytest.mark.asyncio
+async def test_task_writes_are_published_to_the_feed(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    stream = event_stream(task_events, owner["id"], None, heartbeat_seconds=10)
+    first = asyncio.ensure_future(next_chunk(stream))
+    await subscribed(task_events)
+    
+    # Act
+    task = await make_task(owner["id"])
+    await client.put(f"{API}/tasks/{task['id']}", json={"is_completed": True})
+    await client.delete(f"{API}/tasks/{task['id']}")
+    events = [parse_event(await first)] + [parse_event(await next_chunk(stream)) for _ in range(2)]
+    await stream.aclose()
+    
+    # Assert
+    assert [event["event"] for event in events] == [TASK_CREATED, TASK_UPDATED, TASK_DELETED]
+    assert events[0]["data"] == task
+    assert events[1]["data"]["is_completed"] is True
+    assert events[2]["data"] == {"id": task["id"], "owner_id": owner["id"]}
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_sends_events_as_server_sent_events(client, make_user):
+    # Arrange
+    owner = await make_user()
+    messages = []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": f"{API}/tasks/stream", "raw_path": f"{API}/tasks/stream".encode(), "root_path": "",
+        "query_string": f"owner_id={owner['id']}".encode(), "headers": [], "server": ("test", 80), "client": None,
+    }
+    
+    async def receive():
+        await asyncio.Event().wait()
+    
+    async def send(message):
+        messages.append(message)
+    
+    response = asyncio.ensure_future(app(scope, receive, send))
+    await subscribed(task_events)
+    
+    # Act
+    task_events.publish(TASK_CREATED, owner["id"], {"id": 1})
+    while len(messages) < 2:
+        await asyncio.sleep(0.01)
+    task_events.close_streams()
+    await asyncio.wait_for(response, 1)
+    
+    # Assert
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-type"].startswith(b"text/event-stream")
+    assert headers[b"cache-control"] == b"no-cache"
+    assert parse_event(messages[1]["body"])["data"] == {"id": 1}
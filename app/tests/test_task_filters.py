@@ -0,0 +1,112 @@
+"""
+Task list filters, whitelisted sorting and partial updates of NOT NULL columns
+"""
+
+import pytest
+
+from app.tests.conftest import API
+
+
+@pytest.mark.asyncio
+async def test_tasks_are_filtered_by_owner_completion_and_priority(client, make_user, make_task):
+    # Arrange
+    owner, other = await make_user(), await make_user()
+    match = await make_task(owner["id"], is_completed=True, priority="high")
+    await make_task(owner["id"], is_completed=False, priority="high")
+    await make_task(owner["id"], is_completed=True, priority="low")
+    await make_task(other["id"], is_completed=True, priority="high")
+    
+    # Act
+    response = await client.get(
+        f"{API}/tasks/", params={"owner_id": owner["id"], "is_completed": True, "priority": "high"}
+    )
+    
+    # Assert
+    assert [task["id"] for task in response.json()] == [match["id"]]
+
+
+@pytest.mark.asyncio
+async def test_tasks_are_filtered_by_due_date_range(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    await make_task(owner["id"], due_date="2026-01-01T00:00:00Z")
+    inside = await make_task(owner["id"], due_date="2026-02-15T00:00:00Z")
+    await make_task(owner["id"], due_date="2026-04-01T00:00:00Z")
+    await make_task(owner["id"])
+    
+    # Act
+    response = await client.get(
+        f"{API}/tasks/", params={"due_after": "2026-02-01T00:00:00Z", "due_before": "2026-03-01T00:00:00Z"}
+    )
+    
+    # Assert
+    assert [task["id"] for task in response.json()] == [inside["id"]]
+
+
+@pytest.mark.asyncio
+async def test_tasks_sort_by_priority_level_not_by_name(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    low = await make_task(owner["id"], priority="low")
+    high = await make_task(owner["id"], priority="high")
+    medium = await make_task(owner["id"], priority="medium")
+    
+    # Act
+    response = await client.get(f"{API}/tasks/", params={"sort": "-priority"})
+    
+    # Assert
+    assert [task["id"] for task in response.json()] == [high["id"], medium["id"], low["id"]]
+
+
+@pytest.mark.asyncio
+async def test_tasks_sort_by_due_date_ascending(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    later = await make_task(owner["id"], due_date="2026-05-01T00:00:00Z")
+    sooner = await make_task(owner["id"], due_date="2026-03-01T00:00:00Z")
+    
+    # Act
+    response = await client.get(f"{API}/tasks/", params={"sort": "due_date"})
+    
+    # Assert
+    assert [task["id"] for task in response.json()] == [sooner["id"], later["id"]]
+
+
+@pytest.mark.asyncio
+async def test_unknown_sort_field_is_rejected(client):
+    # Act
+    response = await client.get(f"{API}/tasks/", params={"sort": "hashed_password"})
+    
+    # Assert
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("field", ["title", "is_completed", "priority"])
+async def test_explicit_null_for_a_not_null_column_is_rejected(client, make_user, make_task, field):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"], priority="high")
+    
+    # Act
+    response = await client.put(f"{API}/tasks/{task['id']}", json={field: None})
+    unchanged = await client.get(f"{API}/tasks/{task['id']}")
+    
+    # Assert
+    assert response.status_code == 422
+    assert unchanged.json() == task
+
+
+@pytest.mark.asyncio
+async def test_explicit_null_clears_a_nullable_column(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"], due_date="2026-03-01T00:00:00Z", priority="high")
+    
+    # Act
+    response = await client.patch(f"{API}/tasks/{task['id']}", json={"due_date": None})
+    
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["due_date"] is None
+    assert response.json()["priority"] == "high"
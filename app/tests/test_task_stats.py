@@ -0,0 +1,103 @@
+"""
+Task stats from maintained per-owner counters
+"""
+
+import pytest
+from sqlalchemy import select
+
+from app.core.database import SessionLocal, engine
+from app.models.task_counter import TaskCounter
+from app.repositories.task_counter_repository import TaskCounterRepository
+from app.tests.conftest import API
+
+
+@pytest.mark.asyncio
+async def test_stats_of_all_tasks_sum_every_owner(client, make_user, make_task):
+    # Arrange
+    owner, other = await make_user(), await make_user()
+    await make_task(owner["id"], priority="high", is_completed=True)
+    await make_task(owner["id"], priority="low")
+    await make_task(other["id"], priority="high", due_date="2000-01-01T00:00:00Z")
+    
+    # Act
+    response = await client.get(f"{API}/tasks/stats")
+    
+    # Assert
+    assert response.json() == {
+        "total": 3, "completed": 1, "open": 2, "overdue": 1,
+        "by_priority": {"low": 1, "medium": 0, "high": 2},
+    }
+
+
+@pytest.mark.asyncio
+async def test_owner_stats_count_only_that_owners_tasks(client, make_user, make_task):
+    # Arrange
+    owner, other = await make_user(), await make_user()
+    await make_task(owner["id"], is_completed=True)
+    await make_task(other["id"])
+    
+    # Act
+    response = await client.get(f"{API}/users/{owner['id']}/stats")
+    
+    # Assert
+    assert response.json()["total"] == 1
+    assert response.json()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_updates_and_deletes(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    first, second = await make_task(owner["id"]), await make_task(owner["id"])
+    await client.put(f"{API}/tasks/{first['id']}", json={"is_completed": True, "priority": "high"})
+    await client.patch(f"{API}/tasks/bulk", json={"items": [{"id": second["id"], "priority": "low"}]})
+    await client.delete(f"{API}/tasks/{first['id']}")
+    
+    # Act
+    response = await client.get(f"{API}/tasks/stats")
+    
+    # Assert
+    assert response.json()["total"] == 1
+    assert response.json()["completed"] == 0
+    assert response.json()["by_priority"] == {"low": 1, "medium": 0, "high": 0}
+
+
+@pytest.mark.asyncio
+async def test_stats_without_tasks_are_zero(client):
+    # Act
+    response = await client.get(f"{API}/tasks/stats")
+    
+    # Assert
+    assert response.json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_task_writes_keep_no_global_counter_row(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    
+    # Act
+    await make_task(owner["id"])
+    
+    # Assert
+    with engine.connect() as connection:
+        scopes = list(connection.scalars(select(TaskCounter.scope)))
+    assert scopes == [f"tasks:owner:{owner['id']}"]
+
+
+@pytest.mark.asyncio
+async def test_rebuilt_counters_match_the_maintained_ones(client, make_user, make_task):
+    # Arrange
+    owners = [await make_user(), await make_user()]
+    for index, owner in enumerate(owners):
+        await make_task(owner["id"], is_completed=bool(index), priority="high")
+        await make_task(owner["id"])
+    maintained = (await client.get(f"{API}/tasks/stats")).json()
+    
+    # Act
+    with SessionLocal() as db:
+        scopes = TaskCounterRepository(db).rebuild()
+    
+    # Assert
+    assert scopes == 2
+    assert (await client.get(f"{API}/tasks/stats")).json() == maintained
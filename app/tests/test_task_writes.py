@@ -0,0 +1,67 @@
+"""
+Task writes: single-statement updates, and users deleted only without tasks
+"""
+
+import pytest
+
+from app.tests.conftest import API
+
+
+def statements_on(stats, prefix: str) -> int:
+    """Executions of the statements starting with prefix"""
+    return sum(count for statement, count in stats.statements.items() if statement.startswith(prefix))
+
+
+@pytest.mark.asyncio
+async def test_task_update_is_a_single_update_statement(client, make_user, make_task, query_stats):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    
+    # Act
+    response = await client.put(f"{API}/tasks/{task['id']}", json={"title": "Renamed"})
+    
+    # Assert
+    assert response.status_code == 200
+    assert statements_on(query_stats[-1], "UPDATE tasks") == 1
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_user_who_owns_tasks_is_a_conflict(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    
+    # Act
+    response = await client.delete(f"{API}/users/{owner['id']}")
+    
+    # Assert
+    assert response.status_code == 409
+    assert response.json()["detail"] == "User still owns tasks"
+    assert (await client.get(f"{API}/users/{owner['id']}")).status_code == 200
+    assert (await client.get(f"{API}/tasks/{task['id']}")).json()["owner_id"] == owner["id"]
+
+
+@pytest.mark.asyncio
+async def test_user_can_be_deleted_once_their_tasks_are(client, make_user, make_task):
+    # Arrange
+    owner = await make_user()
+    task = await make_task(owner["id"])
+    await client.get(f"{API}/users/{owner['id']}")
+    await client.delete(f"{API}/tasks/{task['id']}")
+    
+    # Act
+    response = await client.delete(f"{API}/users/{owner['id']}")
+    
+    # Assert
+    assert response.status_code == 204
+    assert (await client.get(f"{API}/users/{owner['id']}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_deleting_an_unknown_user_is_not_found(client):
+    # Act
+    response = await client.delete(f"{API}/users/999")
+    
+    # Assert
+    assert response.status_code == 404
@@ -0,0 +1,383 @@
+"""
+Load benchmark: mixed API workload against a live server
+
+Boots the production server (run.py --production) on a fresh SQLite database (or the given
+--database-url), seeds users and tasks through the API, then drives list/get/create/update/delete
+requests at the configured ratios and concurrency with an async HTTP client. Reports p50/p95/p99
+latency and requests per second per operation, and saves the results as JSON so runs from different
+commits can be compared with --compare. With --workers above 1 the server needs the shared
+backends it requires in production, e.g. IDEMPOTENCY_BACKEND=redis in the environment.
+
+Usage: python -m benchmarks.load [--concurrency 32] [--duration 20] [--mix list_tasks=40,get_task=30,...]
+       python -m benchmarks.load --compare benchmarks/results/load-<commit>.json --max-regression 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import create_engine
+
+from app.core.database import Base
+import app.models  # noqa: F401 - registers the tables on Base.metadata
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+API = "/api/v1"
+
+OPERATIONS = (
+    "list_tasks", "get_task", "create_task", "update_task", "delete_task",
+    "list_users", "get_user", "create_user", "update_user", "delete_user",
+)
+DEFAULT_MIX = (
+    "list_tasks=35,get_task=25,create_task=10,update_task=10,delete_task=5,"
+    "list_users=5,get_user=5,create_user=2,update_user=2,delete_user=1"
+)
+PERCENTILES = (50, 95, 99)
+
+
+class Workload:
+    """Shared pools of live IDs that the operations draw from"""
+    
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random):
+        self.client = client
+        self.rng = rng
+        self.seeded_user_ids: List[int] = []
+        self.task_ids: List[int] = []
+        # Only tasks created during the run are deleted, so a read or update never races a delete
+        self.created_task_ids: List[int] = []
+        # Only users created during the run are deleted, so seeded tasks keep their owner
+        self.created_user_ids: List[int] = []
+        self._sequence = 0
+    
+    def _next(self) -> int:
+        self._sequence += 1
+        return self._sequence
+    
+    def _new_user(self) -> dict:
+        n = self._next()
+        suffix = f"{os.getpid()}-{n}"
+        return {"email": f"load-{suffix}@example.com", "username": f"load-{suffix}", "password": "benchmark"}
+    
+    def _new_task(self) -> dict:
+        n = self._next()
+        return {
+            "title": f"Load task {n}",
+            "description": "Created by the load benchmark",
+            "priority": self.rng.choice(["low", "medium", "high"]),
+            "owner_id": self.rng.choice(self.seeded_user_ids),
+        }
+    
+    def _pop(self, pool: List[int]) -> Optional[int]:
+        if not pool:
+            return None
+        index = self.rng.randrange(len(pool))
+        pool[index], pool[-1] = pool[-1], pool[index]
+        return pool.pop()
+    
+    async def seed(self, users: int, tasks_per_user: int) -> None:
+        """Create the initial users and tasks through the API"""
+        for _ in range(users):
+            response = await self.client.post(f"{API}/users/", json=self._new_user())
+            response.raise_for_status()
+            self.seeded_user_ids.append(response.json()["id"])
+        tasks = [self._new_task() for _ in range(users * tasks_per_user)]
+        for start in range(0, len(tasks), 500):
+            response = await self.client.post(f"{API}/tasks/bulk", json={"items": tasks[start:start + 500]})
+            response.raise_for_status()
+            self.task_ids.extend(item["id"] for item in response.json()["items"])
+    
+    async def list_tasks(self) -> httpx.Response:
+        params = {"limit": 50, "owner_id": self.rng.choice(self.seeded_user_ids)}
+        return await self.client.get(f"{API}/tasks/", params=params)
+    
+    async def get_task(self) -> httpx.Response:
+        return await self.client.get(f"{API}/tasks/{self.rng.choice(self.task_ids)}")
+    
+    async def create_task(self) -> httpx.Response:
+        response = await self.client.post(f"{API}/tasks/", json=self._new_task())
+        if response.status_code == 201:
+            self.created_task_ids.append(response.json()["id"])
+        return response
+    
+    async def update_task(self) -> httpx.Response:
+        body = {"is_completed": self.rng.random() < 0.5, "priority": self.rng.choice(["low", "medium", "high"])}
+        return await self.client.patch(f"{API}/tasks/{self.rng.choice(self.task_ids)}", json=body)
+    
+    async def delete_task(self) -> httpx.Response:
+        task_id = self._pop(self.created_task_ids)
+        if task_id is None:
+            return await self.create_task()
+        return await self.client.delete(f"{API}/tasks/{task_id}")
+    
+    async def list_users(self) -> httpx.Response:
+        return await self.client.get(f"{API}/users/", params={"limit": 50})
+    
+    async def get_user(self) -> httpx.Response:
+        return await self.client.get(f"{API}/users/{self.rng.choice(self.seeded_user_ids)}")
+    
+    async def create_user(self) -> httpx.Response:
+        response = await self.client.post(f"{API}/users/", json=self._new_user())
+        if response.status_code == 201:
+            self.created_user_ids.append(response.json()["id"])
+        return response
+    
+    async def update_user(self) -> httpx.Response:
+        body = {"full_name": f"Load user {self._next()}"}
+        return await self.client.patch(f"{API}/users/{self.rng.choice(self.seeded_user_ids)}", json=body)
+    
+    async def delete_user(self) -> httpx.Response:
+        user_id = self._pop(self.created_user_ids)
+        if user_id is None:
+            return await self.create_user()
+        return await self.client.delete(f"{API}/users/{user_id}")
+    
+    def operations(self) -> Dict[str, Callable[[], Awaitable[httpx.Response]]]:
+        return {name: getattr(self, name) for name in OPERATIONS}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse "name=weight,..." into operation weights"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition("=")
+        mix[name] = float(weight)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    """Latency percentiles in milliseconds and throughput"""
+    values = sorted(latencies)
+    summary = {"requests": len(values), "errors": errors, "rps": round(len(values) / elapsed, 1)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(values, pct) * 1000, 2)
+    summary["mean_ms"] = round(sum(values) / len(values) * 1000, 2) if values else 0.0
+    summary["max_ms"] = round(values[-1] * 1000, 2) if values else 0.0
+    return summary
+
+
+async def run_phase(workload: Workload, mix: Dict[str, float], concurrency: int, duration: float) -> dict:
+    """Drive the mix for duration seconds and return per-operation summaries"""
+    operations = workload.operations()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    deadline = time.perf_counter() + duration
+    
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            name = workload.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await operations[name]()
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies[name].append(time.perf_counter() - started)
+            if failed:
+                errors[name] += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    
+    results = {name: summarize(latencies[name], errors[name], elapsed) for name in names if latencies[name]}
+    all_latencies = [value for values in latencies.values() for value in values]
+    results["total"] = summarize(all_latencies, sum(errors.values()), elapsed)
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env(args: argparse.Namespace, database_url: str, port: int) -> Dict[str, str]:
+    """Environment of the benchmarked server - the production server settings for args.workers workers"""
+    return {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "DATABASE_ASYNC": str(args.async_db).lower(),
+        "PASSWORD_HASH_ROUNDS": str(args.hash_rounds),
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        # Also what tells each worker that it shares the work, switching off the per-process caches
+        "SERVER_WORKERS": str(args.workers),
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def start_server(args: argparse.Namespace, database_url: str, port: int) -> subprocess.Popen:
+    """Create the schema and start the production server with the benchmark settings"""
+    schema_engine = create_engine(database_url)
+    Base.metadata.create_all(schema_engine)
+    schema_engine.dispose()
+    command = [sys.executable, "run.py", "--production"]
+    return subprocess.Popen(command, cwd=ROOT, env=server_env(args, database_url, port))
+
+
+async def wait_until_ready(
+    client: httpx.AsyncClient, server: Optional[subprocess.Popen] = None, timeout: float = 30.0
+) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        # e.g. several workers with state the production server refuses to keep per process
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("Server did not become ready")
+        await asyncio.sleep(0.2)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: dict) -> None:
+    header = f"{'operation':<12} {'requests':>8} {'errors':>6} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        print(
+            f"{name:<12} {row['requests']:>8} {row['errors']:>6} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f}"
+        )
+
+
+def compare(results: dict, baseline: dict, max_regression: Optional[float]) -> bool:
+    """Print changes against a baseline; False when the overall p95 or throughput regresses beyond the limit"""
+    print(f"\nCompared with {baseline['meta']['commit']} ({baseline['meta']['timestamp']})")
+    ok = True
+    for name, row in results.items():
+        base = baseline["results"].get(name)
+        if not base or not base["requests"]:
+            continue
+        p95_change = (row["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        rps_change = (row["rps"] - base["rps"]) / base["rps"] * 100 if base["rps"] else 0.0
+        # Only the total gates the exit code, per-operation samples are too small to be stable
+        regressed = (
+            name == "total" and max_regression is not None
+            and (p95_change > max_regression or -rps_change > max_regression)
+        )
+        ok = ok and not regressed
+        print(f"{name:<12} p95 {p95_change:+7.1f}%   rps {rps_change:+7.1f}%{'   REGRESSION' if regressed else ''}")
+    return ok
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    mix = parse_mix(args.mix)
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise SystemExit(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+    
+    server = None
+    url = args.url
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/bench.db"
+        if url is None:
+            port = free_port()
+            url = f"http://127.0.0.1:{port}"
+            server = start_server(args, database_url, port)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        try:
+            async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+                await wait_until_ready(client, server)
+                workload = Workload(client, random.Random(args.seed))
+                await workload.seed(args.users, args.tasks_per_user)
+                if args.warmup:
+                    await run_phase(workload, mix, args.concurrency, args.warmup)
+                results = await run_phase(workload, mix, args.concurrency, args.duration)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+    
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "url": args.url,
+            "database": (args.database_url or "sqlite").split(":")[0],
+            "async_db": args.async_db,
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "users": args.users,
+            "tasks_per_user": args.tasks_per_user,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a running server instead of booting one")
+    parser.add_argument("--database-url", help="Database for the booted server (default: a fresh SQLite file)")
+    parser.add_argument("--async-db", action="store_true", help="Boot the server with DATABASE_ASYNC=true")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--hash-rounds", type=int, default=4, help="bcrypt cost for created users")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks-per-user", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights, name=weight,...")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="JSON results path (default: benchmarks/results/load-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, help="Exit 1 when p95 or rps regress by more than this %%")
+    args = parser.parse_args()
+    
+    report = asyncio.run(benchmark(args))
+    print_results(report["results"])
+    
+    output = args.output or RESULTS_DIR / f"load-{report['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nSaved {output}")
+    
+    if args.compare and not compare(report["results"], json.loads(args.compare.read_text()), args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Microbenchmark: list response serialization
+
+Compares the classic path (ORM objects -> Pydantic from_attributes -> response_model
+validation -> stdlib json) with the fast path (response-shaped rows -> orjson) on a
+100-task page.
+
+Usage: python -m benchmarks.serialization [--rows 100] [--repeat 200]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.serialization import dump_rows
+from app.models import Task, User
+from app.repositories.task_repository import TASK_LIST_COLUMNS
+from app.schemas.task import Task as TaskSchema
+
+task_list_adapter = TypeAdapter(List[TaskSchema])
+
+
+def seed(session: Session, rows: int) -> None:
+    """Create one user and its tasks"""
+    session.execute(insert(User.__table__), {
+        "id": 1, "email": "bench@example.com", "username": "bench", "hashed_password": "x"
+    })
+    now = datetime.now(timezone.utc)
+    session.execute(insert(Task.__table__), [
+        {"title": f"Task {i}", "description": "Benchmark task", "priority": "medium",
+         "due_date": now, "created_at": now, "owner_id": 1}
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def classic(session: Session, rows: int) -> bytes:
+    """ORM objects, validated twice, encoded with stdlib json"""
+    tasks = session.scalars(select(Task).order_by(Task.id).limit(rows)).all()
+    models = [TaskSchema.model_validate(task) for task in tasks]
+    validated = task_list_adapter.validate_python(models)
+    content = task_list_adapter.dump_python(validated, mode="json")
+    session.expunge_all()
+    return json.dumps(content, separators=(",", ":")).encode()
+
+
+def fast(session: Session, rows: int) -> bytes:
+    """Response-shaped rows encoded with orjson"""
+    return dump_rows(session.execute(select(*TASK_LIST_COLUMNS).order_by(Task.id).limit(rows)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, args.rows)
+        assert json.loads(classic(session, args.rows)) == json.loads(fast(session, args.rows))
+        
+        results = {}
+        for name, func in (("classic", classic), ("fast", fast)):
+            best = min(timeit.repeat(lambda: func(session, args.rows), number=args.repeat, repeat=5))
+            results[name] = best / args.repeat * 1e6
+            print(f"{name:>8}: {results[name]:8.1f} us per {args.rows}-row page")
+        print(f" speedup: {results['classic'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Startup benchmark: cold import time of the application
+
+Imports app.main in fresh interpreters under python -X importtime and reports the best
+cumulative import time, the slowest modules, and the time to produce the OpenAPI schema
+afterwards (generated, or read from OPENAPI_CACHE_PATH when set). Exits 1 when the import
+exceeds --budget-ms or when a module meant to load on first use (--lazy) was imported, so it
+can run as a CI gate.
+
+Usage: python -m benchmarks.startup [--budget-ms 1500] [--repeat 5] [--lazy jose passlib]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGET = "app.main"
+DEFAULT_LAZY = ("jose", "passlib", "bcrypt")
+DEFAULT_BUDGET_MS = 1500.0
+
+# Prints the schema time on stdout; -X importtime writes to stderr
+CHILD = (
+    "import time\n"
+    f"import {TARGET}\n"
+    "started = time.perf_counter()\n"
+    f"{TARGET}.app.openapi()\n"
+    "print((time.perf_counter() - started) * 1000)\n"
+)
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """Self and cumulative microseconds per module from -X importtime output"""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure() -> Tuple[Dict[str, Tuple[int, int]], float]:
+    """Import the app once in a fresh interpreter - module times and OpenAPI schema milliseconds"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=ROOT, capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {TARGET} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr), float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Exit 1 when the import takes longer"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters, the fastest one counts")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument(
+        "--lazy", nargs="*", default=list(DEFAULT_LAZY), help="Top-level packages importing the app must not load"
+    )
+    args = parser.parse_args()
+    
+    runs: List[Tuple[Dict[str, Tuple[int, int]], float]] = [measure() for _ in range(args.repeat)]
+    modules, _ = min(runs, key=lambda run: run[0][TARGET][1])
+    import_ms = modules[TARGET][1] / 1000
+    schema_ms = min(run[1] for run in runs)
+    
+    print(f"Slowest modules by self time (best of {args.repeat} runs):")
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+    print(f"\n{len(modules)} modules imported")
+    print(f"import {TARGET}: {import_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"OpenAPI schema: {schema_ms:.1f} ms")
+    
+    failures = []
+    if import_ms > args.budget_ms:
+        failures.append(f"import {TARGET} took {import_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    eager = sorted({name.split(".")[0] for name in modules} & set(args.lazy))
+    if eager:
+        failures.append(f"modules meant to load on first use were imported: {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
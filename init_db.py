@@ -4,22 +4,36 @@ Database initialization script
 Creates the database tables and populates with sample data
 """
 
+import csv
+import io
+import itertools
+import random
 import sys
 import os
-from datetime import datetime, timedelta
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List
 
 # Add the app directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.models.collection_version import USERS_SCOPE, owner_tasks_scope
 from app.models.user import User
-from app.models.task import Task
+from app.models.task import PRIORITY_LEVELS, Task, TaskPriority
+from app.models.task_search import FTS_TABLE, POSTGRES_SEARCH_DDL, SEARCH_VECTOR_INDEX, SQLITE_SEARCH_DDL
 from app.core.security import get_password_hash
+from app.repositories.change_version import next_change_version
+from app.repositories.collection_version_repository import CollectionVersionRepository
+from app.repositories.task_counter_repository import TaskCounterRepository
 
 # Create database engine directly with SQLite
 DATABASE_URL = "sqlite:///./task_manager.db"
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=True)
+engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=settings.DB_ECHO)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -135,13 +149,18 @@ def init_db():
             }
         ]
         
+        # Stamped like any task write, so clients that synced before see them as changes
+        change_version = db.execute(select(next_change_version(db.get_bind().dialect.name))).scalar()
         for task_data in tasks_data:
-            task = Task(**task_data)
+            task = Task(**task_data, change_version=change_version)
             db.add(task)
         
         db.commit()
         print(f"✅ Created {len(tasks_data)} tasks")
         
+        # Sample tasks are inserted directly, so compute their counters from scratch
+        TaskCounterRepository(db).rebuild()
+        
         print("\n🎉 Database initialization completed successfully!")
         print("\n📊 Sample data created:")
         print(f"   👥 Users: {len(created_users)}")
@@ -160,6 +179,243 @@ def init_db():
         db.close()
 
 
+# Synthetic data for --users/--tasks-per-user
+FIRST_NAMES = ["Alex", "Sam", "Maria", "John", "Aisha", "Wei", "Olga", "Pedro", "Fatima", "Lukas", "Emma", "Ravi"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Novak", "Okafor", "Silva", "Kumar", "Müller", "Kowalski", "Tanaka"]
+TASK_VERBS = ["Review", "Write", "Fix", "Update", "Deploy", "Plan", "Test", "Refactor", "Document", "Design"]
+TASK_SUBJECTS = [
+    "login page", "billing report", "database migration", "API documentation", "release notes",
+    "onboarding flow", "search results", "invoice export", "mobile layout", "backup script",
+    "customer feedback", "quarterly budget", "team meeting notes", "performance dashboard",
+]
+TASK_DESCRIPTIONS = [
+    "Follow up with the team before the deadline",
+    "Blocked until the design review is finished",
+    "Customer reported this issue twice last week",
+    "Part of the quarterly roadmap",
+    "Needs a second pair of eyes before merging",
+    "Low effort, high impact",
+]
+SCALE_PASSWORD = "password123"
+TASK_COPY_COLUMNS = (
+    "title", "description", "is_completed", "priority", "due_date", "created_at", "owner_id", "change_version"
+)
+
+
+class Progress:
+    """Single-line progress output with throughput"""
+    
+    def __init__(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+        self._last_print = 0.0
+    
+    def update(self, count: int) -> None:
+        self.done += count
+        now = time.perf_counter()
+        if now - self._last_print >= 0.5 or self.done >= self.total:
+            self._last_print = now
+            rate = self.done / max(now - self.started, 1e-9)
+            percent = self.done * 100 // max(self.total, 1)
+            print(f"\r   {self.label}: {self.done:,}/{self.total:,} ({percent}%) {rate:,.0f} rows/s", end="", flush=True)
+    
+    def finish(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        print(f"\r   {self.label}: {self.done:,} in {elapsed:.1f}s ({self.done / max(elapsed, 1e-9):,.0f} rows/s)" + " " * 10)
+
+
+def chunked(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    """Split an iterator into lists of at most size items"""
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def generate_users(rng: random.Random, first_id: int, count: int, hashed_password: str) -> Iterator[dict]:
+    """Users with explicit IDs, so tasks can reference them without reading IDs back"""
+    now = datetime.now(timezone.utc)
+    for user_id in range(first_id, first_id + count):
+        yield {
+            "id": user_id,
+            "email": f"user{user_id}@example.com",
+            "username": f"user{user_id}",
+            "hashed_password": hashed_password,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "is_active": rng.random() < 0.98,
+            "is_superuser": False,
+            "created_at": now - timedelta(days=rng.randrange(730)),
+        }
+
+
+def generate_tasks(rng: random.Random, owner_ids: range, tasks_per_user: int) -> Iterator[dict]:
+    """Tasks with a realistic mix: mostly medium priority, old and overdue tasks mostly done"""
+    now = datetime.now(timezone.utc)
+    for owner_id in owner_ids:
+        for _ in range(tasks_per_user):
+            created_at = now - timedelta(seconds=rng.randrange(365 * 86400))
+            # 20% have no due date, the rest are due within three months of creation
+            due_date = None if rng.random() < 0.2 else created_at + timedelta(hours=rng.randrange(24, 90 * 24))
+            overdue = due_date is not None and due_date < now
+            draw = rng.random()
+            yield {
+                "title": f"{rng.choice(TASK_VERBS)} {rng.choice(TASK_SUBJECTS)}",
+                "description": rng.choice(TASK_DESCRIPTIONS),
+                "is_completed": rng.random() < (0.8 if overdue else 0.3),
+                "priority": TaskPriority.LOW if draw < 0.3 else TaskPriority.HIGH if draw >= 0.8 else TaskPriority.MEDIUM,
+                "due_date": due_date,
+                "created_at": created_at,
+                "owner_id": owner_id,
+            }
+
+
+def supports_copy(connection: Connection) -> bool:
+    """COPY FROM STDIN needs PostgreSQL through psycopg2"""
+    return connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2"
+
+
+def copy_tasks(connection: Connection, rows: List[dict]) -> None:
+    """Load tasks with COPY ... FROM STDIN - an empty unquoted CSV field is NULL"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow((
+            row["title"],
+            row["description"],
+            "t" if row["is_completed"] else "f",
+            PRIORITY_LEVELS[row["priority"]],
+            row["due_date"].isoformat() if row["due_date"] else None,
+            row["created_at"].isoformat(),
+            row["owner_id"],
+            row["change_version"],
+        ))
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY tasks ({', '.join(TASK_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def has_search_structures(connection: Connection) -> bool:
+    """Whether the full-text search table (SQLite) or index (PostgreSQL) exists"""
+    if connection.dialect.name == "sqlite":
+        query = text("SELECT 1 FROM sqlite_master WHERE name = :name")
+        return connection.execute(query, {"name": FTS_TABLE}).first() is not None
+    if connection.dialect.name == "postgresql":
+        query = text("SELECT 1 FROM pg_indexes WHERE indexname = :name")
+        return connection.execute(query, {"name": SEARCH_VECTOR_INDEX}).first() is not None
+    return False
+
+
+@contextmanager
+def search_index_suspended(connection: Connection):
+    """Drop the per-row search maintenance during a bulk load and rebuild it once afterwards"""
+    if not has_search_structures(connection):
+        yield
+        return
+    if connection.dialect.name == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+    else:
+        connection.exec_driver_sql(f"DROP INDEX IF EXISTS {SEARCH_VECTOR_INDEX}")
+    connection.commit()
+    try:
+        yield
+    finally:
+        print("   🔎 Rebuilding the search index...")
+        if connection.dialect.name == "sqlite":
+            for statement in SQLITE_SEARCH_DDL[1:]:
+                connection.exec_driver_sql(statement)
+            connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        else:
+            connection.exec_driver_sql(POSTGRES_SEARCH_DDL[1])
+        connection.commit()
+
+
+def seed_scale(users: int, tasks_per_user: int, batch_size: int = 10000, seed: int = 42):
+    """Generate a large synthetic dataset with bulk inserts"""
+    print(f"🚀 Generating {users:,} users with {tasks_per_user:,} tasks each...")
+    from app.core.database import Base
+    Base.metadata.create_all(bind=engine)
+    
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    # bcrypt is far too slow to run per user - every generated user shares one hash
+    hashed_password = get_password_hash(SCALE_PASSWORD)
+    
+    with engine.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            # Durability is not needed for generated data
+            connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        first_id = (connection.execute(select(func.max(User.id))).scalar() or 0) + 1
+        owner_ids = range(first_id, first_id + users)
+        
+        progress = Progress("👥 Users", users)
+        for chunk in chunked(generate_users(rng, first_id, users, hashed_password), batch_size):
+            connection.execute(insert(User.__table__), chunk)
+            connection.commit()
+            progress.update(len(chunk))
+        progress.finish()
+        if connection.dialect.name == "postgresql":
+            # IDs were set explicitly, so move the sequence past them
+            connection.exec_driver_sql("SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT max(id) FROM users))")
+            connection.commit()
+        
+        use_copy = supports_copy(connection)
+        progress = Progress("📋 Tasks (COPY)" if use_copy else "📋 Tasks", users * tasks_per_user)
+        with search_index_suspended(connection):
+            for chunk in chunked(generate_tasks(rng, owner_ids, tasks_per_user), batch_size):
+                # One change version per batch, computed in the batch's transaction like any task write,
+                # so delta sync clients see the generated tasks
+                change_version = connection.execute(select(next_change_version(connection.dialect.name))).scalar()
+                for row in chunk:
+                    row["change_version"] = change_version
+                if use_copy:
+                    copy_tasks(connection, chunk)
+                else:
+                    connection.execute(insert(Task.__table__), chunk)
+                connection.commit()
+                progress.update(len(chunk))
+            progress.finish()
+    
+    db = SessionLocal()
+    try:
+        # Invalidate cached listings (ETags) of every collection that changed
+        scopes = [USERS_SCOPE, *(owner_tasks_scope(owner_id) for owner_id in owner_ids)]
+        versions = CollectionVersionRepository(db)
+        for start in range(0, len(scopes), 1000):
+            versions.bump(scopes[start:start + 1000])
+        # Rows were inserted directly, so compute the counters from scratch (commits)
+        counter_scopes = TaskCounterRepository(db).rebuild()
+    finally:
+        db.close()
+    
+    print(f"📊 Rebuilt task counters for {counter_scopes:,} scopes")
+    print(f"\n🎉 Generated {users * tasks_per_user:,} tasks in {time.perf_counter() - started:.1f}s")
+    print(f"🔑 Every generated user logs in with user<id>@example.com / {SCALE_PASSWORD}")
+
+
+def configure_engine(database_url: str):
+    """Point the script at another database"""
+    global engine
+    engine = create_engine(database_url, pool_pre_ping=True, echo=settings.DB_ECHO)
+    SessionLocal.configure(bind=engine)
+
+
+def rebuild_stats():
+    """Recompute the task counters from the tasks table"""
+    db = SessionLocal()
+    try:
+        scopes = TaskCounterRepository(db).rebuild()
+        print(f"📊 Rebuilt task counters for {scopes} scopes")
+    finally:
+        db.close()
+
+
 def reset_db():
     """Reset the database (drop all tables and recreate)"""
     print("⚠️  Resetting database...")
@@ -186,10 +442,35 @@ if __name__ == "__main__":
         action="store_true", 
         help="Reset the database (drop and recreate all tables)"
     )
+    parser.add_argument(
+        "--rebuild-stats",
+        action="store_true",
+        help="Recompute the task counters behind the stats endpoints"
+    )
+    parser.add_argument(
+        "--database-url",
+        default=DATABASE_URL,
+        help=f"Database to initialize (default: {DATABASE_URL})"
+    )
+    parser.add_argument("--users", type=int, help="Scale mode: number of synthetic users to generate")
+    parser.add_argument("--tasks-per-user", type=int, default=100, help="Scale mode: tasks per generated user")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Scale mode: rows per insert batch")
+    parser.add_argument("--seed", type=int, default=42, help="Scale mode: random seed")
     
     args = parser.parse_args()
     
-    if args.reset:
+    if args.database_url != DATABASE_URL:
+        configure_engine(args.database_url)
+    
+    if args.users:
+        if args.reset:
+            from app.core.database import Base
+            Base.metadata.drop_all(bind=engine)
+            print("🗑️  Dropped all tables")
+        seed_scale(args.users, args.tasks_per_user, args.batch_size, args.seed)
+    elif args.reset:
         reset_db()
+    elif args.rebuild_stats:
+        rebuild_stats()
     else:
         init_db()
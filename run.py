@@ -1,14 +1,38 @@
 """
-Simple script to run the FastAPI application
+Script to run the FastAPI application
+
+python run.py               development server with auto-reload
+python run.py --production  multi-worker server configured by the SERVER_* settings
+python run.py --openapi     write the OpenAPI schema cache at OPENAPI_CACHE_PATH (e.g. at build time)
 """
 
+import argparse
+import os
+
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--production", action="store_true", help="Serve with multiple workers, no reload")
+    parser.add_argument("--openapi", action="store_true", help="Write the OpenAPI schema cache and exit")
+    args = parser.parse_args()
+    
+    if args.openapi:
+        from app.core.config import settings
+        if not settings.OPENAPI_CACHE_PATH:
+            parser.error("--openapi needs OPENAPI_CACHE_PATH")
+        from app.main import app
+        app.openapi()
+    elif args.production:
+        from app.server import serve
+        serve()
+    else:
+        # The reloader serves from a child process - tell it that it is the only worker
+        os.environ.setdefault("SERVER_WORKERS", "1")
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info"
+        )